@@ -0,0 +1,49 @@
+"""
+Pfade für Ressourcen und Cache
+Funktioniert sowohl im Entwicklungsmodus als auch im PyInstaller-Bundle.
+"""
+
+import hashlib
+import os
+import sys
+
+
+# PyInstaller Pfad-Fix
+def resource_path(relative_path):
+    """Gibt den absoluten Pfad zur Ressource zurück, funktioniert für dev und PyInstaller."""
+    try:
+        # PyInstaller erstellt einen temp Ordner und speichert den Pfad in _MEIPASS
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+
+def cache_dir(*parts: str) -> str:
+    """
+    Gibt ein (angelegtes) Cache-Verzeichnis zurück.
+
+    Überschreibbar mit der Umgebungsvariable PLANETFINDER_CACHE. Liegt bewusst
+    außerhalb von _MEIPASS, da dieser Ordner bei jedem Start neu entpackt wird.
+    """
+    base = os.environ.get('PLANETFINDER_CACHE')
+    if not base:
+        if sys.platform == 'win32':
+            base = os.path.join(os.environ.get('LOCALAPPDATA', os.path.expanduser('~')), 'PlanetFinder', 'Cache')
+        elif sys.platform == 'darwin':
+            base = os.path.join(os.path.expanduser('~'), 'Library', 'Caches', 'PlanetFinder')
+        else:
+            base = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')),
+                                'planetfinder')
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def file_hash(path: str) -> bytes:
+    """SHA-256 einer Datei (blockweise gelesen)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.digest()
@@ -0,0 +1,296 @@
+"""
+Benchmark-Suite für die Galaxie-Engine
+Misst JSON-Laden, Aufbau der Engine, Snapshot, verfügbare Materialien, typische
+Suchen (Tier/Material/Entfernung), Detail-Abfragen und Icon-Rendering auf der
+ausgelieferten data.json und auf synthetischen Galaxien (galaxy_generator.py).
+Die Ergebnisse werden als JSON-Bericht gespeichert und lassen sich zwischen Commits
+vergleichen.
+
+Aufruf:
+    python benchmark.py run [--sizes 1000,10000,100000] [-o bericht.json]
+    python benchmark.py compare alt.json neu.json [--threshold 1.15]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from app_paths import cache_dir, file_hash, resource_path
+from cluster_finder import find_clusters
+from galaxy_engine import EXCHANGE_X, EXCHANGE_Y, NEAREST_HUB, GalaxyEngine, RankSpec
+from galaxy_generator import load_template, write_galaxy
+from galaxy_snapshot import read_snapshot, write_snapshot
+from svg_sprite import SvgSprite, SPRITE_FILE
+
+# Typische Suchen der GUI: (Name, Tiers, Anzahl häufigster Materialien, max. LY)
+SEARCH_MIX = [
+    ('alle', (1, 2, 3, 4), 0, None),
+    ('tier1', (1,), 0, None),
+    ('1mat', (1, 2, 3, 4), 1, None),
+    ('2mat', (1, 2, 3, 4), 2, None),
+    ('3mat_tier12', (1, 2), 3, None),
+    ('radius20', (1, 2, 3, 4), 0, 20.0),
+    ('1mat_radius50', (1, 2, 3, 4), 1, 50.0),
+    ('2mat_radius100', (1, 2, 3), 2, 100.0),
+]
+
+# Anzahl Detail-Abfragen (ID -> Planet inkl. Materialnamen) pro Messung
+DETAIL_LOOKUPS = 1000
+
+# Anzahl Symbole für den Icon-Benchmark
+ICON_COUNT = 64
+
+
+def measure(func: Callable, repeat: int) -> Dict[str, float]:
+    """Führt func einmal zum Aufwärmen und dann repeat-mal aus; Zeiten in Millisekunden."""
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return {'min_ms': round(min(times), 4), 'median_ms': round(statistics.median(times), 4),
+            'mean_ms': round(statistics.fmean(times), 4), 'runs': repeat}
+
+
+def bench_dataset(path: str, repeat: int) -> Tuple[int, Dict[str, Dict[str, float]]]:
+    """Alle Engine-Benchmarks für eine data.json; gibt (Anzahl Planeten, Messwerte) zurück."""
+    results = {}
+
+    def load_json():
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    # Große Dateien nicht unnötig oft parsen
+    slow_repeat = max(1, min(repeat, 3))
+    results['json_load'] = measure(load_json, slow_repeat)
+    daten = load_json()
+    results['engine_build'] = measure(lambda: GalaxyEngine(daten), slow_repeat)
+    engine = GalaxyEngine(daten)
+    del daten
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snap = os.path.join(tmp, 'bench.snap')
+        source_hash = file_hash(path)
+        results['snapshot_write'] = measure(lambda: write_snapshot(engine, snap, source_hash), slow_repeat)
+        results['snapshot_load'] = measure(lambda: read_snapshot(snap, source_hash), repeat)
+
+    results['available_materials'] = measure(engine.available_materials, repeat)
+
+    # Häufigste Materialien, damit die Suchen nicht leer sind
+    counts = np.bincount(engine.mat_ids) if len(engine.mat_ids) else np.zeros(0, dtype=np.int64)
+    common = np.argsort(-counts, kind='stable')[:3].tolist()
+    origin = (EXCHANGE_X, EXCHANGE_Y)
+    for name, tiers, mat_count, max_ly in SEARCH_MIX:
+        materials = common[:mat_count]
+        results[f'search_{name}'] = measure(lambda: engine.search(tiers, materials, max_ly, origin), repeat)
+
+    # Entfernung zum nächsten Hub (vorberechnet statt hypot pro Suche)
+    if len(engine.hub_rows):
+        results['search_hub_1mat'] = measure(lambda: engine.search((1, 2, 3, 4), common[:1], hub=NEAREST_HUB), repeat)
+        results['search_hub_radius20'] = measure(lambda: engine.search((1, 2, 3, 4), (), 20.0, hub=NEAREST_HUB),
+                                                 repeat)
+
+    # Verfeinern: ein weiteres Material auf ein vorhandenes Ergebnis
+    previous = engine.search((1, 2, 3, 4), common[:1])
+    results['search_refine'] = measure(lambda: engine.search((1, 2, 3, 4), common[:2], previous=previous), repeat)
+    results['search_chunked'] = measure(lambda: list(engine.iter_search((1, 2, 3, 4), common[:1])), repeat)
+
+    # Rangliste: beste 50 nach Häufigkeit und Entfernung
+    spec = RankSpec(k=50)
+    results['rank_top50_1mat'] = measure(lambda: engine.rank((1, 2, 3, 4), common[:1], spec), repeat)
+    results['rank_top50_2mat'] = measure(lambda: engine.rank((1, 2, 3, 4), common[:2], spec), repeat)
+
+    # Systeme: Planeten eines Systems liefern die Materialien gemeinsam (Aggregate beim Laden)
+    results['systems_2mat'] = measure(lambda: engine.search_systems((1, 2, 3, 4), common[:2]), repeat)
+    results['systems_top50_2mat'] = measure(lambda: engine.rank_systems((1, 2, 3, 4), common[:2], spec), repeat)
+
+    # Cluster: Gruppen, die zusammen die drei häufigsten bzw. drei seltensten Materialien liefern
+    rare = [m for m in np.argsort(counts, kind='stable').tolist() if counts[m]][:3]
+    results['clusters_common3'] = measure(lambda: find_clusters(engine, common[:3]), repeat)
+    results['clusters_common3_distance'] = measure(lambda: find_clusters(engine, common[:3], order='distance'),
+                                                   repeat)
+    if rare:
+        results['clusters_rare3'] = measure(lambda: find_clusters(engine, rare), repeat)
+
+    # Detailansicht: ID -> Zeile -> Planet-Dict mit Materialnamen
+    rng = np.random.default_rng(0)
+    sample = engine.ids[rng.integers(0, len(engine), size=DETAIL_LOOKUPS)].tolist() if len(engine) else []
+
+    def details():
+        for planet_id in sample:
+            planet = engine.planet(engine.row_of(planet_id))
+            for mat in planet['mats']:
+                engine.material_name(mat['id'])
+
+    results['details_lookup'] = measure(details, repeat)
+    return len(engine), results
+
+
+def bench_icons(repeat: int) -> Dict[str, object]:
+    """Rendert eine feste Auswahl an Sprite-Symbolen mit dem aktiven Backend."""
+    from icon_render import BACKEND_NAME, HAVE_RENDERER, render_icon
+
+    report = {'backend': BACKEND_NAME}
+    if not HAVE_RENDERER:
+        return report
+    sprite = SvgSprite(resource_path(SPRITE_FILE))
+    ids = sprite.ids()[:ICON_COUNT]
+    report['symbols'] = len(ids)
+    report['sprite_index'] = measure(lambda: SvgSprite(resource_path(SPRITE_FILE)), repeat)
+    for size in (24, 48):
+        report[f'render_{size}px'] = measure(lambda: [render_icon(sprite, i, size) for i in ids], repeat)
+    return report
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def dataset_paths(sizes: List[int], data_files: List[str], seed: int) -> Dict[str, str]:
+    """Name -> Pfad; synthetische Galaxien werden einmal erzeugt und im Cache behalten."""
+    paths = {}
+    for path in data_files:
+        paths[os.path.basename(path)] = path
+    template = None
+    for size in sizes:
+        path = os.path.join(cache_dir('bench'), f"galaxy_{size}_s{seed}.json")
+        if not os.path.exists(path):
+            template = template or load_template()
+            print(f"Erzeuge Galaxie mit {size} Planeten...", file=sys.stderr)
+            write_galaxy(path, size, seed, template)
+        paths[f"synthetic_{size}"] = path
+    return paths
+
+
+def run(args) -> dict:
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()] if args.sizes else []
+    data_files = args.data if args.data is not None else [resource_path('data.json')]
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': args.repeat,
+        },
+        'datasets': {},
+    }
+    for name, path in dataset_paths(sizes, data_files, args.seed).items():
+        print(f"Benchmark {name}...", file=sys.stderr)
+        planets, results = bench_dataset(path, args.repeat)
+        report['datasets'][name] = {'planets': planets, 'file_bytes': os.path.getsize(path),
+                                    'results': results}
+    if not args.no_icons:
+        print("Benchmark Icons...", file=sys.stderr)
+        report['icons'] = bench_icons(args.repeat)
+    return report
+
+
+def _flatten(report: dict) -> Dict[str, float]:
+    """'dataset/benchmark' -> Median in ms (inkl. Icons)."""
+    flat = {}
+    for name, dataset in report.get('datasets', {}).items():
+        for bench, timing in dataset['results'].items():
+            flat[f"{name}/{bench}"] = timing['median_ms']
+    for bench, timing in report.get('icons', {}).items():
+        if isinstance(timing, dict):
+            flat[f"icons/{bench}"] = timing['median_ms']
+    return flat
+
+
+def compare(old: dict, new: dict, threshold: float, min_delta_ms: float = 0.05) -> List[str]:
+    """
+    Gibt eine Vergleichstabelle aus.
+
+    Args:
+        old: Bericht des alten Stands
+        new: Bericht des neuen Stands
+        threshold: Ab diesem Faktor (Median neu / alt) gilt ein Benchmark als langsamer
+        min_delta_ms: Kleinere absolute Unterschiede gelten als Rauschen
+
+    Returns:
+        Namen der langsamer gewordenen Benchmarks
+    """
+    def fmt(value) -> str:
+        return '-' if value is None else f"{value:.3f}"
+
+    old_flat, new_flat = _flatten(old), _flatten(new)
+    print(f"{'Benchmark':<44} {'alt ms':>10} {'neu ms':>10} {'Faktor':>8}")
+    regressions = []
+    for key in sorted(set(old_flat) | set(new_flat)):
+        before, after = old_flat.get(key), new_flat.get(key)
+        if before is None or after is None:
+            print(f"{key:<44} {fmt(before):>10} {fmt(after):>10}")
+            continue
+        ratio = after / before if before > 0 else 1.0
+        marker = ''
+        if abs(after - before) >= min_delta_ms:
+            if ratio > threshold:
+                marker = '  <- langsamer'
+                regressions.append(key)
+            elif ratio < 1 / threshold:
+                marker = '  <- schneller'
+        print(f"{key:<44} {fmt(before):>10} {fmt(after):>10} {ratio:>7.2f}x{marker}")
+    print(f"\nCommits: {old['meta'].get('commit')} -> {new['meta'].get('commit')}")
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks für den Planet Finder")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help="Benchmarks ausführen und Bericht schreiben")
+    run_parser.add_argument('--sizes', default='1000,10000,100000',
+                            help="Planetenzahlen synthetischer Galaxien (kommagetrennt, leer = keine)")
+    run_parser.add_argument('--data', action='append',
+                            help="Zusätzliche data.json (mehrfach möglich; Standard: ausgelieferte Datei)")
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--no-icons', action='store_true', help="Icon-Rendering überspringen")
+    run_parser.add_argument('-o', '--output', help="Bericht als JSON (Standard: stdout)")
+
+    compare_parser = sub.add_parser('compare', help="Zwei Berichte vergleichen")
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=1.15,
+                                help="Ab diesem Faktor gilt ein Benchmark als langsamer")
+    compare_parser.add_argument('--min-delta-ms', type=float, default=0.05,
+                                help="Kleinere absolute Unterschiede werden ignoriert")
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        with open(args.old, 'r', encoding='utf-8') as f:
+            old = json.load(f)
+        with open(args.new, 'r', encoding='utf-8') as f:
+            new = json.load(f)
+        return 1 if compare(old, new, args.threshold, args.min_delta_ms) else 0
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"Bericht geschrieben: {args.output}", file=sys.stderr)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Dialog für die Cluster-Suche
+Zeigt die besten Planetengruppen, die zusammen alle gewählten Materialien liefern
+(cluster_finder.find_clusters), als Baum: Gruppe -> Planeten (Anker zuerst).
+Tiers, Materialien und Ursprung kommen aus den Filtern des Hauptfensters.
+"""
+
+import time
+from typing import Callable, Iterable, Tuple
+
+import numpy as np
+from PyQt6.QtWidgets import (QComboBox, QDialog, QDoubleSpinBox, QHBoxLayout, QLabel, QPushButton, QSpinBox,
+                             QTreeWidget, QTreeWidgetItem, QVBoxLayout)
+
+from cluster_finder import CLUSTER_K, CLUSTER_RADIUS_LY, find_clusters
+from galaxy_engine import GalaxyEngine
+
+COLUMNS = ["Cluster / Planet", "ID", "Materialien", "Radius LY", "Entfernung LY"]
+
+
+class ClusterDialog(QDialog):
+    def __init__(self, engine: GalaxyEngine,
+                 current_filters: Callable[[], Tuple[Iterable[int], Iterable[int], Tuple[float, float]]],
+                 parent=None):
+        """
+        Args:
+            engine: Galaxie
+            current_filters: Liefert (Tiers, Material-IDs, Ursprung) aus dem Hauptfenster
+        """
+        super().__init__(parent)
+        self.engine = engine
+        self.current_filters = current_filters
+        self.setWindowTitle("🧩 Cluster-Suche")
+        self.resize(820, 520)
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Anzahl:"))
+        self.k_spin = QSpinBox()
+        self.k_spin.setRange(1, 500)
+        self.k_spin.setValue(CLUSTER_K)
+        controls.addWidget(self.k_spin)
+        controls.addWidget(QLabel("Max. Radius (LY):"))
+        self.radius_spin = QDoubleSpinBox()
+        self.radius_spin.setRange(0.1, 1000.0)
+        self.radius_spin.setValue(CLUSTER_RADIUS_LY)
+        controls.addWidget(self.radius_spin)
+        controls.addWidget(QLabel("Sortierung:"))
+        self.order_combo = QComboBox()
+        self.order_combo.addItem("Kleinster Radius", 'radius')
+        self.order_combo.addItem("Geringste Entfernung zum Ursprung", 'distance')
+        controls.addWidget(self.order_combo)
+        search_btn = QPushButton("🔍 Cluster suchen")
+        search_btn.clicked.connect(self.search)
+        controls.addWidget(search_btn)
+        controls.addStretch()
+        layout.addLayout(controls)
+
+        self.info_label = QLabel("Materialien im Hauptfenster wählen, dann suchen")
+        layout.addWidget(self.info_label)
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(COLUMNS)
+        self.tree.setColumnWidth(0, 260)
+        layout.addWidget(self.tree)
+
+    def search(self):
+        tiers, materials, origin = self.current_filters()
+        materials = list(materials)
+        if not materials:
+            self.info_label.setText("❌ Mindestens ein Material auswählen!")
+            return
+        start = time.perf_counter()
+        try:
+            clusters = find_clusters(self.engine, materials, tiers, self.k_spin.value(), self.radius_spin.value(),
+                                     self.order_combo.currentData(), origin)
+        except ValueError as e:
+            self.info_label.setText(f"❌ {e}")
+            return
+        ms = (time.perf_counter() - start) * 1000
+
+        e = self.engine
+        selected = set(materials)
+        self.tree.clear()
+        for number, cluster in enumerate(clusters, 1):
+            group = QTreeWidgetItem([f"Cluster {number} ({len(cluster.rows)} Planeten)", "", "",
+                                     f"{cluster.radius_ly:.2f}", f"{cluster.distance_ly:.2f}"])
+            for row in cluster.rows.tolist():
+                mats = e.mat_ids[e.mat_ptr[row]:e.mat_ptr[row + 1]].tolist()
+                provided = ', '.join(e.material_name(m) for m in mats if m in selected)
+                distanz = float(np.hypot(e.x[row] - origin[0], e.y[row] - origin[1])) / e.px_to_ly
+                group.addChild(QTreeWidgetItem([e.names[row], str(int(e.ids[row])), provided, "",
+                                                f"{distanz:.2f}"]))
+            self.tree.addTopLevelItem(group)
+            group.setExpanded(True)
+        self.info_label.setText(f"✓ {len(clusters)} Cluster gefunden ({ms:.0f} ms)")
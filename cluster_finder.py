@@ -0,0 +1,224 @@
+"""
+Cluster-Suche für Basis-Standorte
+Findet Gruppen nahe beieinander liegender Planeten, die zusammen alle gewählten
+Materialien liefern (einzeln muss keiner alles haben). Jede Gruppe enthält einen
+Planeten mit dem seltensten Material - dieser dient als Anker. Um jeden Anker wird im
+Gitter (Zellgröße >= Cluster-Radius, also 3x3 Zellen) nach Nachbarn gesucht; Zellen,
+deren Nachbarschaft laut Material-Bitmasken nicht alles abdeckt, fallen vorab weg.
+"""
+
+import math
+from typing import Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+
+from galaxy_engine import EXCHANGE_X, EXCHANGE_Y, GalaxyEngine
+from spatial_index import SpatialGrid
+from tracing import span
+
+# Standardwerte: Anzahl Cluster und größter Abstand eines Mitglieds zum Anker
+CLUSTER_K = 10
+CLUSTER_RADIUS_LY = 15.0
+
+# Höchstens so viele Anker-Nachbar-Paare gleichzeitig im Speicher; order='distance' beginnt
+# mit kleinen Blöcken (nächste Anker zuerst) und hört auf, sobald kein Anker mehr aufholen kann
+PAIR_BLOCK = 1 << 21
+FIRST_BLOCK = 1 << 12
+
+# Höchstens so viele Gitterzellen für die Nachbarschaftssuche (größere Zellen bei winzigem Radius)
+MAX_GRID_CELLS = 4_000_000
+
+ORDERS = ('radius', 'distance')
+
+
+class PlanetCluster(NamedTuple):
+    """Eine Gruppe: rows[0] ist der Anker, die übrigen nach Abstand zum Anker sortiert."""
+    rows: np.ndarray
+    radius_ly: float  # größter Abstand eines Mitglieds zum Anker
+    distance_ly: float  # Summe der Entfernungen aller Mitglieder zum Ursprung
+
+
+def find_clusters(engine: GalaxyEngine, materials: Iterable[int], tiers: Iterable[int] = (1, 2, 3, 4),
+                  k: int = CLUSTER_K, max_radius_ly: float = CLUSTER_RADIUS_LY, order: str = 'radius',
+                  origin: Tuple[float, float] = (EXCHANGE_X, EXCHANGE_Y)) -> List[PlanetCluster]:
+    """
+    Sucht die besten k Planeten-Gruppen, die zusammen alle Materialien abdecken.
+
+    Args:
+        engine: Galaxie
+        materials: Material-IDs, die die Gruppe zusammen liefern muss (höchstens 32)
+        tiers: Erlaubte Tiers aller Mitglieder
+        k: Anzahl Gruppen
+        max_radius_ly: Größter Abstand eines Mitglieds zum Anker in Lichtjahren
+        order: 'radius' (kompakteste Gruppen zuerst) oder 'distance' (geringste Summe der
+            Entfernungen zum Ursprung; pro Material wird der ursprungsnächste Nachbar gewählt)
+        origin: Ursprung (x, y) in Pixeln für order='distance'
+
+    Returns:
+        Bis zu k Gruppen, die beste zuerst (keine Gruppe doppelt)
+    """
+    materials = sorted(set(materials))
+    if not materials or len(materials) > 32:
+        raise ValueError("Cluster-Suche braucht 1 bis 32 Materialien")
+    if order not in ORDERS:
+        raise ValueError(f"Ungültige Sortierung: {order!r} (radius oder distance)")
+    if k < 1 or not max_radius_ly > 0:
+        raise ValueError("Anzahl und Radius müssen positiv sein")
+
+    with span('clusters.prepare'):
+        # Bitmaske pro Planet: welche der gewählten Materialien er liefert
+        cover = np.zeros(len(engine), dtype=np.uint32)
+        for bit, mat_id in enumerate(materials):
+            cover |= engine.material_mask([mat_id]).astype(np.uint32) << np.uint32(bit)
+        cover[~engine.tier_mask(tiers)] = 0
+        rows = np.flatnonzero(cover)
+        cover = cover[rows]
+        counts = [int(np.count_nonzero(cover & np.uint32(1 << bit))) for bit in range(len(materials))]
+        if not rows.size or min(counts) == 0:
+            return []
+        rarest = np.uint32(1 << int(np.argmin(counts)))
+        x, y = engine.x[rows], engine.y[rows]
+        origin_dist = np.hypot(x - origin[0], y - origin[1])
+
+    radius = max_radius_ly * engine.px_to_ly
+    radii = [radius]
+    if order == 'radius':
+        # Kompakte Gruppen zuerst mit kleinem Radius suchen: wer darin k Gruppen findet, hat die
+        # besten. Nicht weit unter den mittleren Planetenabstand (sonst fast nur leere Gitterzellen)
+        spacing = math.sqrt(max(float(np.ptp(x)) * float(np.ptp(y)), 1.0) / len(rows))
+        radii = [level for level in (radius / 64, radius / 16, radius / 4) if level >= spacing / 4] + radii
+    for level in radii:
+        grid, anchors = _anchor_grid(x, y, cover, rarest, len(materials), level)
+        if order == 'distance':
+            # Ein Cluster ist mindestens so weit entfernt wie sein Anker - nächste Anker zuerst
+            anchors = anchors[np.argsort(origin_dist[anchors], kind='stable')]
+        picks = np.full((len(anchors), len(materials)), -1, dtype=np.int64)
+        reach = np.full((len(anchors), len(materials)), np.inf)
+        ranges = _neighbour_ranges(grid, grid.cell_ids(x[anchors], y[anchors]))
+        per_anchor = np.cumsum((ranges[:, :, 1] - ranges[:, :, 0]).sum(axis=1))
+
+        done = 0
+        while done < len(anchors):
+            # Blöcke mit begrenzter Paar-Anzahl (bei order='distance' zu Beginn klein)
+            budget = PAIR_BLOCK if order == 'radius' else min(PAIR_BLOCK, FIRST_BLOCK << done.bit_length())
+            end = max(int(np.searchsorted(per_anchor, (per_anchor[done - 1] if done else 0) + budget)), done + 1)
+            end = min(end, len(anchors))
+            with span('clusters.neighbours', anchors=end - done):
+                _best_neighbours(grid, anchors[done:end], ranges[done:end], cover, x, y, level,
+                                 origin_dist if order == 'distance' else None, len(materials),
+                                 picks[done:end], reach[done:end])
+            done = end
+            if order == 'distance' and done < len(anchors):
+                clusters = _select(engine, rows, x, y, origin_dist, anchors[:done], picks[:done],
+                                   reach[:done], order, k)
+                if len(clusters) == k and clusters[-1].distance_ly * engine.px_to_ly <= origin_dist[anchors[done]]:
+                    return clusters
+
+        clusters = _select(engine, rows, x, y, origin_dist, anchors, picks, reach, order, k)
+        if len(clusters) == k or level == radii[-1]:
+            return clusters
+    return []
+
+
+def _anchor_grid(x: np.ndarray, y: np.ndarray, cover: np.ndarray, rarest: np.uint32, material_count: int,
+                 radius: float) -> Tuple[SpatialGrid, np.ndarray]:
+    """Gitter mit Zellgröße >= radius und alle Anker, deren 3x3-Nachbarschaft alles abdeckt."""
+    with span('clusters.prepare'):
+        area = max(float(np.ptp(x)) * float(np.ptp(y)), 1.0)
+        grid = SpatialGrid(x, y, cell_size=max(radius, math.sqrt(area / MAX_GRID_CELLS)))
+
+        # Abdeckung jeder Zelle und ihrer 3x3-Nachbarschaft (ODER der Bitmasken)
+        cells = grid.cell_ids(x, y)
+        cell_cover = np.zeros(grid.nx * grid.ny, dtype=np.uint32)
+        np.bitwise_or.at(cell_cover, cells, cover)
+        cell_cover = cell_cover.reshape(grid.ny, grid.nx)
+        padded = np.pad(cell_cover, 1)
+        around = np.zeros_like(cell_cover)
+        for dy in range(3):
+            for dx in range(3):
+                around |= padded[dy:dy + grid.ny, dx:dx + grid.nx]
+        full = np.uint32((1 << material_count) - 1)
+        anchors = np.flatnonzero((cover & rarest).astype(bool) & (around.ravel()[cells] == full))
+    return grid, anchors
+
+
+def _select(engine: GalaxyEngine, rows: np.ndarray, x: np.ndarray, y: np.ndarray, origin_dist: np.ndarray,
+            anchors: np.ndarray, picks: np.ndarray, reach: np.ndarray, order: str, k: int) -> List[PlanetCluster]:
+    """Die besten k verschiedenen Gruppen aus den Ankern mit vollständiger Abdeckung."""
+    with span('clusters.select'):
+        valid = np.isfinite(reach).all(axis=1)
+        anchors, picks, reach = anchors[valid], picks[valid], reach[valid]
+        if not len(anchors):
+            return []
+        # Jedes Mitglied nur einmal zählen (ein Planet kann mehrere Materialien liefern)
+        members = np.sort(np.column_stack([anchors, picks]), axis=1)
+        unique = np.ones(members.shape, dtype=bool)
+        unique[:, 1:] = members[:, 1:] != members[:, :-1]
+        total = np.where(unique, origin_dist[members], 0.0).sum(axis=1)
+        spread = reach.max(axis=1)
+        if order == 'radius':
+            ranking = np.lexsort((rows[anchors], total, spread))
+        else:
+            ranking = np.lexsort((rows[anchors], spread, total))
+
+        clusters, seen = [], set()
+        for i in ranking.tolist():
+            key = tuple(members[i][unique[i]].tolist())
+            if key in seen:
+                continue
+            seen.add(key)
+            anchor = int(anchors[i])
+            others = [m for m in dict.fromkeys(picks[i].tolist()) if m != anchor]
+            others.sort(key=lambda m: math.hypot(x[m] - x[anchor], y[m] - y[anchor]))
+            clusters.append(PlanetCluster(rows[[anchor] + others], float(spread[i]) / engine.px_to_ly,
+                                          float(total[i]) / engine.px_to_ly))
+            if len(clusters) == k:
+                break
+    return clusters
+
+
+def _neighbour_ranges(grid: SpatialGrid, cells: np.ndarray) -> np.ndarray:
+    """Pro Zelle die drei Abschnitte [start, end) in grid.order, die ihre 3x3-Nachbarschaft bilden."""
+    cx, cy = cells % grid.nx, cells // grid.nx
+    left, right = np.maximum(cx - 1, 0), np.minimum(cx + 1, grid.nx - 1)
+    ranges = np.zeros((len(cells), 3, 2), dtype=np.int64)
+    for i, dy in enumerate((-1, 0, 1)):
+        row = cy + dy
+        inside = (row >= 0) & (row < grid.ny)
+        ranges[inside, i, 0] = grid.cell_start[row[inside] * grid.nx + left[inside]]
+        ranges[inside, i, 1] = grid.cell_start[row[inside] * grid.nx + right[inside] + 1]
+    return ranges
+
+
+def _best_neighbours(grid: SpatialGrid, anchors: np.ndarray, ranges: np.ndarray, cover: np.ndarray,
+                     x: np.ndarray, y: np.ndarray, radius: float, origin_cost, material_count: int,
+                     picks: np.ndarray, reach: np.ndarray):
+    """
+    Wählt für jeden Anker und jedes Material den besten Nachbarn im Radius.
+
+    Bildet alle Paare (Anker, Planet der 3x3-Nachbarschaft) als flache Arrays, nach Anker
+    gruppiert; das Minimum je Gruppe liefert reduceat. Ergebnis in picks/reach (Sichten).
+    """
+    counts = (ranges[:, :, 1] - ranges[:, :, 0]).ravel()
+    total = int(counts.sum())
+    offsets = np.cumsum(counts) - counts
+    positions = np.arange(total) - np.repeat(offsets - ranges[:, :, 0].ravel(), counts)
+    near = grid.order[positions]
+    owner = np.repeat(np.arange(len(anchors)), (ranges[:, :, 1] - ranges[:, :, 0]).sum(axis=1))
+    # Der Anker liegt in seiner eigenen Zelle - jede Gruppe ist also nicht leer
+    group_starts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+
+    dist = np.hypot(x[near] - x[anchors[owner]], y[near] - y[anchors[owner]])
+    cost = dist.copy() if origin_cost is None else origin_cost[near]
+    cost[near == anchors[owner]] = -1.0  # der Anker ist ohnehin Mitglied (gewinnt Gleichstände)
+    cost[dist > radius] = np.inf
+    index = np.arange(total)
+    for bit in range(material_count):
+        options = np.where((cover[near] & np.uint32(1 << bit)).astype(bool), cost, np.inf)
+        best = np.minimum.reduceat(options, group_starts)
+        # Erster Treffer je Gruppe mit den minimalen Kosten
+        first = np.minimum.reduceat(np.where(options == np.repeat(best, np.diff(np.r_[group_starts, total])),
+                                             index, total), group_starts)
+        found = np.isfinite(best)
+        picks[found, bit] = near[first[found]]
+        reach[found, bit] = dist[first[found]]
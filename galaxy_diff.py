@@ -0,0 +1,406 @@
+"""
+Abgleich eines neuen data.json Stands mit der geladenen Galaxie
+Vergleicht die Planeten per id und die Sternsysteme per sId und baut daraus eine neue
+GalaxyEngine, ohne alle Indizes neu zu berechnen: überlebende Planeten behalten ihre Zeile,
+neue werden hinten angehängt, und Material-Bitsets, räumliches Gitter und Hub-Entfernungen
+werden nur für die geänderten Zeilen nachgezogen. Die alte Engine bleibt unverändert, eine
+laufende Suche im Hintergrund liest sie ungestört weiter.
+Selbsttest gegen einen Neuaufbau: python galaxy_diff.py [data.json]
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from galaxy_engine import HUB_MATRIX_MAX_CELLS, HUB_TYPE, GalaxyEngine, NameTable
+
+# Skalare Planeten-Spalten (ohne id), die beim Abgleich verglichen werden
+SCALAR_COLUMNS = ('sid', 'x', 'y', 'tier', 'type', 'fert', 'size')
+SYSTEM_COLUMNS = ('system_ids', 'system_x', 'system_y')
+
+# Mittlere Zeilen je zusammenhängendem Lauf, ab der segments_differ ganze Stücke vergleicht
+RUN_MIN_ROWS = 16
+
+
+def _runs(index: np.ndarray) -> Optional[List[Tuple[int, int, int]]]:
+    """
+    Zusammenhängende Läufe (aufeinanderfolgende Werte) in einem Index-Array.
+
+    Returns:
+        Liste (Anfang in index, Ende in index, erster Wert) oder None, wenn die Läufe im
+        Mittel kürzer als RUN_MIN_ROWS sind
+    """
+    if not len(index):
+        return []
+    firsts = np.flatnonzero(np.concatenate(([True], index[1:] != index[:-1] + 1)))
+    if len(firsts) * RUN_MIN_ROWS > len(index):
+        return None
+    return list(zip(firsts.tolist(), np.append(firsts[1:], len(index)).tolist(), index[firsts].tolist()))
+
+
+def take(values: np.ndarray, index: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """values[..., index] (letzte Achse); lange Läufe in index werden als Slices kopiert statt per Gather."""
+    runs = _runs(index)
+    if out is None:
+        out = np.empty(values.shape[:-1] + (len(index),), dtype=values.dtype)
+    if runs is None:
+        out[...] = values[..., index]
+        return out
+    for first, end, start in runs:
+        out[..., first:end] = values[..., start:start + end - first]
+    return out
+
+
+def segment_index(ptr: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Einträge der CSR-Abschnitte einiger Zeilen, hintereinander gelegt.
+
+    Returns:
+        (neues ptr mit len(rows)+1 Einträgen, Quellindex je Eintrag)
+    """
+    starts = ptr[rows]
+    lengths = ptr[rows + 1] - starts
+    new_ptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_ptr[1:])
+    # Abschnittsanfang in der Quelle + Position im Abschnitt
+    index = np.arange(new_ptr[-1], dtype=np.int64) + np.repeat(starts - new_ptr[:-1], lengths)
+    return new_ptr, index
+
+
+def take_segments(ptr: np.ndarray, values: Sequence[np.ndarray], rows: np.ndarray
+                  ) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """CSR-Abschnitte einiger Zeilen als neue CSR-Tabelle (neues ptr, je Werte-Array die Einträge)."""
+    runs = _runs(rows)
+    if runs is None:
+        new_ptr, index = segment_index(ptr, rows)
+        return new_ptr, [v[index] for v in values]
+    new_ptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(ptr[rows + 1] - ptr[rows], out=new_ptr[1:])
+    taken = [np.empty(new_ptr[-1], dtype=v.dtype) for v in values]
+    for first, end, start in runs:
+        for source, target in zip(values, taken):
+            target[new_ptr[first]:new_ptr[end]] = source[ptr[start]:ptr[start + end - first]]
+    return new_ptr, taken
+
+
+def segments_differ(ptr_a: np.ndarray, values_a: Sequence[np.ndarray], rows_a: np.ndarray,
+                    ptr_b: np.ndarray, values_b: Sequence[np.ndarray], rows_b: np.ndarray) -> np.ndarray:
+    """Bool-Array: unterscheiden sich die CSR-Abschnitte von rows_a und rows_b (Länge oder Inhalt)?"""
+    start_a, end_a = ptr_a[rows_a], ptr_a[rows_a + 1]
+    start_b, end_b = ptr_b[rows_b], ptr_b[rows_b + 1]
+    differ = end_a - start_a != end_b - start_b
+    same = np.flatnonzero(~differ)
+    # Läufe: Zeilen, deren Abschnitte in beiden Quellen lückenlos aufeinander folgen, werden
+    # als ein Stück verglichen statt über einen Index je Eintrag
+    breaks = (start_a[same[1:]] != end_a[same[:-1]]) | (start_b[same[1:]] != end_b[same[:-1]])
+    firsts = np.flatnonzero(np.concatenate(([True], breaks))) if len(same) else same
+    if len(firsts) * RUN_MIN_ROWS > len(same):
+        return _segments_differ_gather(ptr_a, values_a, ptr_b, values_b, rows_a, rows_b, same, differ)
+    for first, end in zip(firsts.tolist(), np.append(firsts[1:], len(same)).tolist()):
+        run = same[first:end]
+        a0, a1, b0 = int(start_a[run[0]]), int(end_a[run[-1]]), int(start_b[run[0]])
+        mismatch = np.zeros(a1 - a0, dtype=bool)
+        for a, b in zip(values_a, values_b):
+            mismatch |= a[a0:a1] != b[b0:b0 + a1 - a0]
+        entries = np.flatnonzero(mismatch)
+        if len(entries):
+            differ[run[np.searchsorted(start_a[run] - a0, entries, side='right') - 1]] = True
+    return differ
+
+
+def _segments_differ_gather(ptr_a, values_a, ptr_b, values_b, rows_a, rows_b, same, differ) -> np.ndarray:
+    """Wie segments_differ, Einträge einzeln über Indizes verglichen (stark umsortierte Stände)."""
+    _, index_a = segment_index(ptr_a, rows_a[same])
+    _, index_b = segment_index(ptr_b, rows_b[same])
+    mismatch = np.zeros(len(index_a), dtype=bool)
+    for a, b in zip(values_a, values_b):
+        mismatch |= a[index_a] != b[index_b]
+    segment = np.repeat(np.arange(len(same)), ptr_a[rows_a[same] + 1] - ptr_a[rows_a[same]])
+    differ[same[np.unique(segment[mismatch])]] = True
+    return differ
+
+
+def _name_bytes(names: NameTable) -> np.ndarray:
+    return np.frombuffer(names.blob, dtype=np.uint8)
+
+
+def _bit_masks(rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Byte und Bitmaske (MSB zuerst, wie np.packbits) je Zeile."""
+    return rows >> 3, (0x80 >> (rows & 7)).astype(np.uint8)
+
+
+class GalaxyDiff:
+    """Unterschiede zwischen einer geladenen Engine und einem neu gelesenen Stand (Spalten)."""
+
+    def __init__(self, engine: GalaxyEngine, materials: list, px_to_ly: float, columns: dict):
+        """
+        Args:
+            engine: Geladene Galaxie
+            materials, px_to_ly, columns: Neuer Stand (galaxy_engine.read_columns)
+        """
+        self.engine = engine
+        self.materials = materials
+        self.px_to_ly = px_to_ly
+        self.columns = columns
+
+        old_ids, new_ids = engine.ids, columns['ids']
+        order = np.argsort(new_ids, kind='stable')
+        if len(order):
+            pos = np.minimum(np.searchsorted(new_ids, old_ids, sorter=order), len(order) - 1)
+            source = order[pos]
+            found = new_ids[source] == old_ids
+        else:
+            source = np.zeros(len(old_ids), dtype=np.int64)
+            found = np.zeros(len(old_ids), dtype=bool)
+        # Alte Zeilen der überlebenden Planeten und ihre Zeilen im neuen Stand
+        self.kept = np.flatnonzero(found)
+        kept_source = source[self.kept]
+        seen = np.zeros(len(new_ids), dtype=bool)
+        seen[kept_source] = True
+        added = np.flatnonzero(~seen)
+
+        # Neue Anordnung: Überlebende in alter Reihenfolge, dahinter die neuen Planeten;
+        # source[Zeile] = Zeile im neuen Stand, row_map[alte Zeile] = Zeile (-1 = entfernt)
+        self.source = np.concatenate((kept_source, added))
+        self.row_map = np.full(len(old_ids), -1, dtype=np.int64)
+        self.row_map[self.kept] = np.arange(len(self.kept))
+        self.removed_ids = old_ids[~found]
+        self.added = len(added)
+
+        changed = np.zeros(len(self.kept), dtype=bool)
+        for name in SCALAR_COLUMNS:
+            changed |= take(getattr(engine, name), self.kept) != take(columns[name], kept_source)
+        changed |= segments_differ(engine.mat_ptr, (engine.mat_ids, engine.mat_ab), self.kept,
+                                   columns['mat_ptr'], (columns['mat_ids'], columns['mat_ab']), kept_source)
+        changed |= segments_differ(engine.names.ptr, (_name_bytes(engine.names),), self.kept,
+                                   columns['names'].ptr, (_name_bytes(columns['names']),), kept_source)
+        # Zeilen (neue Anordnung), deren Indizes nachgezogen werden: geänderte und neue
+        self.changed = np.flatnonzero(changed)
+        self.touched = np.concatenate((self.changed, np.arange(len(self.kept), len(self.source))))
+
+        self.systems_changed = not all(np.array_equal(getattr(engine, name), columns[name])
+                                       for name in SYSTEM_COLUMNS)
+
+    def __bool__(self) -> bool:
+        """True, wenn sich Planeten, Systeme, Materialien oder pxToLY geändert haben."""
+        return bool(len(self.touched) or len(self.removed_ids) or self.systems_changed
+                    or self.materials != self.engine.materials or self.px_to_ly != self.engine.px_to_ly)
+
+    def summary(self) -> str:
+        """Kurzbeschreibung für Statusmeldungen."""
+        text = f"{self.added} neu, {len(self.removed_ids)} entfernt, {len(self.changed)} geändert"
+        return f"{text}, Systeme geändert" if self.systems_changed else text
+
+    def apply(self) -> GalaxyEngine:
+        """Baut die Engine des neuen Stands; unveränderte Zeilen und Indizes werden übernommen."""
+        e = self.engine
+        columns = self._planet_columns()
+        columns.update({name: self.columns[name] for name in SYSTEM_COLUMNS})
+        columns['material_bits'] = self._patch_material_bits(columns)
+        columns['grid'] = e.grid.patched(columns['x'], columns['y'], self.row_map, self.touched)
+        columns.update(self._patch_hub_distances(columns))
+        if self.added == 0 and len(self.removed_ids) == 0:
+            columns['id_order'] = e._id_order
+        if not self.systems_changed:
+            columns['system_order'] = e._system_order
+        return GalaxyEngine.from_columns(self.materials, self.px_to_ly, columns)
+
+    def _planet_columns(self) -> dict:
+        """Planeten-Spalten des neuen Stands in der neuen Anordnung (ohne Kopie, wenn sie gleich bleibt)."""
+        new = self.columns
+        if np.array_equal(self.source, np.arange(len(new['ids']))):
+            return {name: new[name] for name in ('ids',) + SCALAR_COLUMNS + ('names', 'mat_ptr', 'mat_ids', 'mat_ab')}
+        columns = {name: take(new[name], self.source) for name in ('ids',) + SCALAR_COLUMNS}
+        columns['mat_ptr'], (columns['mat_ids'], columns['mat_ab']) = take_segments(
+            new['mat_ptr'], (new['mat_ids'], new['mat_ab']), self.source)
+        name_ptr, (blob,) = take_segments(new['names'].ptr, (_name_bytes(new['names']),), self.source)
+        columns['names'] = NameTable(blob.tobytes(), name_ptr)
+        return columns
+
+    def _patch_material_bits(self, columns: dict) -> Dict[int, np.ndarray]:
+        """Material-Bitsets: überlebende Zeilen übernehmen, Bits der geänderten/neuen Zeilen neu setzen."""
+        e = self.engine
+        n_old, n, kept = len(e.ids), len(self.source), len(self.kept)
+        size = (n + 7) // 8
+        # Bitsets der alten Engine werden nicht verändert (sie wird evtl. noch durchsucht):
+        # übernommene Arrays erst vor dem ersten Ändern kopieren
+        bits: Dict[int, np.ndarray] = {}
+        owned = set()
+        for mat_id, old in e.material_bits.items():
+            if kept < n_old:
+                has_mat = np.zeros(n, dtype=bool)
+                take(np.unpackbits(old, count=n_old).view(bool), self.kept, out=has_mat[:kept])
+                bits[mat_id] = np.packbits(has_mat)
+                owned.add(mat_id)
+            elif size != len(old):
+                # Nur angehängt: die Füllbits hinter der letzten alten Zeile sind schon 0
+                bits[mat_id] = np.zeros(size, dtype=np.uint8)
+                bits[mat_id][:len(old)] = old
+                owned.add(mat_id)
+            else:
+                bits[mat_id] = old
+
+        def writable(mat_id: int) -> np.ndarray:
+            if mat_id not in bits:
+                bits[mat_id] = np.zeros(size, dtype=np.uint8)
+            elif mat_id not in owned:
+                bits[mat_id] = bits[mat_id].copy()
+            owned.add(mat_id)
+            return bits[mat_id]
+
+        def rows_by_material(ptr: np.ndarray, mat_ids: np.ndarray, rows: np.ndarray, target_rows: np.ndarray):
+            _, index = segment_index(ptr, rows)
+            entry_rows = np.repeat(target_rows, ptr[rows + 1] - ptr[rows])
+            entry_mats = mat_ids[index]
+            order = np.argsort(entry_mats, kind='stable')
+            found, first = np.unique(entry_mats[order], return_index=True)
+            return zip(found.tolist(), np.split(entry_rows[order], first[1:]))
+
+        # Alte Materialien der geänderten Zeilen löschen, dann die neuen (auch neuer Zeilen) setzen
+        for mat_id, rows in rows_by_material(e.mat_ptr, e.mat_ids, self.kept[self.changed], self.changed):
+            byte, mask = _bit_masks(rows)
+            np.bitwise_and.at(writable(mat_id), byte, ~mask)
+        for mat_id, rows in rows_by_material(columns['mat_ptr'], columns['mat_ids'], self.touched, self.touched):
+            byte, mask = _bit_masks(rows)
+            np.bitwise_or.at(writable(mat_id), byte, mask)
+        # Materialien, die auf keinem Planeten mehr vorkommen (geändert oder entfernt), fallen
+        # aus dem Index - wie beim Neuaufbau
+        for mat_id in [m for m, mat_bits in bits.items() if not mat_bits.any()]:
+            del bits[mat_id]
+        return bits
+
+    def _patch_hub_distances(self, columns: dict) -> dict:
+        """
+        Hub-Entfernungen der überlebenden Zeilen übernehmen, die geänderten/neuen Zeilen nachrechnen.
+
+        Haben sich die Hubs selbst geändert (neu, entfernt, verschoben), oder kippt die Matrix
+        über HUB_MATRIX_MAX_CELLS, bleibt das Ergebnis leer und die Engine rechnet alles neu.
+        """
+        e = self.engine
+        x, y = columns['x'], columns['y']
+        n = len(self.source)
+        hub_rows = np.flatnonzero(columns['type'] == HUB_TYPE)
+        keep_matrix = n * len(hub_rows) <= HUB_MATRIX_MAX_CELLS
+        if (not np.array_equal(self.row_map[e.hub_rows], hub_rows)
+                or not np.array_equal(e.x[e.hub_rows], x[hub_rows])
+                or not np.array_equal(e.y[e.hub_rows], y[hub_rows])
+                or keep_matrix != (e.hub_matrix is not None)):
+            return {}
+
+        kept = len(self.kept)
+        nearest = np.empty(n, dtype=np.float32)
+        nearest_index = np.empty(n, dtype=np.int32)
+        take(e.hub_nearest, self.kept, out=nearest[:kept])
+        take(e.hub_nearest_index, self.kept, out=nearest_index[:kept])
+        matrix = None
+        if keep_matrix:
+            matrix = np.empty((len(hub_rows), n), dtype=np.float32)
+            take(e.hub_matrix, self.kept, out=matrix[:, :kept])
+
+        touched = self.touched
+        if len(hub_rows):
+            # Wie GalaxyEngine._build_hub_distances: in float64 rechnen, als float32 vergleichen
+            distanz = np.hypot(x[touched] - x[hub_rows, None], y[touched] - y[hub_rows, None]).astype(np.float32)
+            if matrix is not None:
+                matrix[:, touched] = distanz
+            if len(touched):
+                nearest[touched] = distanz.min(axis=0)
+                nearest_index[touched] = distanz.argmin(axis=0)
+        else:
+            nearest[touched] = np.inf
+            nearest_index[touched] = -1
+        return {'hub_rows': hub_rows, 'hub_nearest': nearest, 'hub_nearest_index': nearest_index,
+                'hub_matrix': matrix}
+
+
+def rebuild_mismatches(diff: GalaxyDiff, patched: GalaxyEngine) -> List[str]:
+    """
+    Vergleicht eine abgeglichene Engine mit einem Neuaufbau aus denselben Spalten.
+
+    Args:
+        diff: Abgleich, aus dem patched stammt
+        patched: Ergebnis von diff.apply()
+
+    Returns:
+        Namen der Indizes, die vom Neuaufbau abweichen (leer = gleich)
+    """
+    columns = diff._planet_columns()
+    columns.update({name: diff.columns[name] for name in SYSTEM_COLUMNS})
+    fresh = GalaxyEngine.from_columns(diff.materials, diff.px_to_ly, columns)
+    errors = []
+    if patched.material_bits.keys() != fresh.material_bits.keys() or not all(
+            np.array_equal(bits, fresh.material_bits[mat_id]) for mat_id, bits in patched.material_bits.items()):
+        errors.append('material_bits')
+    if patched.available_materials() != fresh.available_materials():
+        errors.append('available_materials')
+    for name in ('hub_rows', 'hub_nearest', 'hub_nearest_index', 'hub_matrix', '_id_order', '_system_order'):
+        a, b = getattr(patched, name), getattr(fresh, name)
+        if (a is None) != (b is None) or (a is not None and not np.array_equal(a, b)):
+            errors.append(name)
+    # Das Gitter darf seine Geometrie behalten; verglichen werden die Treffer von Umkreissuchen
+    if len(fresh.ids):
+        rng = np.random.default_rng(0)
+        for origin, radius in zip(rng.choice(len(fresh.ids), 20), rng.uniform(5, 500, 20)):
+            point = (float(fresh.x[origin]), float(fresh.y[origin]))
+            if not np.array_equal(np.sort(patched.grid.within(point, radius)),
+                                  np.sort(fresh.grid.within(point, radius))):
+                errors.append('grid')
+                break
+    return errors
+
+
+if __name__ == "__main__":
+    # Selbsttest: typische Änderungen an data.json abgleichen und mit einem Neuaufbau vergleichen
+    import itertools
+    import json
+    import os
+    import sys
+    import tempfile
+
+    from galaxy_engine import read_columns
+
+    source = sys.argv[1] if len(sys.argv) > 1 else 'data.json'
+    with open(source, encoding='utf-8') as f:
+        data = json.load(f)
+    engine = GalaxyEngine.from_file(source)
+    new_ids = itertools.count(int(engine.ids.max()) + 1 if len(engine.ids) else 1)
+
+    def planets():
+        return [p for s in data['systems'] for p in (s.get('planets') or [])]
+
+    def change_planets():
+        for p in planets()[::50]:
+            p['fert'] = p.get('fert', 0) + 1
+            p['mats'] = (p.get('mats') or [])[:1]
+
+    def remove_material():
+        # Alle Planeten mit dem ersten vorkommenden Material verschwinden
+        victim = next(m['id'] for p in planets() for m in (p.get('mats') or []))
+        for s in data['systems']:
+            if s.get('planets'):
+                s['planets'] = [p for p in s['planets'] if all(m['id'] != victim for m in (p.get('mats') or []))]
+
+    def add_planets():
+        for s in data['systems'][::40]:
+            if s.get('planets'):
+                s['planets'].append(dict(s['planets'][0], id=next(new_ids)))
+
+    failed = 0
+    fd, path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        for title, modify in (("Planeten geändert", change_planets),
+                              ("Alle Planeten eines Materials entfernt", remove_material),
+                              ("Planeten hinzugefügt", add_planets)):
+            modify()
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            diff = GalaxyDiff(engine, *read_columns(path))
+            engine = diff.apply()
+            errors = rebuild_mismatches(diff, engine)
+            failed += bool(errors)
+            detail = f" - abweichend: {', '.join(errors)}" if errors else ""
+            print(f"{'✗' if errors else '✓'} {title}: {diff.summary()}{detail}")
+    finally:
+        os.remove(path)
+    sys.exit(1 if failed else 0)
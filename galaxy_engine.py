@@ -0,0 +1,865 @@
+"""
+Galaxie-Suchmaschine für den Planet Finder
+Lädt data.json einmalig (gestreamt) in spaltenweise NumPy-Arrays und wertet die Filter
+(Tier, Materialien, maximale Entfernung) vektorisiert aus - ohne GUI-Abhängigkeiten.
+"""
+
+import math
+import os
+import re
+from array import array
+from typing import Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from json_stream import JsonPullReader
+from spatial_index import SpatialGrid
+from system_index import SystemIndex
+from tracing import span
+
+# Koordinaten der Exchange Station (Standard-Ursprung für Entfernungen)
+EXCHANGE_X = 3301
+EXCHANGE_Y = 1409
+
+# Anzahl gesetzter Bits pro Byte (Popcount-Tabelle für gepackte Bitsets)
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+# Zeilen pro Block bei der blockweisen Suche (iter_search)
+SEARCH_CHUNK_ROWS = 16384
+
+# Planet-Typ der Handelsplätze (P_Exchange); Entfernungen lassen sich zu ihnen messen
+HUB_TYPE = 1
+# SearchQuery.hub: Entfernung zum jeweils nächsten Hub statt zu einem festen
+NEAREST_HUB = -1
+# Größte vorberechnete Distanzmatrix Planeten x Hubs (float32 -> 128 MB); darüber werden
+# nur die Entfernungen zum nächsten Hub gespeichert, die zu einem gewählten Hub bei Bedarf gerechnet
+HUB_MATRIX_MAX_CELLS = 32_000_000
+
+# Standardanzahl Treffer einer Rangliste (rank)
+RANK_K = 50
+
+# Gestreamtes Laden (iter_file): erster Zwischenstand nach so vielen Planeten, danach bei
+# jeweils doppelter Anzahl; dazwischen Fortschrittsmeldungen in diesen Schritten
+PARTIAL_FIRST_ROWS = 4096
+LOAD_PROGRESS_STEP = 0.01
+# So viele Bytes am Anfang und Ende der Datei werden vorab nach pxToLY durchsucht
+PX_TO_LY_SCAN_BYTES = 1 << 16
+_PX_TO_LY = re.compile(rb'"pxToLY"\s*:\s*(-?[0-9.eE+]+)')
+
+# Spalten des Planeten-Speichers (Sternsysteme dienen als Ursprung für Entfernungen)
+COLUMNS = ('ids', 'sid', 'x', 'y', 'tier', 'type', 'fert', 'size', 'names',
+           'mat_ptr', 'mat_ids', 'mat_ab', 'system_ids', 'system_x', 'system_y')
+
+
+class NameTable:
+    """Planetennamen als UTF-8 Block plus Offsets; dekodiert erst beim Zugriff."""
+
+    def __init__(self, blob, ptr: np.ndarray):
+        self.blob = blob
+        self.ptr = ptr
+
+    @classmethod
+    def from_names(cls, names: Iterable[str]) -> 'NameTable':
+        encoded = [name.encode('utf-8') for name in names]
+        ptr = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=ptr[1:])
+        return cls(b''.join(encoded), ptr)
+
+    def __len__(self) -> int:
+        return len(self.ptr) - 1
+
+    def __getitem__(self, row: int) -> str:
+        return bytes(self.blob[self.ptr[row]:self.ptr[row + 1]]).decode('utf-8')
+
+
+def _scan_px_to_ly(path: str) -> Optional[float]:
+    """pxToLY vorab aus Anfang oder Ende der Datei (galaxyConfig steht meist ganz vorn oder hinten)."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        head = f.read(PX_TO_LY_SCAN_BYTES)
+        f.seek(max(size - PX_TO_LY_SCAN_BYTES, 0))
+        tail = f.read()
+    for block in (head, tail):
+        match = _PX_TO_LY.search(block)
+        if match:
+            try:
+                return float(match.group(1))
+            except ValueError:
+                pass
+    return None
+
+
+class SearchQuery(NamedTuple):
+    """
+    Normalisierte Filter einer Suche (max_ly None = unbegrenzt).
+
+    hub None misst die Entfernung zu origin, NEAREST_HUB zum nächsten Hub, sonst zum Hub
+    mit dieser Planeten-ID (origin sind dann dessen Koordinaten, siehe GalaxyEngine.query).
+    """
+    tiers: FrozenSet[int]
+    materials: FrozenSet[int]
+    max_ly: Optional[float]
+    origin: Tuple[float, float]
+    hub: Optional[int] = None
+
+    @classmethod
+    def create(cls, tiers: Iterable[int], materials: Iterable[int] = (), max_ly: Optional[float] = None,
+               origin: Tuple[float, float] = (EXCHANGE_X, EXCHANGE_Y), hub: Optional[int] = None) -> 'SearchQuery':
+        return cls(frozenset(tiers), frozenset(materials), max_ly, (float(origin[0]), float(origin[1])), hub)
+
+    def is_narrowing(self, previous: 'SearchQuery') -> bool:
+        """True, wenn jeder Treffer dieser Suche auch ein Treffer von previous ist."""
+        if previous is None or self.origin != previous.origin or self.hub != previous.hub:
+            return False
+        if not (self.tiers <= previous.tiers and self.materials >= previous.materials):
+            return False
+        if previous.max_ly is None:
+            return True
+        return self.max_ly is not None and self.max_ly <= previous.max_ly
+
+
+class RankSpec(NamedTuple):
+    """
+    Gewichte einer Rangliste (höherer Score = besser).
+
+    Score = abundance * Häufigkeit + fert * Fruchtbarkeit + size * Größe - distance * LY;
+    die Häufigkeit ist Summe oder Minimum der ab-Werte der gewählten Materialien.
+    min_ab enthält (Material-ID, Mindest-Häufigkeit); diese Materialien sind Pflicht.
+    """
+    k: int = RANK_K
+    distance: float = 1.0
+    abundance: float = 1.0
+    fert: float = 0.0
+    size: float = 0.0
+    aggregate: str = 'sum'
+    min_ab: Tuple[Tuple[int, int], ...] = ()
+
+    @classmethod
+    def create(cls, k: int = RANK_K, weights: Dict[str, float] = None, aggregate: str = 'sum',
+               min_ab: Dict[int, int] = None) -> 'RankSpec':
+        weights = dict(weights or {})
+        unknown = set(weights) - {'distance', 'abundance', 'fert', 'size'}
+        if unknown:
+            raise ValueError(f"Unbekannte Gewichte: {', '.join(sorted(unknown))}")
+        if aggregate not in ('sum', 'min'):
+            raise ValueError(f"Ungültige Aggregation: {aggregate!r} (sum oder min)")
+        if k < 1:
+            raise ValueError(f"Ungültige Anzahl: {k}")
+        return cls(int(k), aggregate=aggregate, min_ab=tuple(sorted((min_ab or {}).items())),
+                   **{name: float(value) for name, value in weights.items()})
+
+
+class SearchResult:
+    """Ergebnis einer Suche: Zeilenindizes in den Spalten plus Distanz-Spalten (und Score bei rank)."""
+
+    def __init__(self, rows: np.ndarray, distanz: np.ndarray, lichtjahre: np.ndarray,
+                 query: SearchQuery = None, score: np.ndarray = None):
+        self.rows = rows
+        self.distanz = distanz
+        self.lichtjahre = lichtjahre
+        self.query = query
+        self.score = score
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index: slice) -> 'SearchResult':
+        return SearchResult(self.rows[index], self.distanz[index], self.lichtjahre[index], self.query,
+                            None if self.score is None else self.score[index])
+
+    def merged(self, other: 'SearchResult') -> 'SearchResult':
+        """
+        Fügt ein Teilergebnis ein und behält die Sortierung nach Distanz bei.
+
+        Bei gleicher Distanz kommen die Zeilen von other nach den vorhandenen - werden
+        Teilergebnisse in Zeilenreihenfolge eingefügt, entsteht dieselbe Reihenfolge
+        wie bei einer Suche in einem Stück.
+        """
+        if not len(self.rows):
+            return SearchResult(other.rows, other.distanz, other.lichtjahre, other.query)
+        positions = np.searchsorted(self.distanz, other.distanz, side='right')
+        return SearchResult(np.insert(self.rows, positions, other.rows),
+                            np.insert(self.distanz, positions, other.distanz),
+                            np.insert(self.lichtjahre, positions, other.lichtjahre),
+                            other.query)
+
+
+class GalaxyBuilder:
+    """Sammelt Systeme in typisierten Puffern (1-8 Byte pro Wert) statt in Python-Objekten."""
+
+    def __init__(self):
+        self.ids, self.sids, self.sys_ids = array('q'), array('q'), array('q')
+        self.xs, self.ys, self.sys_x, self.sys_y = array('d'), array('d'), array('d'), array('d')
+        self.tiers, self.types, self.ferts, self.sizes = array('b'), array('h'), array('h'), array('h')
+        self.mat_ptr, self.mat_ids, self.mat_ab = array('q', [0]), array('i'), array('i')
+        # Namen als ein UTF-8 Block (siehe NameTable) statt je ein str-Objekt
+        self.name_blob, self.name_ptr = bytearray(), array('q', [0])
+
+    def __len__(self) -> int:
+        """Anzahl bisher gesammelter Planeten."""
+        return len(self.ids)
+
+    def add_system(self, system: dict):
+        """Übernimmt ein System aus data.json samt Planeten."""
+        self.sys_ids.append(system['id'])
+        self.sys_x.append(system['x'])
+        self.sys_y.append(system['y'])
+        planets = system.get('planets')
+        if planets is None:
+            return
+        for planet in planets:
+            self.ids.append(planet['id'])
+            self.sids.append(planet['sId'])
+            self.xs.append(planet['x'])
+            self.ys.append(planet['y'])
+            self.tiers.append(planet['tier'])
+            self.types.append(planet['type'])
+            self.ferts.append(planet['fert'])
+            self.sizes.append(planet['size'])
+            self.name_blob += planet['name'].encode('utf-8')
+            self.name_ptr.append(len(self.name_blob))
+            for mat in planet.get('mats') or ():
+                self.mat_ids.append(mat['id'])
+                self.mat_ab.append(mat['ab'])
+            self.mat_ptr.append(len(self.mat_ids))
+
+    def columns(self, copy: bool = False) -> dict:
+        """
+        Spalten für GalaxyEngine._set_columns (siehe COLUMNS).
+
+        Ohne copy zeigen die Arrays direkt auf die Puffer, die danach nicht mehr wachsen
+        dürfen; Zwischenstände beim Laden kopieren, damit weiter gesammelt werden kann.
+        """
+        def column(buffer, dtype):
+            values = np.frombuffer(buffer, dtype=dtype)
+            return values.copy() if copy else values
+
+        return {
+            'ids': column(self.ids, np.int64),
+            'sid': column(self.sids, np.int64),
+            'x': column(self.xs, np.float64),
+            'y': column(self.ys, np.float64),
+            'tier': column(self.tiers, np.int8),
+            'type': column(self.types, np.int16),
+            'fert': column(self.ferts, np.int16),
+            'size': column(self.sizes, np.int16),
+            'names': NameTable(bytes(self.name_blob), column(self.name_ptr, np.int64)),
+            'mat_ptr': column(self.mat_ptr, np.int64),
+            'mat_ids': column(self.mat_ids, np.int32),
+            'mat_ab': column(self.mat_ab, np.int32),
+            'system_ids': column(self.sys_ids, np.int64),
+            'system_x': column(self.sys_x, np.float64),
+            'system_y': column(self.sys_y, np.float64),
+        }
+
+
+def iter_columns(path: str, partial_rows: Optional[int] = PARTIAL_FIRST_ROWS
+                 ) -> Iterator[Tuple[float, Optional[Tuple[list, float, dict]]]]:
+    """
+    Liest eine data.json Datei gestreamt in Spalten (siehe GalaxyEngine.iter_file).
+
+    Steht galaxyConfig erst hinter den Systemen, gilt für Zwischenstände das vorab gelesene pxToLY.
+
+    Returns:
+        Iterator über (Fortschritt 0..1, (materials, px_to_ly, Spalten) oder None);
+        Zwischenstände haben kopierte Spalten, der letzte Eintrag (1.0) ist vollständig
+    """
+    builder = GalaxyBuilder()
+    materials, config = None, None
+    px_to_ly = _scan_px_to_ly(path) if partial_rows else None
+    next_rows, next_progress = partial_rows, LOAD_PROGRESS_STEP
+    with open(path, 'rb') as f:
+        reader = JsonPullReader(f, os.path.getsize(path))
+        for key in reader.iter_object():
+            if key == 'materials':
+                materials = reader.value()
+            elif key == 'galaxyConfig':
+                config = reader.value()
+                px_to_ly = config['pxToLY']
+            elif key == 'systems' and reader.peek() == '[':
+                for system in reader.iter_array():
+                    builder.add_system(system)
+                    progress = min(reader.progress, 0.99)
+                    if next_rows and len(builder) >= next_rows and materials is not None and px_to_ly:
+                        yield progress, (materials, px_to_ly, builder.columns(copy=True))
+                        next_rows = 2 * len(builder)
+                    elif progress >= next_progress:
+                        yield progress, None
+                        next_progress = progress + LOAD_PROGRESS_STEP
+            else:
+                reader.skip()
+    if config is None:
+        raise KeyError('galaxyConfig')
+    yield 1.0, (materials or [], config['pxToLY'], builder.columns())
+
+
+def read_columns(path: str) -> Tuple[list, float, dict]:
+    """Liest eine data.json Datei gestreamt in Spalten, ohne Indizes zu bauen (materials, px_to_ly, Spalten)."""
+    for _, data in iter_columns(path, partial_rows=None):
+        if data is not None:
+            return data
+
+
+class GalaxyEngine:
+    """Spaltenweiser Planeten-Speicher mit vektorisierten Filtern."""
+
+    def __init__(self, daten: dict):
+        builder = GalaxyBuilder()
+        for system in daten.get('systems', []):
+            builder.add_system(system)
+        self._set_columns(daten.get('materials', []), daten['galaxyConfig']['pxToLY'], builder.columns())
+
+    @classmethod
+    def from_columns(cls, materials: list, px_to_ly: float, columns: dict) -> 'GalaxyEngine':
+        """Baut die Engine direkt aus fertigen Spalten (z.B. aus einem Snapshot)."""
+        engine = cls.__new__(cls)
+        engine._set_columns(materials, px_to_ly, columns)
+        return engine
+
+    def _set_columns(self, materials: list, px_to_ly: float, columns: dict):
+        """Übernimmt die Spalten (siehe COLUMNS) und baut die abgeleiteten Indizes."""
+        self.materials = materials
+        self.px_to_ly = px_to_ly
+        for name in COLUMNS:
+            setattr(self, name, columns[name])
+
+        # CSR-Materialtabelle: Materialien von Planet i liegen in mat_ids[mat_ptr[i]:mat_ptr[i+1]]
+        self.mat_rows = np.repeat(np.arange(len(self.ids), dtype=np.int32), np.diff(self.mat_ptr))
+
+        # Abgeleitete Indizes aus einem Abgleich (galaxy_diff) übernehmen oder hier bauen
+        self.material_bits = columns['material_bits'] if 'material_bits' in columns else \
+            self._build_material_index()
+        self.grid = columns['grid'] if 'grid' in columns else SpatialGrid(self.x, self.y)
+
+        # ID-Indizes für O(1)/O(log n)-Nachschlagen statt linearer Suche
+        self.material_names: Dict[int, str] = {m['id']: m['name'] for m in materials}
+        self._id_order = columns['id_order'] if 'id_order' in columns else np.argsort(self.ids, kind='stable')
+        self._system_order = columns['system_order'] if 'system_order' in columns else \
+            np.argsort(self.system_ids, kind='stable')
+
+        # Entfernungen zu den Hubs (aus dem Snapshot übernommen oder hier berechnet)
+        if 'hub_rows' in columns:
+            self.hub_rows = columns['hub_rows']
+            self.hub_nearest = columns['hub_nearest']
+            self.hub_nearest_index = columns['hub_nearest_index']
+            self.hub_matrix = columns['hub_matrix']
+        else:
+            self._build_hub_distances()
+
+        # Planeten nach Sternsystem gruppiert, Aggregate pro System (für search_systems/rank_systems)
+        with span('load.systems'):
+            self.system_index = SystemIndex(self)
+
+    def _build_hub_distances(self):
+        """
+        Distanzmatrix Hubs x Planeten (float32, eine Zeile pro Hub) und Entfernung zum nächsten Hub.
+
+        Wird die Matrix größer als HUB_MATRIX_MAX_CELLS, bleibt hub_matrix None und es werden nur
+        hub_nearest/hub_nearest_index gespeichert.
+        """
+        self.hub_rows = np.flatnonzero(self.type == HUB_TYPE)
+        n, hubs = len(self.ids), len(self.hub_rows)
+        keep_matrix = n * hubs <= HUB_MATRIX_MAX_CELLS
+        self.hub_matrix = np.empty((hubs, n), dtype=np.float32) if keep_matrix else None
+        self.hub_nearest = np.full(n, np.inf, dtype=np.float32)
+        self.hub_nearest_index = np.full(n, -1, dtype=np.int32)
+        distanz = np.empty(n, dtype=np.float64)
+        for index, row in enumerate(self.hub_rows.tolist()):
+            np.hypot(self.x - self.x[row], self.y - self.y[row], out=distanz)
+            column = distanz.astype(np.float32)
+            if keep_matrix:
+                self.hub_matrix[index] = column
+            closer = column < self.hub_nearest
+            self.hub_nearest[closer] = column[closer]
+            self.hub_nearest_index[closer] = index
+
+    @classmethod
+    def from_file(cls, path: str) -> 'GalaxyEngine':
+        """Lädt eine data.json Datei gestreamt (ohne den ganzen JSON-Baum) und baut die Spalten auf."""
+        for _, engine in cls.iter_file(path, partial_rows=None):
+            if engine is not None:
+                return engine
+
+    @classmethod
+    def iter_file(cls, path: str, partial_rows: Optional[int] = PARTIAL_FIRST_ROWS
+                  ) -> Iterator[Tuple[float, Optional['GalaxyEngine']]]:
+        """
+        Lädt eine data.json Datei gestreamt, System für System direkt in die Spalten.
+
+        Nebenbei entstehen Zwischenstände mit den bisher gelesenen Systemen: der erste nach
+        partial_rows Planeten, danach jeweils bei doppelter Planetenzahl (None = keine).
+
+        Returns:
+            Iterator über (Fortschritt 0..1, Engine oder None bei reinem Fortschritt);
+            der letzte Eintrag (1.0) enthält die vollständige Engine
+        """
+        for progress, data in iter_columns(path, partial_rows):
+            if data is None:
+                yield progress, None
+            elif progress < 1.0:
+                with span('load.partial'):
+                    partial = cls.from_columns(*data)
+                yield progress, partial
+            else:
+                yield progress, cls.from_columns(*data)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _build_material_index(self) -> Dict[int, np.ndarray]:
+        """Invertierter Index: Material-ID -> gepacktes Bitset der Planeten-Zeilen."""
+        order = np.argsort(self.mat_ids, kind='stable')
+        mat_ids, starts = np.unique(self.mat_ids[order], return_index=True)
+        index = {}
+        for mat_id, rows in zip(mat_ids.tolist(), np.split(self.mat_rows[order], starts[1:])):
+            has_mat = np.zeros(len(self.ids), dtype=bool)
+            has_mat[rows] = True
+            index[mat_id] = np.packbits(has_mat)
+        return index
+
+    def available_materials(self) -> Set[int]:
+        """Alle Material-IDs, die auf mindestens einem Planeten vorkommen."""
+        return set(self.material_bits)
+
+    def material_bitset(self, material_ids: Iterable[int]) -> np.ndarray:
+        """UND-Verknüpfung der Material-Bitsets (gepackt, 1 Bit pro Planet)."""
+        bits = np.full((len(self.ids) + 7) // 8, 0xFF, dtype=np.uint8)
+        for mat_id in material_ids:
+            mat_bits = self.material_bits.get(mat_id)
+            if mat_bits is None:
+                bits[:] = 0
+                break
+            np.bitwise_and(bits, mat_bits, out=bits)
+        return bits
+
+    def count_with_materials(self, material_ids: Iterable[int]) -> int:
+        """Anzahl Planeten mit ALLEN angegebenen Materialien (Popcount)."""
+        bits = self.material_bitset(material_ids)
+        # Füllbits hinter dem letzten Planeten ausblenden
+        rest = len(self.ids) % 8
+        if rest:
+            bits[-1] &= (0xFF << (8 - rest)) & 0xFF
+        return int(_POPCOUNT[bits].sum(dtype=np.int64))
+
+    def planet_types(self) -> List[int]:
+        """Alle vorkommenden Planeten-Typen, sortiert."""
+        return np.unique(self.type).tolist()
+
+    def tier_mask(self, tiers: Iterable[int]) -> np.ndarray:
+        """Bool-Maske aller Planeten mit einem der angegebenen Tiers."""
+        return np.isin(self.tier, np.fromiter(tiers, dtype=np.int8))
+
+    def material_mask(self, material_ids: Iterable[int]) -> np.ndarray:
+        """Bool-Maske aller Planeten, die ALLE angegebenen Materialien besitzen."""
+        bits = self.material_bitset(material_ids)
+        return np.unpackbits(bits, count=len(self.ids)).view(bool)
+
+    def distances(self, rows: np.ndarray, origin: Tuple[float, float]) -> np.ndarray:
+        """Pixel-Distanz der angegebenen Zeilen zum Ursprung."""
+        return np.hypot(self.x[rows] - origin[0], self.y[rows] - origin[1])
+
+    @staticmethod
+    def _lookup(values: np.ndarray, order: np.ndarray, key: int) -> int:
+        """Binäre Suche über einen vorsortierten Index; KeyError, wenn die ID fehlt."""
+        pos = int(np.searchsorted(values, key, sorter=order))
+        if pos >= len(order) or values[order[pos]] != key:
+            raise KeyError(key)
+        return int(order[pos])
+
+    def row_of(self, planet_id: int) -> int:
+        """Zeile eines Planeten anhand seiner ID."""
+        return self._lookup(self.ids, self._id_order, planet_id)
+
+    def material_name(self, mat_id: int, default: str = 'Unbekannt') -> str:
+        """Name eines Materials anhand seiner ID."""
+        return self.material_names.get(mat_id, default)
+
+    def system_origin(self, system_id: int) -> Tuple[float, float]:
+        """Koordinaten eines Sternsystems als Ursprung."""
+        row = self._lookup(self.system_ids, self._system_order, system_id)
+        return float(self.system_x[row]), float(self.system_y[row])
+
+    def hub_index(self, hub_id: int) -> int:
+        """Index eines Hubs (Spalte in hub_rows/hub_matrix) anhand seiner Planeten-ID."""
+        rows = np.flatnonzero(self.ids[self.hub_rows] == hub_id)
+        if not len(rows):
+            raise KeyError(hub_id)
+        return int(rows[0])
+
+    def hubs(self) -> List[dict]:
+        """Alle Hubs mit ID, Name und Koordinaten."""
+        return [{'id': int(self.ids[row]), 'name': self.names[row], 'x': int(self.x[row]), 'y': int(self.y[row])}
+                for row in self.hub_rows.tolist()]
+
+    def query(self, tiers: Iterable[int], materials: Iterable[int] = (), max_ly: Optional[float] = None,
+              origin: Tuple[float, float] = (EXCHANGE_X, EXCHANGE_Y), hub: Optional[int] = None) -> SearchQuery:
+        """
+        Normalisierte Suche; bei einem gewählten Hub wird dessen Position zum Ursprung.
+
+        Raises:
+            KeyError: Wenn hub keine Hub-ID ist (oder es für NEAREST_HUB keine Hubs gibt)
+        """
+        if hub == NEAREST_HUB:
+            if not len(self.hub_rows):
+                raise KeyError(hub)
+        elif hub is not None:
+            row = self.hub_rows[self.hub_index(hub)]
+            origin = (self.x[row], self.y[row])
+        return SearchQuery.create(tiers, materials, max_ly, origin, hub)
+
+    def query_distances(self, rows: np.ndarray, query: SearchQuery) -> np.ndarray:
+        """Pixel-Distanz der Zeilen für eine Suche (aus der Hub-Matrix, wenn möglich)."""
+        if query.hub is None:
+            return self.distances(rows, query.origin)
+        if query.hub == NEAREST_HUB:
+            return self.hub_nearest[rows].astype(np.float64)
+        if self.hub_matrix is None:
+            return self.distances(rows, query.origin).astype(np.float32).astype(np.float64)
+        return self.hub_matrix[self.hub_index(query.hub)][rows].astype(np.float64)
+
+    def filter_mask(self, tiers: Iterable[int], materials: Iterable[int] = ()) -> np.ndarray:
+        """Kombinierte Bool-Maske aus Tier- und Material-Filter."""
+        mask = self.tier_mask(tiers)
+        materials = list(materials)
+        if materials:
+            mask &= self.material_mask(materials)
+        return mask
+
+    def nearest(self, origin: Tuple[float, float], n: int, tiers: Iterable[int] = (1, 2, 3, 4),
+                materials: Iterable[int] = ()) -> SearchResult:
+        """Die n nächsten passenden Planeten zum Ursprung, aufsteigend nach Distanz."""
+        rows = self.grid.nearest(origin, n, self.filter_mask(tiers, materials))
+        distanz = self.distances(rows, origin)
+        return SearchResult(rows, distanz, distanz / self.px_to_ly)
+
+    def search(self, tiers: Iterable[int], materials: Iterable[int] = (),
+               max_ly: Optional[float] = None,
+               origin: Tuple[float, float] = (EXCHANGE_X, EXCHANGE_Y), hub: Optional[int] = None,
+               previous: SearchResult = None) -> SearchResult:
+        """
+        Sucht Planeten passend zu den Filtern.
+
+        Args:
+            tiers: Erlaubte Tiers
+            materials: Material-IDs, die ein Planet alle besitzen muss
+            max_ly: Maximale Entfernung in Lichtjahren (None = unbegrenzt)
+            origin: Ursprung (x, y) in Pixeln für die Entfernungsberechnung
+            hub: Entfernung statt zu origin zum nächsten Hub (NEAREST_HUB) oder zu dieser Hub-ID
+            previous: Vorheriges Ergebnis; ist die neue Suche strenger, wird nur dieses gefiltert
+
+        Returns:
+            SearchResult mit den Treffern, aufsteigend nach Distanz sortiert
+        """
+        query = self.query(tiers, materials, max_ly, origin, hub)
+        if self._can_refine(previous, query):
+            return self.refine(previous, query)
+
+        with span('search.filter'):
+            mask = self.filter_mask(query.tiers, query.materials)
+            rows = self._candidate_rows(query, mask)
+        return self._finish(rows, query)
+
+    def iter_search(self, tiers: Iterable[int], materials: Iterable[int] = (),
+                    max_ly: Optional[float] = None,
+                    origin: Tuple[float, float] = (EXCHANGE_X, EXCHANGE_Y), hub: Optional[int] = None,
+                    previous: SearchResult = None,
+                    chunk_size: int = SEARCH_CHUNK_ROWS) -> Iterator[Tuple[float, SearchResult]]:
+        """
+        Wie search(), wertet die Filter aber blockweise aus.
+
+        Zwischen zwei Blöcken kann der Aufrufer abbrechen (Iteration beenden). Die
+        Teilergebnisse sind je für sich nach Distanz sortiert und ergeben, der Reihe nach
+        mit SearchResult.merged() zusammengeführt, genau das Ergebnis von search().
+
+        Returns:
+            Iterator über (Fortschritt 0..1, Teilergebnis)
+        """
+        query = self.query(tiers, materials, max_ly, origin, hub)
+        if self._can_refine(previous, query):
+            total = len(previous)
+            for start in range(0, total, chunk_size):
+                yield min(start + chunk_size, total) / total, self.refine(previous[start:start + chunk_size], query)
+            if not total:
+                yield 1.0, self.refine(previous, query)
+            return
+
+        rows = self._candidate_rows(query)
+        total = len(rows)
+        for start in range(0, total, chunk_size):
+            block = rows[start:start + chunk_size]
+            with span('search.filter'):
+                keep = np.isin(self.tier[block], np.fromiter(query.tiers, dtype=np.int8))
+                for mat_id in query.materials:
+                    keep &= self._has_material(block, mat_id)
+            yield min(start + chunk_size, total) / total, self._finish(block[keep], query)
+        if not total:
+            yield 1.0, self._finish(rows, query)
+
+    def rank(self, tiers: Iterable[int], materials: Iterable[int] = (), spec: RankSpec = RankSpec(),
+             max_ly: Optional[float] = None,
+             origin: Tuple[float, float] = (EXCHANGE_X, EXCHANGE_Y), hub: Optional[int] = None) -> SearchResult:
+        """
+        Die spec.k besten Planeten nach Score statt aller Treffer nach Distanz.
+
+        Args:
+            tiers: Erlaubte Tiers
+            materials: Material-IDs, die ein Planet alle besitzen muss (gehen in die Häufigkeit ein)
+            spec: Gewichte, Aggregation, Mindest-Häufigkeiten und Anzahl (siehe RankSpec)
+            max_ly: Maximale Entfernung in Lichtjahren (None = unbegrenzt)
+            origin: Ursprung (x, y) in Pixeln für die Entfernungsberechnung
+            hub: Entfernung zum nächsten Hub (NEAREST_HUB) oder zu dieser Hub-ID (siehe search)
+
+        Returns:
+            SearchResult mit Score-Spalte, absteigend nach Score (bei Gleichstand nach Distanz)
+        """
+        thresholds = dict(spec.min_ab)
+        query = self.query(tiers, set(materials) | set(thresholds), max_ly, origin, hub)
+        with span('rank.filter'):
+            rows = self._candidate_rows(query, self.filter_mask(query.tiers, query.materials))
+            distanz = self.query_distances(rows, query)
+            lichtjahre = distanz / self.px_to_ly
+            keep = np.ones(len(rows), dtype=bool) if max_ly is None else lichtjahre <= max_ly
+
+        with span('rank.score'):
+            abundance = np.zeros(len(rows), dtype=np.float64)
+            for index, mat_id in enumerate(sorted(query.materials)):
+                ab = self.abundance(rows, mat_id)
+                if mat_id in thresholds:
+                    keep &= ab >= thresholds[mat_id]
+                if index and spec.aggregate == 'min':
+                    np.minimum(abundance, ab, out=abundance)
+                else:
+                    abundance += ab
+            rows, distanz, lichtjahre, abundance = rows[keep], distanz[keep], lichtjahre[keep], abundance[keep]
+            score = (spec.abundance * abundance + spec.fert * self.fert[rows] + spec.size * self.size[rows]
+                     - spec.distance * lichtjahre)
+
+        return self._select_top(rows, distanz, lichtjahre, score, spec.k, query)
+
+    @staticmethod
+    def _select_top(rows: np.ndarray, distanz: np.ndarray, lichtjahre: np.ndarray, score: np.ndarray, k: int,
+                    query: SearchQuery) -> SearchResult:
+        """Die k Zeilen mit dem höchsten Score, bei Gleichstand nach Distanz und Zeile."""
+        with span('rank.select'):
+            # Nur die besten k vollständig sortieren (partition statt argsort über alle). Bei
+            # Gleichstand mit dem k-ten Score entscheiden Distanz und Zeile, nicht die Partition:
+            # von den gleichauf liegenden Zeilen bleiben alle bis zur nötigen Distanz im Rennen
+            top = np.arange(len(rows))
+            if k < len(rows):
+                kth = np.partition(score, len(rows) - k)[len(rows) - k]
+                better = np.flatnonzero(score > kth)
+                tied = np.flatnonzero(score == kth)
+                need = k - len(better)
+                if need < len(tied):
+                    tied_distanz = distanz[tied]
+                    tied = tied[tied_distanz <= np.partition(tied_distanz, need - 1)[need - 1]]
+                top = np.concatenate((better, tied))
+            top = top[np.lexsort((rows[top], distanz[top], -score[top]))][:k]
+        return SearchResult(rows[top], distanz[top], lichtjahre[top], query, score[top])
+
+    def search_systems(self, tiers: Iterable[int], materials: Iterable[int] = (),
+                       max_ly: Optional[float] = None,
+                       origin: Tuple[float, float] = (EXCHANGE_X, EXCHANGE_Y),
+                       hub: Optional[int] = None) -> SearchResult:
+        """
+        Sucht Sternsysteme, deren Planeten zusammen alle Materialien liefern.
+
+        Ein einzelner Planet muss nicht alles haben; es zählen nur Planeten der erlaubten
+        Tiers. Die Entfernung wird von der Systemposition aus gemessen.
+
+        Args:
+            tiers: Erlaubte Tiers
+            materials: Material-IDs, die das System zusammen besitzen muss
+            max_ly: Maximale Entfernung in Lichtjahren (None = unbegrenzt)
+            origin: Ursprung (x, y) in Pixeln für die Entfernungsberechnung
+            hub: Entfernung zum nächsten Hub (NEAREST_HUB) oder zu dieser Hub-ID (siehe search)
+
+        Returns:
+            SearchResult, dessen rows Systemindizes sind (system_index.keys[rows] = sId),
+            aufsteigend nach Distanz sortiert
+        """
+        query = self.query(tiers, materials, max_ly, origin, hub)
+        systems, distanz, lichtjahre = self._system_candidates(query)
+        with span('systems.sort'):
+            order = np.argsort(distanz, kind='stable')
+        return SearchResult(systems[order], distanz[order], lichtjahre[order], query)
+
+    def rank_systems(self, tiers: Iterable[int], materials: Iterable[int] = (), spec: RankSpec = RankSpec(),
+                     max_ly: Optional[float] = None,
+                     origin: Tuple[float, float] = (EXCHANGE_X, EXCHANGE_Y),
+                     hub: Optional[int] = None) -> SearchResult:
+        """
+        Die spec.k besten Sternsysteme nach Score (wie rank, aber pro System).
+
+        Häufigkeit, Fruchtbarkeit und Größe sind die beim Laden vorberechneten Summen über
+        die Planeten der erlaubten Tiers; min_ab gilt für die Summe im System.
+
+        Returns:
+            SearchResult mit Systemindizes als rows und Score-Spalte, absteigend nach Score
+        """
+        thresholds = dict(spec.min_ab)
+        query = self.query(tiers, set(materials) | set(thresholds), max_ly, origin, hub)
+        systems, distanz, lichtjahre = self._system_candidates(query)
+        index = self.system_index
+        with span('rank.score'):
+            keep = np.ones(len(systems), dtype=bool)
+            abundance = np.zeros(len(systems), dtype=np.float64)
+            for position, mat_id in enumerate(sorted(query.materials)):
+                ab = index.abundance(systems, mat_id, query.tiers)
+                if mat_id in thresholds:
+                    keep &= ab >= thresholds[mat_id]
+                if position and spec.aggregate == 'min':
+                    np.minimum(abundance, ab, out=abundance)
+                else:
+                    abundance += ab
+            systems, distanz, lichtjahre = systems[keep], distanz[keep], lichtjahre[keep]
+            score = spec.abundance * abundance[keep] - spec.distance * lichtjahre
+            if spec.fert:
+                score += spec.fert * index.tier_total(index.fert, systems, query.tiers)
+            if spec.size:
+                score += spec.size * index.tier_total(index.size, systems, query.tiers)
+        return self._select_top(systems, distanz, lichtjahre, score, spec.k, query)
+
+    def _system_candidates(self, query: SearchQuery) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Passende Systeme (aufsteigende Indizes) mit Distanz in Pixeln und Lichtjahren, unsortiert."""
+        with span('systems.filter'):
+            systems = np.flatnonzero(self.system_index.covering(query.materials, query.tiers))
+        with span('systems.distance'):
+            distanz = self.system_distances(systems, query)
+            lichtjahre = distanz / self.px_to_ly
+            if query.max_ly is not None:
+                keep = lichtjahre <= query.max_ly
+                systems, distanz, lichtjahre = systems[keep], distanz[keep], lichtjahre[keep]
+        return systems, distanz, lichtjahre
+
+    def system_distances(self, systems: np.ndarray, query: SearchQuery) -> np.ndarray:
+        """Pixel-Distanz der Systeme (Systemindizes) für eine Suche."""
+        index = self.system_index
+        if query.hub == NEAREST_HUB:
+            return index.hub_nearest[systems].astype(np.float64)
+        distanz = np.hypot(index.x[systems] - query.origin[0], index.y[systems] - query.origin[1])
+        # Zu einem Hub in float32 wie die Hub-Matrix der Planeten
+        return distanz if query.hub is None else distanz.astype(np.float32).astype(np.float64)
+
+    def system(self, system: int, tiers: Iterable[int] = None) -> dict:
+        """Baut ein System-Dict (Index aus search_systems) mit Planeten-IDs und Material-Summen (optional nur erlaubte Tiers)."""
+        index = self.system_index
+        return {
+            'sId': int(index.keys[system]),
+            'x': int(index.x[system]),
+            'y': int(index.y[system]),
+            'planets': self.ids[index.planets(system, tiers)].tolist(),
+            'mats': [{'id': mat_id, 'ab': ab} for mat_id, ab in sorted(index.materials(system, tiers).items())],
+        }
+
+    def abundance(self, rows: np.ndarray, mat_id: int) -> np.ndarray:
+        """Häufigkeit (ab) eines Materials für die Zeilen; 0, wo es fehlt."""
+        # Nur die CSR-Abschnitte der angefragten Zeilen durchsehen (Zeile x Materialplatz)
+        starts = self.mat_ptr[rows]
+        counts = self.mat_ptr[rows + 1] - starts
+        width = int(counts.max()) if len(rows) else 0
+        slots = np.arange(width)
+        entries = np.minimum(starts[:, None] + slots, max(len(self.mat_ids) - 1, 0))
+        match = (slots < counts[:, None]) & (self.mat_ids[entries] == mat_id)
+        return np.where(match, self.mat_ab[entries], 0).max(axis=1, initial=0).astype(np.int32)
+
+    def _can_refine(self, previous: Optional[SearchResult], query: SearchQuery) -> bool:
+        """Nur vollständige Ergebnisse lassen sich nachfiltern (keine Ranglisten)."""
+        return previous is not None and previous.score is None and query.is_narrowing(previous.query)
+
+    def _candidate_rows(self, query: SearchQuery, mask: np.ndarray = None) -> np.ndarray:
+        """Aufsteigende Zeilen, die für die Suche in Frage kommen (optional schon maskiert)."""
+        max_ly = query.max_ly
+        if max_ly is not None and math.isfinite(max_ly) and query.hub == NEAREST_HUB:
+            # Umkreis um irgendeinen Hub: direkt über die vorberechneten Entfernungen
+            near = self.hub_nearest.astype(np.float64) / self.px_to_ly <= max_ly
+            return np.flatnonzero(near if mask is None else near & mask)
+        if max_ly is not None and math.isfinite(max_ly):
+            # Nur Planeten aus den Gitterzellen im Umkreis betrachten
+            rows = self.grid.candidates(query.origin, max(max_ly, 0.0) * self.px_to_ly)
+            return np.sort(rows if mask is None else rows[mask[rows]])
+        return np.arange(len(self.ids)) if mask is None else np.flatnonzero(mask)
+
+    def _finish(self, rows: np.ndarray, query: SearchQuery) -> SearchResult:
+        """Distanzen berechnen, Radius anwenden und nach Distanz sortieren."""
+        with span('search.distance'):
+            distanz = self.query_distances(rows, query)
+            lichtjahre = distanz / self.px_to_ly
+
+            if query.max_ly is not None:
+                keep = lichtjahre <= query.max_ly
+                rows, distanz, lichtjahre = rows[keep], distanz[keep], lichtjahre[keep]
+
+        with span('search.sort'):
+            order = np.argsort(distanz, kind='stable')
+        return SearchResult(rows[order], distanz[order], lichtjahre[order], query)
+
+    def _has_material(self, rows: np.ndarray, mat_id: int) -> np.ndarray:
+        """Bool-Array: besitzen die Zeilen das Material? (Bits direkt aus dem gepackten Bitset)"""
+        mat_bits = self.material_bits.get(mat_id)
+        if mat_bits is None:
+            return np.zeros(len(rows), dtype=bool)
+        # MSB zuerst, wie np.packbits
+        return ((mat_bits[rows >> 3] >> (7 - (rows & 7))) & 1).astype(bool)
+
+    def refine(self, previous: SearchResult, query: SearchQuery) -> SearchResult:
+        """
+        Filtert ein vorhandenes Ergebnis mit einer strengeren Suche nach.
+
+        Prüft nur die Treffer von previous (neue Materialien, weggefallene Tiers, kleinerer
+        Radius); Distanzen und Sortierung werden übernommen.
+        """
+        with span('search.refine'):
+            return self._refine(previous, query)
+
+    def _refine(self, previous: SearchResult, query: SearchQuery) -> SearchResult:
+        rows = previous.rows
+        keep = np.ones(len(rows), dtype=bool)
+        if query.tiers != previous.query.tiers:
+            keep &= np.isin(self.tier[rows], np.fromiter(query.tiers, dtype=np.int8))
+        for mat_id in query.materials - previous.query.materials:
+            keep &= self._has_material(rows, mat_id)
+        if query.max_ly is not None and query.max_ly != previous.query.max_ly:
+            keep &= previous.lichtjahre <= query.max_ly
+        return SearchResult(rows[keep], previous.distanz[keep], previous.lichtjahre[keep], query)
+
+    def planet(self, row: int) -> dict:
+        """Baut ein Planeten-Dict (wie in data.json) für eine Zeile."""
+        start, end = self.mat_ptr[row], self.mat_ptr[row + 1]
+        return {
+            'id': int(self.ids[row]),
+            'sId': int(self.sid[row]),
+            'name': self.names[row],
+            'type': int(self.type[row]),
+            'mats': [{'id': int(m), 'ab': int(a)}
+                     for m, a in zip(self.mat_ids[start:end], self.mat_ab[start:end])],
+            'fert': int(self.fert[row]),
+            'x': int(self.x[row]),
+            'y': int(self.y[row]),
+            'size': int(self.size[row]),
+            'tier': int(self.tier[row]),
+        }
+
+
+if __name__ == "__main__":
+    # Selbsttest: Ranglisten (auch mit vielen Gleichständen) gegen eine vollständige Sortierung
+    import sys
+
+    engine = GalaxyEngine.from_file(sys.argv[1] if len(sys.argv) > 1 else 'data.json')
+    counts = np.bincount(engine.mat_ids) if len(engine.mat_ids) else np.zeros(0, dtype=np.int64)
+    common = np.argsort(-counts, kind='stable')[:2].tolist()
+    zero = {'distance': 0, 'abundance': 0, 'fert': 0, 'size': 0}
+    failed = 0
+    for weights in (None, zero, {'distance': 0}, {'abundance': 0, 'size': 1}):
+        for materials, max_ly, k in (((), None, 5), ((), 30.0, 5), (common[:1], None, 50), (common, 80.0, 1)):
+            for rank in (engine.rank, engine.rank_systems):
+                spec = RankSpec.create(k, weights)
+                top = rank((1, 2, 3, 4), materials, spec, max_ly)
+                # k über der Trefferzahl: alle Zeilen werden nach (Score, Distanz, Zeile) sortiert
+                full = rank((1, 2, 3, 4), materials, spec._replace(k=len(engine) + 1), max_ly)
+                same = np.array_equal(top.rows, full.rows[:k]) and np.array_equal(top.score, full.score[:k])
+                failed += not same
+                if not same:
+                    print(f"✗ {rank.__name__} k={k} Gewichte={weights} Materialien={materials} max_ly={max_ly}")
+    print("✓ Ranglisten wie vollständige Sortierung" if not failed else f"{failed} Abweichungen")
+    sys.exit(1 if failed else 0)
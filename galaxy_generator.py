@@ -0,0 +1,201 @@
+"""
+Generator für synthetische Galaxien
+Schreibt data.json-kompatible Dateien (galaxyConfig.pxToLY, materials,
+systems[].planets[] mit mats/ab) in beliebiger Größe, z.B. für Benchmarks mit 1k bis
+1M Planeten. Die Verteilungen (Typen, Tiers, Materialien, Abstände) sind der
+ausgelieferten data.json nachempfunden; die Dichte der Systeme bleibt gleich, die
+Karte wächst mit der Planetenzahl.
+
+Aufruf: python galaxy_generator.py 100000 [-o galaxy_100k.json] [--seed 1] [--template data.json]
+"""
+
+import argparse
+import json
+import math
+import os
+from typing import Dict, Iterator
+
+import numpy as np
+
+from app_paths import resource_path
+
+# Referenz: ausgelieferte data.json (ca. 2000 Planeten auf 6500 x 2700 px)
+REFERENCE_PLANETS = 2052
+REFERENCE_WIDTH = 6500
+REFERENCE_HEIGHT = 2750
+
+# Planet-Typ -> relative Häufigkeit (Typ 1 = Exchange wird separat verteilt)
+TYPE_WEIGHTS = {2: 108, 3: 91, 4: 59, 5: 144, 6: 29, 7: 171, 8: 138, 9: 9, 10: 112, 11: 124,
+                12: 181, 13: 228, 14: 49, 15: 35, 16: 255, 17: 57, 18: 125, 19: 94, 20: 42}
+# Typen, auf denen fast immer Landwirtschaft möglich ist (fert > 0)
+FERTILE_TYPES = {10, 19, 20}
+
+TIER_WEIGHTS = {1: 669, 2: 439, 3: 439, 4: 504}
+MAT_COUNT_WEIGHTS = {1: 328, 2: 598, 3: 643, 4: 482}
+
+# Abbaubare Rohstoffe mit Häufigkeit (Fallback, falls keine Vorlage vorhanden)
+RAW_MATERIAL_WEIGHTS = {11: 668, 34: 638, 7: 584, 1: 581, 24: 509, 8: 508, 42: 416, 32: 385,
+                        5: 307, 69: 178, 45: 123, 40: 97, 75: 95, 22: 92, 67: 82, 70: 65, 23: 53}
+
+# Ein Exchange-Planet auf so viele Planeten
+PLANETS_PER_HUB = 2000
+
+SYSTEM_NAMES = ['Aetheria', 'Reverie', 'Seashell', 'Tidal', 'Void', 'Zion', 'Nova', 'Helix',
+                'Ember', 'Lumen', 'Orion', 'Vesper', 'Cinder', 'Halcyon', 'Nimbus', 'Solace']
+
+
+def _weighted(rng: np.random.Generator, weights: Dict[int, int], count: int) -> np.ndarray:
+    keys = np.fromiter(weights, dtype=np.int64)
+    probs = np.array(list(weights.values()), dtype=np.float64)
+    return rng.choice(keys, size=count, p=probs / probs.sum())
+
+
+def _raw_materials(rng: np.random.Generator, mat_counts: np.ndarray, block: int = 65536) -> np.ndarray:
+    """
+    Zieht pro Planet Rohstoffe ohne Zurücklegen, gewichtet nach Häufigkeit.
+
+    Gumbel-Top-k: Rang nach log(Gewicht) + Gumbel-Rauschen; die ersten mat_counts[i]
+    Spalten einer Zeile sind die Materialien von Planet i (blockweise für wenig Speicher).
+    """
+    keys = np.fromiter(RAW_MATERIAL_WEIGHTS, dtype=np.int64)
+    log_weights = np.log(np.array(list(RAW_MATERIAL_WEIGHTS.values()), dtype=np.float64))
+    width = int(mat_counts.max()) if len(mat_counts) else 0
+    chosen = np.empty((len(mat_counts), width), dtype=np.int64)
+    for start in range(0, len(mat_counts), block):
+        noise = rng.gumbel(size=(min(block, len(mat_counts) - start), len(keys)))
+        order = np.argsort(-(log_weights + noise), axis=1)[:, :width]
+        chosen[start:start + block] = keys[order]
+    return chosen
+
+
+def load_template(path: str = None) -> dict:
+    """Materialliste und galaxyConfig aus einer vorhandenen data.json (falls vorhanden)."""
+    path = path or resource_path('data.json')
+    if not os.path.exists(path):
+        return {'materials': [{'id': mat_id, 'name': f"Material {mat_id}", 'source': 1}
+                              for mat_id in RAW_MATERIAL_WEIGHTS],
+                'galaxyConfig': {'pxToLY': 45}}
+    with open(path, 'r', encoding='utf-8') as f:
+        daten = json.load(f)
+    return {'materials': daten.get('materials', []), 'galaxyConfig': daten['galaxyConfig']}
+
+
+def generate_systems(planet_count: int, seed: int = 0) -> Iterator[dict]:
+    """
+    Erzeugt Sternsysteme mit insgesamt planet_count Planeten.
+
+    Args:
+        planet_count: Gesamtzahl der Planeten
+        seed: Startwert des Zufallsgenerators (gleicher Seed = gleiche Galaxie)
+
+    Returns:
+        Iterator über System-Dicts im Format von data.json
+    """
+    rng = np.random.default_rng(seed)
+    scale = math.sqrt(max(planet_count, 1) / REFERENCE_PLANETS)
+    width, height = REFERENCE_WIDTH * scale, REFERENCE_HEIGHT * scale
+
+    # Planeten pro System (wie in data.json: meist 3-5), dazu etwa gleich viele leere Systeme
+    sizes = np.maximum(rng.poisson(4.2, size=max(planet_count, 1)), 1)
+    ends = np.cumsum(sizes)
+    last = int(np.searchsorted(ends, planet_count))
+    sizes = sizes[:last + 1] if planet_count else sizes[:0]
+    if len(sizes):
+        sizes[-1] -= ends[last] - planet_count
+    system_count = len(sizes) * 2
+
+    hubs = set(rng.choice(planet_count, size=min(planet_count, max(1, planet_count // PLANETS_PER_HUB)),
+                          replace=False).tolist()) if planet_count else set()
+
+    # Alle Zufallswerte vektorisiert vorab ziehen
+    types = _weighted(rng, TYPE_WEIGHTS, planet_count)
+    types[list(hubs)] = 1
+    tiers = _weighted(rng, TIER_WEIGHTS, planet_count)
+    tiers[types == 1] = 0
+    mat_counts = _weighted(rng, MAT_COUNT_WEIGHTS, planet_count)
+    mat_ids = _raw_materials(rng, mat_counts)
+    # Häufigkeiten absteigend wie in data.json
+    abundances = rng.integers(3, 120, size=mat_ids.shape) * rng.uniform(0.2, 1.5, size=mat_ids.shape)
+    abundances = np.maximum(-np.sort(-abundances, axis=1).astype(np.int64), 3)
+    fertile = np.isin(types, list(FERTILE_TYPES)) | (rng.random(planet_count) < 0.02)
+    ferts = np.where(fertile, rng.integers(20, 330, size=planet_count), 0)
+    planet_sizes = rng.choice([6, 7, 8, 9, 10], size=planet_count, p=[.21, .39, .28, .09, .03])
+    offsets = rng.uniform(-37, 37, size=(planet_count, 2)).round().astype(np.int64)
+    system_xy = rng.uniform((75, 75), (max(width, 150), max(height, 150)), size=(system_count, 2)).round()
+    system_v = rng.integers(1, 5, size=system_count)
+    planet_systems = set(rng.choice(system_count, size=len(sizes), replace=False).tolist())
+
+    planet_index = 0
+    size_iter = iter(sizes.tolist())
+    for system_index in range(system_count):
+        sys_x, sys_y = int(system_xy[system_index, 0]), int(system_xy[system_index, 1])
+        name = f"{SYSTEM_NAMES[system_index % len(SYSTEM_NAMES)]} {system_index // len(SYSTEM_NAMES) + 1}"
+        system = {'id': system_index + 1, 'name': name, 'x': sys_x, 'y': sys_y,
+                  'v': int(system_v[system_index])}
+        if system_index not in planet_systems:
+            system['planets'] = None
+            yield system
+            continue
+
+        planets = []
+        for number in range(1, next(size_iter) + 1):
+            i = planet_index
+            count = int(mat_counts[i])
+            planets.append({
+                'id': i + 1,
+                'sId': system_index + 1,
+                'name': f"{name} {number}",
+                'type': int(types[i]),
+                'mats': [{'id': int(m), 'ab': int(a)} for m, a in zip(mat_ids[i, :count], abundances[i, :count])],
+                'fert': int(ferts[i]),
+                'x': sys_x + int(offsets[i, 0]),
+                'y': sys_y + int(offsets[i, 1]),
+                'size': int(planet_sizes[i]),
+                'tier': int(tiers[i]),
+            })
+            planet_index += 1
+        system['planets'] = planets
+        yield system
+
+
+def write_galaxy(path: str, planet_count: int, seed: int = 0, template: dict = None) -> str:
+    """
+    Schreibt eine Galaxie als data.json-kompatible Datei (systemweise gestreamt).
+
+    Args:
+        path: Zieldatei
+        planet_count: Gesamtzahl der Planeten
+        seed: Startwert des Zufallsgenerators
+        template: Materialien und galaxyConfig (Standard: aus der ausgelieferten data.json)
+
+    Returns:
+        Pfad der geschriebenen Datei
+    """
+    template = template or load_template()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('{"galaxyConfig": ')
+        json.dump(template['galaxyConfig'], f)
+        f.write(', "materials": ')
+        json.dump(template['materials'], f, ensure_ascii=False)
+        f.write(', "systems": [')
+        for index, system in enumerate(generate_systems(planet_count, seed)):
+            if index:
+                f.write(', ')
+            json.dump(system, f, ensure_ascii=False)
+        f.write(']}')
+    os.replace(tmp_path, path)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Erzeugt eine synthetische data.json")
+    parser.add_argument('planets', type=int, help="Anzahl Planeten (z.B. 1000 bis 1000000)")
+    parser.add_argument('-o', '--output', help="Zieldatei (Standard: galaxy_<planets>.json)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--template', help="data.json, aus der Materialien und galaxyConfig stammen")
+    args = parser.parse_args()
+
+    target = write_galaxy(args.output or f"galaxy_{args.planets}.json", args.planets, args.seed,
+                          load_template(args.template))
+    print(f"Galaxie geschrieben: {target} ({args.planets} Planeten, {os.path.getsize(target)} Bytes)")
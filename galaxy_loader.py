@@ -0,0 +1,95 @@
+"""
+Laden der Galaxie im Hintergrund
+Ein QRunnable liest data.json gestreamt weiter (galaxy_snapshot.iter_load_engine) und
+meldet Fortschritt und wachsende Zwischenstände per Signal an den GUI-Thread. Das
+Fenster ist damit schon bedienbar, während spätere Systeme noch geladen werden.
+Ein zweites QRunnable liest einen geänderten Stand von data.json zur Laufzeit ein
+(galaxy_snapshot.reload_engine).
+"""
+
+import time
+from typing import Iterator, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from galaxy_engine import GalaxyEngine
+from galaxy_snapshot import reload_engine
+
+
+class LoadSignals(QObject):
+    """Signale des Lade-Workers."""
+    progress = pyqtSignal(float)  # Fortschritt 0..1 (ohne neuen Zwischenstand)
+    partial = pyqtSignal(object, float)  # Zwischenstand (GalaxyEngine), Fortschritt
+    finished = pyqtSignal(object)  # vollständige GalaxyEngine
+    failed = pyqtSignal(str)  # Fehlermeldung
+
+
+class GalaxyLoadTask(QRunnable):
+    """Arbeitet einen begonnenen Lade-Iterator ab; cancel() beendet ihn beim nächsten Schritt."""
+
+    def __init__(self, steps: Iterator[Tuple[float, Optional[GalaxyEngine]]]):
+        """
+        Args:
+            steps: Iterator aus iter_load_engine (der erste Zwischenstand ist schon entnommen)
+        """
+        super().__init__()
+        self.steps = steps
+        self.cancelled = False
+        self.signals = LoadSignals()
+
+    def cancel(self):
+        """Bricht das Laden ab (Fenster geschlossen)."""
+        self.cancelled = True
+
+    def run(self):
+        try:
+            for progress, engine in self.steps:
+                if self.cancelled:
+                    self.steps.close()
+                    return
+                if engine is None:
+                    self.signals.progress.emit(progress)
+                elif progress < 1.0:
+                    self.signals.partial.emit(engine, progress)
+                else:
+                    self.signals.finished.emit(engine)
+        except (OSError, ValueError, KeyError) as e:
+            if not self.cancelled:
+                self.signals.failed.emit(str(e))
+
+
+class ReloadSignals(QObject):
+    """Signale des Neu-Einlesens."""
+    finished = pyqtSignal(object, object, float)  # Engine des neuen Stands, GalaxyDiff, Sekunden
+    failed = pyqtSignal(str)  # Fehlermeldung
+
+
+class GalaxyReloadTask(QRunnable):
+    """Liest data.json neu ein und gleicht den Stand mit der geladenen Engine ab."""
+
+    def __init__(self, engine: GalaxyEngine, data_path: str):
+        """
+        Args:
+            engine: Geladene Galaxie (wird nicht verändert)
+            data_path: Pfad zu data.json
+        """
+        super().__init__()
+        self.engine = engine
+        self.data_path = data_path
+        self.cancelled = False
+        self.signals = ReloadSignals()
+
+    def cancel(self):
+        """Ergebnis verwerfen (Fenster geschlossen)."""
+        self.cancelled = True
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            engine, diff = reload_engine(self.engine, self.data_path)
+        except (OSError, ValueError, KeyError) as e:
+            if not self.cancelled:
+                self.signals.failed.emit(str(e))
+            return
+        if not self.cancelled:
+            self.signals.finished.emit(engine, diff, time.perf_counter() - start)
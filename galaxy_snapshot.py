@@ -0,0 +1,241 @@
+"""
+Binärer Snapshot von data.json
+Kompiliert die Galaxie-Daten in eine kompakte Datei (Planeten-Records fester Breite,
+Material- und Namenstabellen, Entfernungen zu den Hubs), die per mmap ohne JSON-Parsing
+geladen wird.
+Der Snapshot ist dem SHA-256 der Quelldatei zugeordnet und wird automatisch
+neu gebaut, sobald sich data.json ändert. Ändert sich data.json zur Laufzeit, gleicht
+reload_engine den neuen Stand mit der geladenen Engine ab (galaxy_diff).
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from app_paths import cache_dir, file_hash
+from galaxy_diff import GalaxyDiff
+from galaxy_engine import PARTIAL_FIRST_ROWS, GalaxyEngine, NameTable, read_columns
+from tracing import span
+
+SNAPSHOT_MAGIC = b'GTPFSNAP'
+SNAPSHOT_VERSION = 2
+
+# magic, version, sha256 der Quelle, pxToLY, Anzahl Planeten/Material-Einträge/Systeme,
+# Länge Namensblock, Länge Metadaten (JSON), Anzahl Hubs, Zeilen der Hub-Distanzmatrix (0 = keine)
+HEADER = struct.Struct('<8sI32sdQQQQQQQ')
+
+# Planeten-Record fester Breite (40 Bytes)
+PLANET_DTYPE = np.dtype([
+    ('ids', '<i8'), ('sid', '<i8'), ('x', '<f8'), ('y', '<f8'),
+    ('tier', 'i1'), ('type', '<i2'), ('fert', '<i2'), ('size', '<i2'), ('pad', 'u1'),
+])
+SYSTEM_DTYPE = np.dtype([('system_ids', '<i8'), ('system_x', '<f8'), ('system_y', '<f8')])
+
+
+def snapshot_path(source_hash: bytes) -> str:
+    """Pfad des Snapshots für einen Quell-Hash im Cache-Verzeichnis."""
+    return os.path.join(cache_dir('snapshots'), f"galaxy-{source_hash.hex()[:16]}.snap")
+
+
+def _pad(n: int) -> int:
+    """Auffüllen auf 8-Byte-Grenzen, damit alle Arrays ausgerichtet bleiben."""
+    return -n % 8
+
+
+def write_snapshot(engine: GalaxyEngine, path: str, source_hash: bytes):
+    """Schreibt die Spalten einer Engine als Snapshot (atomar über eine temporäre Datei)."""
+    n = len(engine)
+    records = np.zeros(n, dtype=PLANET_DTYPE)
+    for name in ('ids', 'sid', 'x', 'y', 'tier', 'type', 'fert', 'size'):
+        records[name] = getattr(engine, name)
+    systems = np.zeros(len(engine.system_ids), dtype=SYSTEM_DTYPE)
+    for name in SYSTEM_DTYPE.names:
+        systems[name] = getattr(engine, name)
+
+    names = engine.names if isinstance(engine.names, NameTable) else NameTable.from_names(engine.names)
+    meta = json.dumps({'materials': engine.materials}).encode('utf-8')
+
+    sections = [
+        records.tobytes(),
+        np.ascontiguousarray(engine.mat_ptr, dtype='<i8').tobytes(),
+        np.ascontiguousarray(engine.mat_ids, dtype='<i4').tobytes(),
+        np.ascontiguousarray(engine.mat_ab, dtype='<i4').tobytes(),
+        systems.tobytes(),
+        np.ascontiguousarray(names.ptr, dtype='<i8').tobytes(),
+        bytes(names.blob),
+        meta,
+        np.ascontiguousarray(engine.hub_rows, dtype='<i8').tobytes(),
+        np.ascontiguousarray(engine.hub_nearest, dtype='<f4').tobytes(),
+        np.ascontiguousarray(engine.hub_nearest_index, dtype='<i4').tobytes(),
+    ]
+    matrix_rows = 0
+    if engine.hub_matrix is not None:
+        matrix_rows = len(engine.hub_matrix)
+        sections.append(np.ascontiguousarray(engine.hub_matrix, dtype='<f4').tobytes())
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, source_hash, engine.px_to_ly,
+                            n, len(engine.mat_ids), len(engine.system_ids), len(names.blob), len(meta),
+                            len(engine.hub_rows), matrix_rows))
+        f.write(b'\0' * _pad(HEADER.size))
+        for section in sections:
+            f.write(section)
+            f.write(b'\0' * _pad(len(section)))
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str, source_hash: bytes = None) -> GalaxyEngine:
+    """
+    Lädt einen Snapshot per mmap. Die Spalten sind Sichten auf die gemappte Datei.
+
+    Raises:
+        ValueError: Wenn die Datei kein gültiger Snapshot (oder für eine andere Quelle) ist
+    """
+    with open(path, 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(buf) < HEADER.size:
+        raise ValueError(f"Snapshot zu kurz: {path}")
+    magic, version, stored_hash, px_to_ly, n, n_mats, n_systems, names_len, meta_len, n_hubs, matrix_rows = \
+        HEADER.unpack_from(buf, 0)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unbekanntes Snapshot-Format: {path}")
+    if source_hash is not None and stored_hash != source_hash:
+        raise ValueError(f"Snapshot passt nicht zur Quelldatei: {path}")
+
+    offset = HEADER.size + _pad(HEADER.size)
+
+    def take(dtype, count):
+        nonlocal offset
+        arr = np.frombuffer(buf, dtype=dtype, count=count, offset=offset)
+        offset += arr.nbytes + _pad(arr.nbytes)
+        return arr
+
+    records = take(PLANET_DTYPE, n)
+    mat_ptr = take('<i8', n + 1)
+    mat_ids = take('<i4', n_mats)
+    mat_ab = take('<i4', n_mats)
+    systems = take(SYSTEM_DTYPE, n_systems)
+    name_ptr = take('<i8', n + 1)
+    names_blob = memoryview(buf)[offset:offset + names_len]
+    offset += names_len + _pad(names_len)
+    meta = json.loads(bytes(buf[offset:offset + meta_len]).decode('utf-8'))
+    offset += meta_len + _pad(meta_len)
+    hub_rows = take('<i8', n_hubs)
+    hub_nearest = take('<f4', n)
+    hub_nearest_index = take('<i4', n)
+    hub_matrix = take('<f4', matrix_rows * n).reshape(matrix_rows, n) if matrix_rows else None
+
+    columns = {name: records[name] for name in ('ids', 'sid', 'x', 'y', 'tier', 'type', 'fert', 'size')}
+    columns.update({name: systems[name] for name in SYSTEM_DTYPE.names})
+    columns.update({
+        'names': NameTable(names_blob, name_ptr),
+        'mat_ptr': mat_ptr,
+        'mat_ids': mat_ids,
+        'mat_ab': mat_ab,
+        'hub_rows': hub_rows,
+        'hub_nearest': hub_nearest,
+        'hub_nearest_index': hub_nearest_index,
+        'hub_matrix': hub_matrix,
+    })
+    engine = GalaxyEngine.from_columns(meta['materials'], px_to_ly, columns)
+    # Referenz halten, solange die Spalten auf die gemappte Datei zeigen
+    engine.snapshot_buffer = buf
+    return engine
+
+
+def compile_snapshot(data_path: str, out_path: str = None) -> str:
+    """Kompiliert data.json in einen Snapshot und gibt dessen Pfad zurück."""
+    source_hash = file_hash(data_path)
+    out_path = out_path or snapshot_path(source_hash)
+    write_snapshot(GalaxyEngine.from_file(data_path), out_path, source_hash)
+    return out_path
+
+
+def load_engine(data_path: str) -> GalaxyEngine:
+    """
+    Lädt die Galaxie bevorzugt aus dem Snapshot.
+
+    Fehlt der Snapshot oder gehört er zu einem anderen Stand von data.json, wird die
+    JSON-Datei gestreamt geparst und der Snapshot für den nächsten Start neu geschrieben.
+    """
+    for _, engine in iter_load_engine(data_path, partial_rows=None):
+        if engine is not None:
+            return engine
+
+
+def iter_load_engine(data_path: str, partial_rows: Optional[int] = PARTIAL_FIRST_ROWS
+                     ) -> Iterator[Tuple[float, Optional[GalaxyEngine]]]:
+    """
+    Wie load_engine, liefert beim Parsen von data.json aber Fortschritt und Zwischenstände.
+
+    Returns:
+        Iterator wie GalaxyEngine.iter_file; mit gültigem Snapshot nur (1.0, Engine)
+    """
+    source_hash = file_hash(data_path)
+    try:
+        engine = read_snapshot(snapshot_path(source_hash), source_hash)
+    except (OSError, ValueError):
+        engine = None
+    if engine is not None:
+        yield 1.0, engine
+        return
+
+    for progress, engine in GalaxyEngine.iter_file(data_path, partial_rows):
+        if progress < 1.0:
+            yield progress, engine
+    _store_snapshot(engine, source_hash)
+    yield 1.0, engine
+
+
+def reload_engine(engine: GalaxyEngine, data_path: str) -> Tuple[GalaxyEngine, GalaxyDiff]:
+    """
+    Liest einen neuen Stand von data.json und gleicht ihn mit der geladenen Engine ab.
+
+    Nur geänderte, neue und entfernte Planeten werden in die Indizes eingearbeitet; die
+    übergebene Engine bleibt unverändert. Der Snapshot wird für den neuen Stand geschrieben.
+
+    Returns:
+        (Engine des neuen Stands - ohne Änderungen die übergebene, Abgleich)
+    """
+    source_hash = file_hash(data_path)
+    with span('reload.read'):
+        materials, px_to_ly, columns = read_columns(data_path)
+    with span('reload.diff'):
+        diff = GalaxyDiff(engine, materials, px_to_ly, columns)
+    if diff:
+        with span('reload.patch'):
+            engine = diff.apply()
+    if not os.path.exists(snapshot_path(source_hash)):
+        _store_snapshot(engine, source_hash)
+    return engine, diff
+
+
+def _store_snapshot(engine: GalaxyEngine, source_hash: bytes):
+    """Schreibt den Snapshot für den nächsten Start und entfernt veraltete."""
+    try:
+        path = snapshot_path(source_hash)
+        write_snapshot(engine, path, source_hash)
+        # Veraltete Snapshots anderer data.json Stände entfernen
+        folder = os.path.dirname(path)
+        for name in os.listdir(folder):
+            if name.endswith('.snap') and os.path.join(folder, name) != path:
+                try:
+                    os.remove(os.path.join(folder, name))
+                except OSError:
+                    # Noch von der laufenden Engine gemappt (Windows): beim nächsten Start
+                    pass
+    except OSError as e:
+        print(f"Snapshot konnte nicht geschrieben werden: {e}")
+
+if __name__ == "__main__":
+    # Aufruf: python galaxy_snapshot.py [data.json] [ausgabe.snap]
+    source = sys.argv[1] if len(sys.argv) > 1 else 'data.json'
+    target = compile_snapshot(source, sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"Snapshot geschrieben: {target} ({os.path.getsize(target)} Bytes)")
@@ -0,0 +1,202 @@
+"""
+Zeitmessung der GUI ohne Bildschirm
+Startet PlanetFinderPyQt mit QT_QPA_PLATFORM=offscreen, spielt typische Sitzungen
+ab (Materialien umschalten, suchen, Ergebnisse scrollen, Planeten auswählen) und misst
+Zeit bis zum Fenster, Zeit bis zur ersten Suche sowie die Latenz jeder Interaktion
+(Perzentile). Überschreitet ein Wert das Budget, endet das Skript mit Exit-Code 1.
+
+Aufruf: python gui_harness.py [--budget gui_budget.json] [--report bericht.json] [--rounds 50]
+"""
+
+import os
+import sys
+import time
+
+# Muss vor dem ersten Qt-Import gesetzt sein
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+START = time.perf_counter()
+
+import argparse
+import json
+import random
+from typing import Callable, Dict, List
+
+from PyQt6.QtWidgets import QApplication
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Abbruch, falls eine Suche nicht fertig wird
+SEARCH_TIMEOUT = 30.0
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Perzentil mit linearer Interpolation (wie numpy.percentile)."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    summary = {f'p{p}_ms': round(percentile(values, p), 3) for p in PERCENTILES}
+    summary['max_ms'] = round(max(values), 3) if values else 0.0
+    summary['count'] = len(values)
+    return summary
+
+
+class GuiSession:
+    """Steuert ein Fenster und misst die Dauer einzelner Interaktionen."""
+
+    def __init__(self, app: QApplication, window, seed: int = 0):
+        self.app = app
+        self.window = window
+        self.rng = random.Random(seed)
+        self.latencies: Dict[str, List[float]] = {}
+
+    def wait_for_search(self):
+        """Ereignisschleife laufen lassen, bis die Hintergrund-Suche fertig ist."""
+        deadline = time.perf_counter() + SEARCH_TIMEOUT
+        while self.window.search_task is not None or self.window.search_timer.isActive():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("Suche wurde nicht fertig")
+            self.app.processEvents()
+            time.sleep(0.0005)
+        self.app.processEvents()
+
+    def timed(self, name: str, action: Callable[[], None]):
+        start = time.perf_counter()
+        action()
+        self.app.processEvents()
+        self.latencies.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+
+    def search(self):
+        """Suche sofort starten (ohne Debounce) und auf das Ergebnis warten."""
+        self.window.search_planets()
+        self.wait_for_search()
+
+    # --- Interaktionen -------------------------------------------------------------
+
+    def toggle_material(self):
+        buttons = list(self.window.material_buttons.values())
+        if not buttons:
+            return
+        # Höchstens zwei Materialien aktiv, sonst bleibt die Ergebnisliste leer
+        if len(self.window.selected_materials) >= 2:
+            button = next(b for m, b in self.window.material_buttons.items() if m in self.window.selected_materials)
+        else:
+            button = self.rng.choice(buttons)
+        self.timed('toggle_material', lambda: (button.click(), self.search()))
+
+    def toggle_tier(self):
+        boxes = self.window.tier_checkboxes
+        checked = [cb for cb in boxes if cb.isChecked()]
+        box = self.rng.choice(boxes)
+        if box.isChecked() and len(checked) == 1:
+            return
+        self.timed('toggle_tier', lambda: (box.setChecked(not box.isChecked()), self.search()))
+
+    def set_distance(self):
+        text = self.rng.choice(['', '10', '25', '50', '100'])
+        self.timed('set_distance', lambda: (self.window.max_distanz_input.setText(text), self.search()))
+
+    def scroll_results(self):
+        view = self.window.results_view
+        bar = view.verticalScrollBar()
+        target = self.rng.randint(bar.minimum(), bar.maximum()) if bar.maximum() > 0 else 0
+        self.timed('scroll_results', lambda: (bar.setValue(target), view.viewport().repaint()))
+
+    def select_planet(self):
+        model = self.window.results_model
+        if not model.rowCount():
+            return
+        row = self.rng.randrange(model.rowCount())
+        self.timed('select_planet', lambda: self.window.results_view.selectRow(row))
+
+    def run(self, rounds: int):
+        actions = [self.toggle_material, self.toggle_tier, self.set_distance,
+                   self.scroll_results, self.select_planet, self.select_planet, self.scroll_results]
+        for _ in range(rounds):
+            self.rng.choice(actions)()
+
+
+def run_harness(rounds: int, seed: int) -> dict:
+    app = QApplication.instance() or QApplication(sys.argv)
+    import gui_pyqt
+
+    window = gui_pyqt.PlanetFinderPyQt()
+    window.show()
+    app.processEvents()
+    time_to_window = (time.perf_counter() - START) * 1000
+
+    session = GuiSession(app, window, seed)
+    start = time.perf_counter()
+    session.search()
+    time_to_first_search = (time.perf_counter() - START) * 1000
+    first_search = (time.perf_counter() - start) * 1000
+
+    session.run(rounds)
+    window.close()
+    app.processEvents()
+
+    return {
+        'time_to_window_ms': round(time_to_window, 3),
+        'time_to_first_search_ms': round(time_to_first_search, 3),
+        'first_search_ms': round(first_search, 3),
+        'interactions': {name: summarize(values) for name, values in sorted(session.latencies.items())},
+        'meta': {'rounds': rounds, 'seed': seed, 'platform': os.environ.get('QT_QPA_PLATFORM')},
+    }
+
+
+def check_budget(report: dict, budget: dict) -> List[str]:
+    """Vergleicht den Bericht mit dem Budget und gibt alle Überschreitungen zurück."""
+    failures = []
+    for key in ('time_to_window_ms', 'time_to_first_search_ms', 'first_search_ms'):
+        limit = budget.get(key)
+        if limit is not None and report[key] > limit:
+            failures.append(f"{key}: {report[key]:.1f} ms > {limit} ms")
+    for name, limits in budget.get('interactions', {}).items():
+        measured = report['interactions'].get(name)
+        if measured is None:
+            continue
+        for key, limit in limits.items():
+            if measured.get(key, 0) > limit:
+                failures.append(f"{name}.{key}: {measured[key]:.1f} ms > {limit} ms")
+    return failures
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="GUI-Zeitmessung ohne Bildschirm")
+    parser.add_argument('--budget', help="JSON mit Obergrenzen (z.B. gui_budget.json)")
+    parser.add_argument('--report', help="Bericht als JSON speichern")
+    parser.add_argument('--rounds', type=int, default=60, help="Anzahl zufälliger Interaktionen")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    report = run_harness(args.rounds, args.seed)
+    print(f"Fenster nach {report['time_to_window_ms']:.0f} ms, "
+          f"erste Suche nach {report['time_to_first_search_ms']:.0f} ms")
+    for name, summary in report['interactions'].items():
+        print(f"  {name:<16} n={summary['count']:<4} p50={summary['p50_ms']:.1f} ms "
+              f"p95={summary['p95_ms']:.1f} ms max={summary['max_ms']:.1f} ms")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.budget:
+        with open(args.budget, 'r', encoding='utf-8') as f:
+            failures = check_budget(report, json.load(f))
+        if failures:
+            print("Budget überschritten:")
+            for failure in failures:
+                print(f"  {failure}")
+            return 1
+        print("✓ Budget eingehalten")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
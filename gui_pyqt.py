@@ -1,36 +1,46 @@
-import sys
-import json
-import math
 import os
+import sys
+import multiprocessing
 from typing import Set
+import numpy as np
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QPushButton, QCheckBox,
-                             QLineEdit, QTreeWidget, QTreeWidgetItem, QTextEdit,
-                             QGroupBox, QGridLayout, QScrollArea, QFrame)
-from PyQt6.QtCore import Qt, QSize
-from PyQt6.QtGui import QIcon, QPixmap, QFont
+                             QLineEdit, QComboBox, QSpinBox, QDoubleSpinBox, QTableView,
+                             QAbstractItemView, QTextEdit,
+                             QGroupBox, QGridLayout, QScrollArea, QFrame, QHeaderView, QProgressBar)
+from PyQt6.QtCore import Qt, QFileSystemWatcher, QSize, QThreadPool, QTimer
+from PyQt6.QtGui import QIcon, QImage, QPixmap, QFont, QPainter, QColor, QKeySequence, QShortcut
 from icon_mapper import get_svg_id_for_material
-
-# PyInstaller Pfad-Fix
-def resource_path(relative_path):
-    """Gibt den absoluten Pfad zur Ressource zurück, funktioniert für dev und PyInstaller."""
-    try:
-        # PyInstaller erstellt einen temp Ordner und speichert den Pfad in _MEIPASS
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
-
-# SVG zu PNG Konvertierung
-try:
-    from cairosvg import svg2png
-    from PIL import Image
-    from io import BytesIO
-    import xml.etree.ElementTree as ET
-    USE_CAIRO = True
-except ImportError:
-    USE_CAIRO = False
-    print("CairoSVG/PIL nicht verfügbar - Icons werden nicht angezeigt")
+from galaxy_engine import EXCHANGE_X, EXCHANGE_Y, NEAREST_HUB, RANK_K, RankSpec
+from galaxy_snapshot import iter_load_engine
+from galaxy_loader import GalaxyLoadTask, GalaxyReloadTask
+from app_paths import resource_path
+from icon_cache import IconDiskCache
+from svg_sprite import SvgSprite, SPRITE_FILE
+from results_model import PlanetTableModel, HEADERS
+
+# SVG zu Pixel Konvertierung (cairo oder QtSvg, je nach Verfügbarkeit)
+from icon_render import HAVE_RENDERER, RenderedIcon, icon_to_qimage, render_icon
+from icon_loader import IconLoadTask
+from search_worker import SearchTask
+from trace_dialog import TraceDialog
+from cluster_dialog import ClusterDialog
+from system_dialog import SystemDialog
+from tracing import span, traced
+if not HAVE_RENDERER:
+    print("Kein SVG-Renderer verfügbar - Icons werden nicht angezeigt")
+
+# Wartezeit nach der letzten Filteränderung, bevor die Live-Suche startet
+SEARCH_DEBOUNCE_MS = 150
+# Wartezeit nach der letzten Änderung an data.json, bevor sie neu eingelesen wird
+RELOAD_DEBOUNCE_MS = 500
+
+
+def icon_to_pixmap(icon: RenderedIcon, dpr: float = 1.0) -> QPixmap:
+    """Baut aus dem Pixelpuffer eines gerasterten Icons ein QPixmap (fromImage kopiert die Pixel)."""
+    pixmap = QPixmap.fromImage(icon_to_qimage(icon))
+    pixmap.setDevicePixelRatio(dpr)
+    return pixmap
 
 
 class PlanetFinderPyQt(QMainWindow):
@@ -39,89 +49,181 @@ class PlanetFinderPyQt(QMainWindow):
         self.setWindowTitle("🌍 Planet Finder - Galactic Tycoons")
         self.setMinimumSize(1600, 900)
 
-        # Daten laden
-        with open(resource_path('data.json'), 'r', encoding='utf-8') as f:
-            self.daten = json.load(f)
+        # Daten laden (binärer Snapshot, wird bei Änderungen an data.json neu gebaut). Ohne
+        # Snapshot wird data.json gestreamt: das Fenster startet mit dem ersten Zwischenstand,
+        # der Rest lädt im Hintergrund (GalaxyLoadTask)
+        with span('load_engine'):
+            self.data_path = resource_path('data.json')
+            self.load_steps = iter_load_engine(self.data_path)
+            self.load_progress, self.engine = next((p, e) for p, e in self.load_steps if e is not None)
+        self.load_task = None
 
         # SVG Icons laden
-        self.svg_root = None
-        self.svg_ns = {'svg': 'http://www.w3.org/2000/svg'}
+        self.sprite = None
         self.icon_cache = {}
+        self.icon_task = None
+
+        # Gerasterte Icons auf der Festplatte (überlebt Neustarts)
+        try:
+            self.disk_cache = IconDiskCache(resource_path(SPRITE_FILE))
+        except OSError as e:
+            self.disk_cache = None
+            print(f"Icon-Cache nicht verfügbar: {e}")
 
         try:
-            tree = ET.parse(resource_path('sprite-D4k0byZ2.svg'))
-            self.svg_root = tree.getroot()
+            self.sprite = SvgSprite(resource_path(SPRITE_FILE))
         except Exception as e:
             print(f"Fehler beim Laden der SVG Datei: {e}")
 
         # Koordinaten
-        self.EXCHANGE_X = 3301
-        self.EXCHANGE_Y = 1409
-        self.PX_TO_LY = self.daten['galaxyConfig']['pxToLY']
+        self.EXCHANGE_X = EXCHANGE_X
+        self.EXCHANGE_Y = EXCHANGE_Y
+        self.PX_TO_LY = self.engine.px_to_ly
 
         # Verfügbare Materialien sammeln
         self.available_materials = self.get_available_materials()
         self.selected_materials: Set[int] = set()
         self.material_buttons = {}
-        self.planeten_liste = []
+        self.ausgewaehlte_id = None  # Planet-ID (Ursprung "Ausgewählter Planet")
+        self.letztes_ergebnis = None
+
+        # Live-Suche: Eingaben werden gesammelt und nach kurzer Pause ausgewertet
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.search_planets)
+
+        # Suche im Hintergrund: eigener Pool mit einem Thread, neue Suchen lösen alte ab
+        self.search_pool = QThreadPool(self)
+        self.search_pool.setMaxThreadCount(1)
+        self.search_task = None
+        self.search_generation = 0
+
+        # data.json beobachten: ein neuer Stand wird im Hintergrund abgeglichen und eingespielt
+        self.reload_task = None
+        self.reload_notice = None  # Meldung zum Neu-Einlesen, angehängt an das nächste Suchergebnis
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(RELOAD_DEBOUNCE_MS)
+        self.reload_timer.timeout.connect(self.start_reload)
+        self.data_watcher = QFileSystemWatcher([self.data_path], self)
+        self.data_watcher.fileChanged.connect(lambda *_: self.reload_timer.start())
 
         # UI erstellen
         self.init_ui()
 
+    @traced('get_available_materials')
     def get_available_materials(self) -> Set[int]:
         """Sammelt alle Material-IDs, die auf Planeten vorkommen."""
-        material_ids = set()
-        for system in self.daten.get('systems', []):
-            planets = system.get('planets')
-            if planets is None:
-                continue
-            for planet in planets:
-                mats = planet.get('mats')
-                if mats:
-                    for mat in mats:
-                        material_ids.add(mat['id'])
-        return material_ids
+        return self.engine.available_materials()
 
     def load_icon(self, mat_id: int, mat_name: str, size: int = 24) -> QPixmap:
         """Lädt ein Icon für ein Material."""
-        if not USE_CAIRO or not self.svg_root:
-            return None
-
         cache_key = f"{mat_id}_{size}"
-        if cache_key in self.icon_cache:
-            return self.icon_cache[cache_key]
+        with span('load_icon') as s:
+            if cache_key in self.icon_cache:
+                s.set(cache='hit')
+                return self.icon_cache[cache_key]
+            s.set(cache='miss')
+
+            svg_id = get_svg_id_for_material(mat_id, mat_name)
+            if svg_id is None:
+                return None
+
+            pixmap = self.load_svg_pixmap(svg_id, size)
+            if pixmap is not None:
+                self.icon_cache[cache_key] = pixmap
+            return pixmap
 
-        svg_id = get_svg_id_for_material(mat_id, mat_name)
-        if svg_id is None:
-            return None
+    def load_svg_pixmap(self, svg_id: str, size: int) -> QPixmap:
+        """Rastert ein Sprite-Symbol (bzw. lädt es aus dem Icon-Cache auf der Festplatte)."""
+        dpr = self.devicePixelRatioF()
+        pixel_size = round(size * dpr)
 
-        symbol = self.svg_root.find(f".//svg:symbol[@id='{svg_id}']", self.svg_ns)
-        if symbol is None:
+        with span('icon_disk_cache'):
+            png_data = self.disk_cache.get(svg_id, size, dpr) if self.disk_cache else None
+        if png_data is not None:
+            pixmap = QPixmap()
+            if not pixmap.loadFromData(png_data):
+                return None
+            pixmap.setDevicePixelRatio(dpr)
+            return pixmap
+
+        if not HAVE_RENDERER or not self.sprite:
             return None
 
         try:
-            viewBox = symbol.get('viewBox', '0 0 24 24')
-            svg_str = f'''<?xml version="1.0" encoding="UTF-8"?>
-<svg xmlns="http://www.w3.org/2000/svg" viewBox="{viewBox}" width="{size}" height="{size}">
-{ET.tostring(symbol, encoding='unicode').replace('symbol', 'g')}
-</svg>'''
-
-            png_data = svg2png(bytestring=svg_str.encode('utf-8'), output_width=size, output_height=size)
-            img = Image.open(BytesIO(png_data))
-
-            # Convert PIL Image to QPixmap
-            img_byte_arr = BytesIO()
-            img.save(img_byte_arr, format='PNG')
-            img_byte_arr.seek(0)
-
-            pixmap = QPixmap()
-            pixmap.loadFromData(img_byte_arr.getvalue())
-
-            self.icon_cache[cache_key] = pixmap
-            return pixmap
+            with span('render_icon'):
+                icon = render_icon(self.sprite, svg_id, pixel_size, png=bool(self.disk_cache))
         except Exception as e:
             print(f"Fehler beim Laden von Icon {svg_id}: {e}")
             return None
+        if icon is None:
+            return None
+
+        if self.disk_cache:
+            self.disk_cache.put(svg_id, size, dpr, icon.png)
+        return icon_to_pixmap(icon, dpr)
+
+    def placeholder_icon(self, size: int = 24) -> QPixmap:
+        """Neutraler Platzhalter, bis das echte Icon im Hintergrund geladen ist."""
+        cache_key = f"placeholder_{size}"
+        if cache_key not in self.icon_cache:
+            dpr = self.devicePixelRatioF()
+            pixmap = QPixmap(round(size * dpr), round(size * dpr))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor(128, 128, 128, 80))
+            painter.drawEllipse(2, 2, size - 4, size - 4)
+            painter.end()
+            self.icon_cache[cache_key] = pixmap
+        return self.icon_cache[cache_key]
+
+    def start_icon_loader(self, buttons, visible_count: int, size: int = 24):
+        """
+        Lädt die Icons der Material-Buttons im Hintergrund nach.
+
+        Args:
+            buttons: Liste von (mat_id, mat_name, button) in Anzeige-Reihenfolge
+            visible_count: Anzahl der ohne Scrollen sichtbaren Buttons (werden zuerst geladen)
+            size: Icon-Größe in logischen Pixeln
+        """
+        self.icon_targets = {}
+        groups = ([], [])
+        for index, (mat_id, mat_name, btn) in enumerate(buttons):
+            svg_id = get_svg_id_for_material(mat_id, mat_name)
+            if svg_id is None:
+                continue
+            self.icon_targets.setdefault((svg_id, size), []).append((f"{mat_id}_{size}", btn))
+            groups[0 if index < visible_count else 1].append((svg_id, size))
+
+        if not self.icon_targets:
+            return
+        self.icon_task = IconLoadTask(resource_path(SPRITE_FILE), groups,
+                                      self.devicePixelRatioF(), self.disk_cache)
+        self.icon_task.signals.icon_ready.connect(self.on_icon_ready)
+        QThreadPool.globalInstance().start(self.icon_task)
+
+    def on_icon_ready(self, svg_id: str, size: int, image: QImage):
+        """Setzt ein im Hintergrund geladenes Icon (läuft im GUI-Thread)."""
+        pixmap = QPixmap.fromImage(image)
+        for cache_key, btn in self.icon_targets.get((svg_id, size), ()):
+            self.icon_cache[cache_key] = pixmap
+            btn.setIcon(QIcon(pixmap))
+
+    def closeEvent(self, event):
+        """Hintergrund-Loader beim Schließen stoppen."""
+        if self.icon_task is not None:
+            self.icon_task.cancel()
+        if self.load_task is not None:
+            self.load_task.cancel()
+        if self.reload_task is not None:
+            self.reload_task.cancel()
+        self.cancel_search()
+        super().closeEvent(event)
 
     def get_planet_svg_id(self, planet_type: int) -> str:
         """Mappt Planet-Typ-ID zu SVG-ID."""
@@ -151,42 +253,21 @@ class PlanetFinderPyQt(QMainWindow):
 
     def load_planet_icon(self, planet_type: int, size: int = 80) -> QPixmap:
         """Lädt ein Icon für einen Planeten-Typ."""
-        if not USE_CAIRO or not self.svg_root:
-            return None
-
         svg_id = self.get_planet_svg_id(planet_type)
         cache_key = f"planet_{svg_id}_{size}"
 
-        if cache_key in self.icon_cache:
-            return self.icon_cache[cache_key]
-
-        symbol = self.svg_root.find(f".//svg:symbol[@id='{svg_id}']", self.svg_ns)
-        if symbol is None:
-            return None
-
-        try:
-            viewBox = symbol.get('viewBox', '0 0 24 24')
-            svg_str = f'''<?xml version="1.0" encoding="UTF-8"?>
-<svg xmlns="http://www.w3.org/2000/svg" viewBox="{viewBox}" width="{size}" height="{size}">
-{ET.tostring(symbol, encoding='unicode').replace('symbol', 'g')}
-</svg>'''
-
-            png_data = svg2png(bytestring=svg_str.encode('utf-8'), output_width=size, output_height=size)
-            img = Image.open(BytesIO(png_data))
-
-            img_byte_arr = BytesIO()
-            img.save(img_byte_arr, format='PNG')
-            img_byte_arr.seek(0)
+        with span('load_planet_icon') as s:
+            if cache_key in self.icon_cache:
+                s.set(cache='hit')
+                return self.icon_cache[cache_key]
+            s.set(cache='miss')
 
-            pixmap = QPixmap()
-            pixmap.loadFromData(img_byte_arr.getvalue())
-
-            self.icon_cache[cache_key] = pixmap
+            pixmap = self.load_svg_pixmap(svg_id, size)
+            if pixmap is not None:
+                self.icon_cache[cache_key] = pixmap
             return pixmap
-        except Exception as e:
-            print(f"Fehler beim Laden von Planeten-Icon {svg_id}: {e}")
-            return None
 
+    @traced('init_ui')
     def init_ui(self):
         """Erstellt die Benutzeroberfläche."""
         # Zentrales Widget
@@ -214,6 +295,7 @@ class PlanetFinderPyQt(QMainWindow):
         for i in range(1, 5):
             cb = QCheckBox(f"Tier {i}")
             cb.setChecked(True)
+            cb.toggled.connect(self.schedule_search)
             self.tier_checkboxes.append(cb)
             tier_layout.addWidget(cb)
         tier_layout.addStretch()
@@ -224,70 +306,74 @@ class PlanetFinderPyQt(QMainWindow):
         dist_layout.addWidget(QLabel("Max Entfernung (LY):"))
         self.max_distanz_input = QLineEdit()
         self.max_distanz_input.setMaximumWidth(150)
+        self.max_distanz_input.textChanged.connect(self.schedule_search)
         dist_layout.addWidget(self.max_distanz_input)
+        dist_layout.addWidget(QLabel("Entfernung von:"))
+        self.ursprung_combo = QComboBox()
+        self.ursprung_combo.addItems(["Exchange Station", "Ausgewähltem Planeten"])
+        self.fill_hub_items()
+        self.ursprung_combo.currentIndexChanged.connect(self.schedule_search)
+        dist_layout.addWidget(self.ursprung_combo)
         dist_layout.addStretch()
         filter_layout.addLayout(dist_layout)
 
+        # Rangliste: die besten K nach Score (Häufigkeit der Materialien minus Entfernung)
+        rank_layout = QHBoxLayout()
+        rank_layout.addWidget(QLabel("🏆 Rangliste Top:"))
+        self.rank_spin = QSpinBox()
+        self.rank_spin.setRange(0, 10000)
+        self.rank_spin.setSingleStep(10)
+        self.rank_spin.setSpecialValueText("Aus")
+        self.rank_spin.setToolTip(f"0 = alle Treffer nach Entfernung, sonst z.B. {RANK_K}")
+        self.rank_spin.valueChanged.connect(self.schedule_search)
+        rank_layout.addWidget(self.rank_spin)
+        rank_layout.addWidget(QLabel("Häufigkeit:"))
+        self.rank_aggregate_combo = QComboBox()
+        self.rank_aggregate_combo.addItems(["Summe", "Minimum"])
+        self.rank_aggregate_combo.currentIndexChanged.connect(self.schedule_search)
+        rank_layout.addWidget(self.rank_aggregate_combo)
+        rank_layout.addWidget(QLabel("Abzug pro LY:"))
+        self.rank_distance_spin = QDoubleSpinBox()
+        self.rank_distance_spin.setRange(0.0, 100.0)
+        self.rank_distance_spin.setSingleStep(0.5)
+        self.rank_distance_spin.setValue(RankSpec().distance)
+        self.rank_distance_spin.valueChanged.connect(self.schedule_search)
+        rank_layout.addWidget(self.rank_distance_spin)
+        rank_layout.addStretch()
+        filter_layout.addLayout(rank_layout)
+
         filter_group.setLayout(filter_layout)
         main_layout.addWidget(filter_group)
 
         # Materialien Group
-        materials_group = QGroupBox(f"🔬 Materialien (verfügbar auf Planeten: {len(self.available_materials)})")
+        self.materials_group = QGroupBox()
         materials_layout = QVBoxLayout()
 
         # Scroll Area für Materialien
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setMaximumHeight(250)
-
-        scroll_content = QWidget()
-        materials_grid = QGridLayout(scroll_content)
-
-        # Material Buttons erstellen (6 Spalten)
-        row = 0
-        col = 0
-        max_cols = 6
-
-        for material in self.daten['materials']:
-            mat_id = material['id']
-            mat_name = material['name']
-
-            if mat_id not in self.available_materials:
-                continue
-
-            # Icon laden
-            icon = self.load_icon(mat_id, mat_name, size=24)
-
-            # Button erstellen
-            btn = QPushButton(f"  {mat_id}: {mat_name}")
-            btn.setCheckable(True)
-            btn.setMinimumHeight(50)  # HIER! PyQt6 hat setMinimumHeight()!
-            btn.setMaximumHeight(50)
-
-            if icon:
-                btn.setIcon(QIcon(icon))
-                btn.setIconSize(QSize(24, 24))
-
-            btn.clicked.connect(lambda checked, mid=mat_id: self.toggle_material(mid))
-
-            materials_grid.addWidget(btn, row, col)
-            self.material_buttons[mat_id] = btn
-
-            col += 1
-            if col >= max_cols:
-                col = 0
-                row += 1
-
-        scroll.setWidget(scroll_content)
-        materials_layout.addWidget(scroll)
+        self.materials_scroll = QScrollArea()
+        self.materials_scroll.setWidgetResizable(True)
+        self.materials_scroll.setMaximumHeight(250)
+        self.build_material_buttons()
+        materials_layout.addWidget(self.materials_scroll)
 
         # Buttons
         buttons_layout = QHBoxLayout()
 
         search_btn = QPushButton("🔍 Planeten suchen")
-        search_btn.clicked.connect(self.search_planets)
+        # Lambdas: Signal-Argumente nicht an die (ggf. gemessenen) Slots durchreichen
+        search_btn.clicked.connect(lambda: self.search_planets())
         buttons_layout.addWidget(search_btn)
 
+        cluster_btn = QPushButton("🧩 Cluster suchen...")
+        cluster_btn.setToolTip("Nahe beieinander liegende Planeten, die zusammen alle Materialien liefern")
+        cluster_btn.clicked.connect(lambda: self.show_cluster_dialog())
+        buttons_layout.addWidget(cluster_btn)
+
+        systems_btn = QPushButton("🪐 Systeme suchen...")
+        systems_btn.setToolTip("Sternsysteme, deren Planeten zusammen alle Materialien liefern")
+        systems_btn.clicked.connect(lambda: self.show_system_dialog())
+        buttons_layout.addWidget(systems_btn)
+
         clear_btn = QPushButton("🗑️ Materialien zurücksetzen")
         clear_btn.clicked.connect(self.clear_materials)
         buttons_layout.addWidget(clear_btn)
@@ -295,23 +381,33 @@ class PlanetFinderPyQt(QMainWindow):
         buttons_layout.addStretch()
         materials_layout.addLayout(buttons_layout)
 
-        materials_group.setLayout(materials_layout)
-        main_layout.addWidget(materials_group)
+        self.materials_group.setLayout(materials_layout)
+        main_layout.addWidget(self.materials_group)
 
         # Ergebnisse
         results_group = QGroupBox("📊 Ergebnisse")
         results_layout = QVBoxLayout()
 
-        # TreeWidget für Planeten
-        self.tree = QTreeWidget()
-        self.tree.setHeaderLabels(["Name", "ID", "System-ID", "Typ", "Fert", "X", "Y", "Size", "Tier", "Distanz", "LY"])
-        self.tree.itemSelectionChanged.connect(self.on_planet_select)
-        # Spaltenbreite auf Inhalt anpassen
-        header = self.tree.header()
+        # Tabelle für Planeten (Model/View, Zellen werden erst beim Anzeigen formatiert)
+        self.results_model = PlanetTableModel(self.engine, self)
+        self.results_view = QTableView()
+        self.results_view.setModel(self.results_model)
+        self.results_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.results_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.results_view.setSortingEnabled(True)
+        self.results_view.verticalHeader().setVisible(False)
+        # Feste Zeilenhöhe: kein Messen pro Zeile
+        self.results_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.results_view.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 6)
+        self.results_view.selectionModel().selectionChanged.connect(lambda *_: self.on_planet_select())
+        # Name-Spalte dehnt sich, übrige Spalten mit fester Breite statt ResizeToContents
+        header = self.results_view.horizontalHeader()
         header.setStretchLastSection(False)
-        for i in range(11):
-            header.setSectionResizeMode(i, header.ResizeMode.Stretch if i == 0 else header.ResizeMode.ResizeToContents)
-        results_layout.addWidget(self.tree)
+        for i in range(len(HEADERS)):
+            header.setSectionResizeMode(i, QHeaderView.ResizeMode.Stretch if i == 0 else QHeaderView.ResizeMode.Interactive)
+            if i:
+                header.resizeSection(i, 90)
+        results_layout.addWidget(self.results_view)
 
         results_group.setLayout(results_layout)
         main_layout.addWidget(results_group)
@@ -337,17 +433,257 @@ class PlanetFinderPyQt(QMainWindow):
         self.details_grid.setColumnStretch(3, 0)
         self.details_grid.setColumnStretch(4, 0)
         self.details_grid.setColumnStretch(5, 0)
+        self.init_details_widgets()
+        details_grid_widget.setVisible(False)
+        self.details_grid_widget = details_grid_widget
         details_main_layout.addWidget(details_grid_widget)
         details_main_layout.addStretch()
 
         details_group.setLayout(details_main_layout)
         main_layout.addWidget(details_group)
 
-        # Status Label
+        # Status Label und Ladefortschritt (nur solange data.json im Hintergrund gelesen wird)
+        status_layout = QHBoxLayout()
         self.status_label = QLabel("✓ Bereit")
-        main_layout.addWidget(self.status_label)
+        status_layout.addWidget(self.status_label)
+        status_layout.addStretch()
+        self.load_bar = QProgressBar()
+        self.load_bar.setRange(0, 100)
+        self.load_bar.setMaximumWidth(360)
+        status_layout.addWidget(self.load_bar)
+        main_layout.addLayout(status_layout)
+        self.update_load_bar()
+
+        self.cluster_dialog = None
+        self.system_dialog = None
+
+        # Debug-Dialog mit Zeitmessungen
+        self.trace_dialog = None
+        QShortcut(QKeySequence("Ctrl+Shift+T"), self, activated=self.show_trace_dialog)
+
+        print(f"Verfügbare Materialien auf Planeten: {len(self.available_materials)} von {len(self.engine.materials)}")
+
+        if self.load_progress < 1.0:
+            self.start_galaxy_loader()
+
+    def start_galaxy_loader(self):
+        """Liest die restlichen Systeme im Hintergrund; Zwischenstände ersetzen die Engine."""
+        self.load_task = GalaxyLoadTask(self.load_steps)
+        self.load_task.signals.progress.connect(self.on_load_progress)
+        self.load_task.signals.partial.connect(self.on_load_partial)
+        self.load_task.signals.finished.connect(self.on_load_finished)
+        self.load_task.signals.failed.connect(self.on_load_failed)
+        QThreadPool.globalInstance().start(self.load_task)
+
+    def update_load_bar(self):
+        """Zeigt den Ladefortschritt an (ausgeblendet, sobald alles geladen ist)."""
+        self.load_bar.setVisible(self.load_progress < 1.0)
+        self.load_bar.setValue(int(self.load_progress * 100))
+        self.load_bar.setFormat(f"⏳ Galaxie lädt: %p% ({len(self.engine)} Planeten)")
+
+    def on_load_progress(self, progress: float):
+        self.load_progress = progress
+        self.update_load_bar()
+
+    def on_load_partial(self, engine, progress: float):
+        self.load_progress = progress
+        self.set_engine(engine)
+
+    def on_load_finished(self, engine):
+        self.load_task = None
+        self.load_progress = 1.0
+        self.set_engine(engine)
+
+    def on_load_failed(self, message: str):
+        self.load_task = None
+        self.load_progress = 1.0
+        self.update_load_bar()
+        self.status_label.setText(f"❌ Fehler beim Laden von data.json: {message}")
+
+    def start_reload(self):
+        """Liest das geänderte data.json im Hintergrund ein (nicht während eines anderen Ladevorgangs)."""
+        # Wird die Datei ersetzt statt überschrieben, verliert der Watcher sie
+        if self.data_path not in self.data_watcher.files():
+            if not os.path.exists(self.data_path):
+                self.reload_timer.start()
+                return
+            self.data_watcher.addPath(self.data_path)
+        if self.load_task is not None or self.reload_task is not None:
+            self.reload_timer.start()
+            return
+        self.reload_task = GalaxyReloadTask(self.engine, self.data_path)
+        self.reload_task.signals.finished.connect(self.on_reload_finished)
+        self.reload_task.signals.failed.connect(self.on_reload_failed)
+        self.status_label.setText("⏳ data.json wurde geändert und wird neu eingelesen...")
+        QThreadPool.globalInstance().start(self.reload_task)
+
+    def on_reload_finished(self, engine, diff, sekunden: float):
+        """Neuen Stand übernehmen; Suche und Auswahl bleiben erhalten."""
+        self.reload_task = None
+        if not diff:
+            self.status_label.setText(f"🔄 data.json neu eingelesen: keine Änderungen ({sekunden * 1000:.0f} ms)")
+            return
+        notice = f"🔄 data.json neu eingelesen: {diff.summary()} ({sekunden * 1000:.0f} ms)"
+        # Ein entfernter Planet kann weder Ursprung noch Auswahl bleiben
+        if self.ausgewaehlte_id is not None:
+            try:
+                engine.row_of(self.ausgewaehlte_id)
+            except KeyError:
+                self.ausgewaehlte_id = None
+        if self.search_generation:
+            self.reload_notice = notice
+        self.set_engine(engine)
+        if not self.search_generation:
+            self.status_label.setText(notice)
+
+    def on_reload_failed(self, message: str):
+        self.reload_task = None
+        self.status_label.setText(f"❌ data.json konnte nicht neu eingelesen werden: {message}")
+
+    def select_planet(self, planet_id: int):
+        """Markiert einen Planeten in der Tabelle (nur unter den bereits geladenen Zeilen)."""
+        rows = self.results_model.rows[:self.results_model.rowCount()]
+        found = np.flatnonzero(self.engine.ids[rows] == planet_id)
+        if len(found):
+            self.results_view.selectRow(int(found[0]))
+
+    @traced('set_engine')
+    def set_engine(self, engine):
+        """
+        Übernimmt eine neue Engine (z.B. einen größeren Zwischenstand beim Laden).
+
+        Materialien, Hubs, Tabelle und Dialoge zeigen danach auf die neue Engine; eine
+        bereits gestartete Suche wird mit denselben Filtern wiederholt.
+        """
+        self.engine = engine
+        self.PX_TO_LY = engine.px_to_ly
+        self.results_model.engine = engine
+        for dialog in (self.cluster_dialog, self.system_dialog):
+            if dialog is not None:
+                dialog.engine = engine
+        # Zeilen des alten Ergebnisses gehören zur alten Engine
+        self.letztes_ergebnis = None
+        available = self.get_available_materials()
+        if available != self.available_materials:
+            self.available_materials = available
+            self.build_material_buttons()
+        self.fill_hub_items()
+        self.ensure_material_slots(int(np.diff(engine.mat_ptr).max()) if len(engine) else 0)
+        self.update_load_bar()
+        if self.search_generation:
+            self.search_planets()
+
+    def build_material_buttons(self):
+        """Baut die Material-Buttons (verfügbare Materialien, 6 Spalten) neu auf; Auswahl bleibt erhalten."""
+        self.materials_group.setTitle(f"🔬 Materialien (verfügbar auf Planeten: {len(self.available_materials)})")
+        self.selected_materials &= self.available_materials
+        self.material_buttons = {}
+
+        scroll_content = QWidget()
+        materials_grid = QGridLayout(scroll_content)
+
+        # Material Buttons erstellen (6 Spalten)
+        row = 0
+        col = 0
+        max_cols = 6
+
+        placeholder = QIcon(self.placeholder_icon(24))
+        icon_buttons = []
+
+        for material in self.engine.materials:
+            mat_id = material['id']
+            mat_name = material['name']
 
-        print(f"Verfügbare Materialien auf Planeten: {len(self.available_materials)} von {len(self.daten['materials'])}")
+            if mat_id not in self.available_materials:
+                continue
+
+            # Button erstellen (Icon kommt asynchron, bis dahin Platzhalter)
+            btn = QPushButton(f"  {mat_id}: {mat_name}")
+            btn.setCheckable(True)
+            btn.setChecked(mat_id in self.selected_materials)
+            btn.setMinimumHeight(50)  # HIER! PyQt6 hat setMinimumHeight()!
+            btn.setMaximumHeight(50)
+            cached = self.icon_cache.get(f"{mat_id}_24")
+            btn.setIcon(QIcon(cached) if cached is not None else placeholder)
+            btn.setIconSize(QSize(24, 24))
+            if cached is None:
+                icon_buttons.append((mat_id, mat_name, btn))
+
+            btn.clicked.connect(lambda checked, mid=mat_id: self.toggle_material(mid))
+
+            materials_grid.addWidget(btn, row, col)
+            self.material_buttons[mat_id] = btn
+
+            col += 1
+            if col >= max_cols:
+                col = 0
+                row += 1
+
+        # Ersetzt (und löscht) die bisherigen Buttons
+        self.materials_scroll.setWidget(scroll_content)
+
+        # Sichtbare Zeilen (ohne Scrollen) zuerst laden
+        if self.icon_task is not None:
+            self.icon_task.cancel()
+        visible_rows = self.materials_scroll.maximumHeight() // 50 + 1
+        self.start_icon_loader(icon_buttons, visible_rows * max_cols, size=24)
+
+    def fill_hub_items(self):
+        """Einträge für Hubs (Planet-Typ 1) im Ursprung-Auswahlfeld; die Auswahl bleibt erhalten."""
+        combo = self.ursprung_combo
+        current = combo.currentData()
+        combo.blockSignals(True)
+        while combo.count() > 2:
+            combo.removeItem(2)
+        # Entfernungen kommen aus der vorberechneten Distanzmatrix
+        hubs = self.engine.hubs()
+        if hubs:
+            combo.addItem("Nächstem Hub", NEAREST_HUB)
+        if len(hubs) > 1:
+            for hub in hubs:
+                combo.addItem(f"Hub: {hub['name']} (ID: {hub['id']})", hub['id'])
+        if current is not None:
+            combo.setCurrentIndex(max(combo.findData(current), 0))
+        combo.blockSignals(False)
+
+    def show_trace_dialog(self):
+        """Öffnet den Debug-Dialog mit den gemessenen Zeiten."""
+        if self.trace_dialog is None:
+            self.trace_dialog = TraceDialog(self)
+        self.trace_dialog.show()
+        self.trace_dialog.raise_()
+
+    def show_cluster_dialog(self):
+        """Öffnet die Cluster-Suche mit den aktuellen Filtern."""
+        if self.cluster_dialog is None:
+            self.cluster_dialog = ClusterDialog(self.engine, self.cluster_filters, self)
+        self.cluster_dialog.show()
+        self.cluster_dialog.raise_()
+
+    def show_system_dialog(self):
+        """Öffnet die Systemsuche mit den aktuellen Filtern."""
+        if self.system_dialog is None:
+            self.system_dialog = SystemDialog(self.engine, self.system_filters, self)
+        self.system_dialog.show()
+        self.system_dialog.raise_()
+
+    def system_filters(self):
+        """Wie cluster_filters, zusätzlich der gewählte Hub (Entfernung zum nächsten Hub möglich)."""
+        tiers, materials, origin = self.cluster_filters()
+        hub = self.ursprung_combo.currentData()
+        return tiers, materials, origin, hub if hub == NEAREST_HUB else None
+
+    def cluster_filters(self):
+        """Tiers, Materialien und Ursprung für die Cluster-Suche (Hub: dessen Position bzw. Exchange)."""
+        tiers = [i + 1 for i, cb in enumerate(self.tier_checkboxes) if cb.isChecked()]
+        hub = self.ursprung_combo.currentData()
+        if self.ursprung_combo.currentIndex() == 1 and self.ausgewaehlte_id is not None:
+            row = self.engine.row_of(self.ausgewaehlte_id)
+        elif hub is not None and hub != NEAREST_HUB:
+            row = self.engine.row_of(hub)
+        else:
+            return tiers, self.selected_materials, (self.EXCHANGE_X, self.EXCHANGE_Y)
+        return tiers, self.selected_materials, (float(self.engine.x[row]), float(self.engine.y[row]))
 
     def toggle_material(self, mat_id):
         """Material auswählen/abwählen."""
@@ -355,6 +691,7 @@ class PlanetFinderPyQt(QMainWindow):
             self.selected_materials.remove(mat_id)
         else:
             self.selected_materials.add(mat_id)
+        self.schedule_search()
 
     def clear_materials(self):
         """Alle Materialien abwählen."""
@@ -362,11 +699,18 @@ class PlanetFinderPyQt(QMainWindow):
         for btn in self.material_buttons.values():
             btn.setChecked(False)
         self.status_label.setText("✓ Materialauswahl zurückgesetzt")
+        self.schedule_search()
+
+    def schedule_search(self, *_):
+        """Startet die Suche nach kurzer Pause neu (weitere Eingaben verschieben sie)."""
+        self.search_timer.start()
 
+    @traced('search_planets.start')
     def search_planets(self):
         """Planeten suchen basierend auf Filtern."""
-        self.tree.clear()
-        self.planeten_liste = []
+        self.search_timer.stop()
+        self.cancel_search()
+        self.results_model.clear()
 
         # Tier Filter
         tier_filter = [i+1 for i, cb in enumerate(self.tier_checkboxes) if cb.isChecked()]
@@ -387,94 +731,80 @@ class PlanetFinderPyQt(QMainWindow):
                 self.status_label.setText("❌ Fehler: Ungültige Entfernung!")
                 return
 
-        # Planeten durchsuchen
-        for system in self.daten.get('systems', []):
-            planets = system.get('planets')
-            if planets is None:
-                continue
-
-            for planet in planets:
-                if planet['tier'] not in tier_filter:
-                    continue
-
-                # Material Filter
-                if material_filter:
-                    planet_mat_ids = [mat['id'] for mat in planet.get('mats', [])]
-                    if not all(mat_id in planet_mat_ids for mat_id in material_filter):
-                        continue
-
-                # Distanz berechnen
-                distanz = math.sqrt((planet['x'] - self.EXCHANGE_X)**2 + (planet['y'] - self.EXCHANGE_Y)**2)
-                lichtjahre = distanz / self.PX_TO_LY
-
-                # Max Distanz Filter
-                if max_distanz_ly is not None and lichtjahre > max_distanz_ly:
-                    continue
-
-                planet['distanz'] = distanz
-                planet['lichtjahre'] = lichtjahre
-                self.planeten_liste.append(planet)
-
-        # Sortieren
-        self.planeten_liste.sort(key=lambda p: p['distanz'])
-
-        # In Tree einfügen
-        for planet in self.planeten_liste:
-            item = QTreeWidgetItem([
-                str(planet['name']),
-                str(planet['id']),
-                str(planet['sId']),
-                str(planet['type']),
-                str(planet['fert']),
-                str(planet['x']),
-                str(planet['y']),
-                str(planet['size']),
-                str(planet['tier']),
-                f"{planet['distanz']:.2f}",
-                f"{planet['lichtjahre']:.2f}"
-            ])
-            self.tree.addTopLevelItem(item)
-
-        self.status_label.setText(f"✓ Gefundene Planeten: {len(self.planeten_liste)}")
-
-    def on_planet_select(self):
-        """Zeigt Details für ausgewählten Planeten."""
-        selected_items = self.tree.selectedItems()
-        if not selected_items:
+        # Ursprung für die Entfernung
+        if self.ursprung_combo.currentIndex() == 1:
+            if self.ausgewaehlte_id is None:
+                self.status_label.setText("❌ Fehler: Kein Planet ausgewählt!")
+                return
+            row = self.engine.row_of(self.ausgewaehlte_id)
+            ursprung = (float(self.engine.x[row]), float(self.engine.y[row]))
+        else:
+            ursprung = (self.EXCHANGE_X, self.EXCHANGE_Y)
+        hub = self.ursprung_combo.currentData()
+
+        rank = None
+        if self.rank_spin.value():
+            rank = RankSpec.create(self.rank_spin.value(), {'distance': self.rank_distance_spin.value()},
+                                   ('sum', 'min')[self.rank_aggregate_combo.currentIndex()])
+
+        # Planeten im Hintergrund durchsuchen (blockweise, nach Distanz sortiert);
+        # bei strengeren Filtern wird nur das letzte Ergebnis nachgefiltert
+        self.results_view.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.search_generation += 1
+        self.search_task = SearchTask(self.engine, self.search_generation, tier_filter, material_filter,
+                                      max_distanz_ly, ursprung, previous=self.letztes_ergebnis, rank=rank,
+                                      hub=hub)
+        self.search_task.signals.partial.connect(self.on_search_partial)
+        self.search_task.signals.finished.connect(self.on_search_finished)
+        self.status_label.setText("⏳ Suche läuft...")
+        self.search_pool.start(self.search_task)
+
+    def cancel_search(self):
+        """Bricht eine laufende Suche ab; ihre restlichen Meldungen werden ignoriert."""
+        if self.search_task is not None:
+            self.search_task.cancel()
+            self.search_task = None
+
+    def on_search_partial(self, generation: int, zwischenstand, fortschritt: float, sekunden: float):
+        """Zwischenstand einer laufenden Suche anzeigen (läuft im GUI-Thread)."""
+        if self.search_task is None or generation != self.search_generation:
             return
-
-        item = selected_items[0]
-        planet_id = int(item.text(1))
-
-        planet = next((p for p in self.planeten_liste if p['id'] == planet_id), None)
-        if not planet:
+        with span('search_planets.populate', partial=True):
+            self.results_model.update_result(zwischenstand)
+        self.status_label.setText(f"⏳ Suche läuft... {fortschritt:.0%} • {len(zwischenstand)} Treffer "
+                                  f"• {sekunden * 1000:.0f} ms")
+
+    def on_search_finished(self, generation: int, ergebnis, sekunden: float):
+        """Endergebnis übernehmen (läuft im GUI-Thread)."""
+        if self.search_task is None or generation != self.search_generation:
             return
-
-        # Planet Icon laden
-        planet_icon = self.load_planet_icon(planet['type'], size=80)
-        if planet_icon:
-            self.planet_icon_label.setPixmap(planet_icon)
-        else:
-            self.planet_icon_label.setText(str(planet['type']))
-
-        # Altes Grid leeren
-        while self.details_grid.count():
-            child = self.details_grid.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-
+        self.search_task = None
+        self.letztes_ergebnis = ergebnis
+        with span('search_planets.populate', partial=False):
+            self.results_model.update_result(ergebnis)
+        text = f"✓ Gefundene Planeten: {len(ergebnis)} ({sekunden * 1000:.0f} ms)"
+        if self.reload_notice is not None:
+            # Nach dem Neu-Einlesen: Meldung anhängen und die vorherige Auswahl wiederherstellen
+            text = f"{text} • {self.reload_notice}"
+            self.reload_notice = None
+            if self.ausgewaehlte_id is not None:
+                self.select_planet(self.ausgewaehlte_id)
+        self.status_label.setText(text)
+
+    def init_details_widgets(self):
+        """Baut die Widgets des Detailbereichs einmalig; bei Auswahl wird nur Text getauscht."""
         # Planetenname und ID als Titel
         title_layout = QHBoxLayout()
-        title = QLabel(f"🌍 {planet['name']}")
+        self.details_title = QLabel()
         title_font = QFont()
         title_font.setPointSize(14)
         title_font.setBold(True)
-        title.setFont(title_font)
-        title_layout.addWidget(title)
+        self.details_title.setFont(title_font)
+        title_layout.addWidget(self.details_title)
 
-        id_label = QLabel(f"(ID: {planet['id']})")
-        id_label.setStyleSheet("color: gray; font-size: 12px;")
-        title_layout.addWidget(id_label)
+        self.details_id = QLabel()
+        self.details_id.setStyleSheet("color: gray; font-size: 12px;")
+        title_layout.addWidget(self.details_id)
         title_layout.addStretch()
 
         title_widget = QWidget()
@@ -482,95 +812,142 @@ class PlanetFinderPyQt(QMainWindow):
         self.details_grid.addWidget(title_widget, 0, 0, 1, 6)
 
         # Planet Informationen in Grid
+        bold_font = QFont()
+        bold_font.setBold(True)
+        info_names = ["📍 Koordinaten:", "📏 Entfernung:", "⭐ Tier:",
+                      "📊 Typ:", "🌱 Fruchtbarkeit:", "📐 Größe:"]
+        self.details_values = []
         row = 1
-        svg_id = self.get_planet_svg_id(planet['type'])
-        info_labels = [
-            ("📍 Koordinaten:", f"({planet['x']}, {planet['y']})"),
-            ("📏 Entfernung:", f"{planet['lichtjahre']:.2f} LY ({planet['distanz']:.2f} px)"),
-            ("⭐ Tier:", str(planet['tier'])),
-            ("📊 Typ:", f"{svg_id} (ID: {planet['type']})"),
-            ("🌱 Fruchtbarkeit:", str(planet['fert'])),
-            ("📐 Größe:", str(planet['size']))
-        ]
-
-        for i, (label_text, value_text) in enumerate(info_labels):
+        for i, label_text in enumerate(info_names):
             col = (i % 2) * 2
             if i % 2 == 0 and i > 0:
                 row += 1
 
             label = QLabel(label_text)
-            label_font = QFont()
-            label_font.setBold(True)
-            label.setFont(label_font)
+            label.setFont(bold_font)
             self.details_grid.addWidget(label, row, col)
 
-            value = QLabel(value_text)
+            value = QLabel()
             self.details_grid.addWidget(value, row, col + 1)
+            self.details_values.append(value)
 
         row += 1
 
         # Materialien Sektion
         mat_title = QLabel("🔬 Materialien:")
-        mat_title_font = QFont()
-        mat_title_font.setBold(True)
-        mat_title.setFont(mat_title_font)
+        mat_title.setFont(bold_font)
         self.details_grid.addWidget(mat_title, row, 0, 1, 6)
         row += 1
 
-        if planet.get('mats'):
-            mat_flow = QHBoxLayout()
-            mat_flow.setSpacing(15)
-
-            for mat in planet['mats']:
-                mat_id = mat['id']
-                abundance = mat['ab']
-                mat_name = next((m['name'] for m in self.daten['materials'] if m['id'] == mat_id), 'Unbekannt')
-
-                # Icon laden
-                icon = self.load_icon(mat_id, mat_name, size=24)
-
-                mat_item_layout = QHBoxLayout()
-                mat_item_layout.setSpacing(5)
-
-                icon_label = QLabel()
-                if icon:
-                    icon_label.setPixmap(icon)
-                    icon_label.setFixedSize(24, 24)
-                else:
-                    icon_label.setText("•")
-                mat_item_layout.addWidget(icon_label)
-
-                info_layout = QVBoxLayout()
-                info_layout.setSpacing(0)
-
-                name_label = QLabel(f"{mat_name}")
-                name_font = QFont()
-                name_font.setBold(True)
-                name_label.setFont(name_font)
-                info_layout.addWidget(name_label)
+        self.materials_container = QWidget()
+        self.material_flow = QHBoxLayout(self.materials_container)
+        self.material_flow.setSpacing(15)
+        self.material_flow.addStretch()
+        self.material_slots = []
+        max_mats = int(np.diff(self.engine.mat_ptr).max()) if len(self.engine) else 0
+        self.ensure_material_slots(max_mats)
+        self.details_grid.addWidget(self.materials_container, row, 0, 1, 6)
+
+        self.no_mats_label = QLabel("Keine Materialien vorhanden")
+        self.no_mats_label.setStyleSheet("color: gray; font-style: italic;")
+        self.details_grid.addWidget(self.no_mats_label, row + 1, 0, 1, 6)
+
+    def ensure_material_slots(self, count: int):
+        """Stellt mindestens count Material-Widgets (Icon, Name, Häufigkeit) bereit."""
+        while len(self.material_slots) < count:
+            mat_item_layout = QHBoxLayout()
+            mat_item_layout.setSpacing(5)
+
+            icon_label = QLabel()
+            icon_label.setFixedSize(24, 24)
+            mat_item_layout.addWidget(icon_label)
+
+            info_layout = QVBoxLayout()
+            info_layout.setSpacing(0)
+
+            name_label = QLabel()
+            name_font = QFont()
+            name_font.setBold(True)
+            name_label.setFont(name_font)
+            info_layout.addWidget(name_label)
+
+            ab_label = QLabel()
+            ab_label.setStyleSheet("color: gray; font-size: 10px;")
+            info_layout.addWidget(ab_label)
+
+            mat_item_layout.addLayout(info_layout)
+
+            mat_widget = QWidget()
+            mat_widget.setLayout(mat_item_layout)
+            mat_widget.labels = (icon_label, name_label, ab_label)
+            mat_widget.setVisible(False)
+            # Vor dem abschließenden Stretch einfügen
+            self.material_flow.insertWidget(len(self.material_slots), mat_widget)
+            self.material_slots.append(mat_widget)
+
+    @traced('on_planet_select')
+    def on_planet_select(self):
+        """Zeigt Details für ausgewählten Planeten."""
+        selected_rows = self.results_view.selectionModel().selectedRows()
+        if not selected_rows:
+            return
 
-                ab_label = QLabel(f"ID: {mat_id} • AB: {abundance}")
-                ab_label.setStyleSheet("color: gray; font-size: 10px;")
-                info_layout.addWidget(ab_label)
+        table_row = selected_rows[0].row()
+        planet = self.engine.planet(self.results_model.planet_row(table_row))
+        # Distanz gehört zur Suche und steht in den Ergebnis-Spalten, nicht im Planeten
+        distanz = float(self.results_model.distanz[table_row])
+        lichtjahre = float(self.results_model.lichtjahre[table_row])
+        self.ausgewaehlte_id = planet['id']
 
-                mat_item_layout.addLayout(info_layout)
+        # Planet Icon laden
+        planet_icon = self.load_planet_icon(planet['type'], size=80)
+        if planet_icon:
+            self.planet_icon_label.setPixmap(planet_icon)
+        else:
+            self.planet_icon_label.setText(str(planet['type']))
 
-                mat_widget = QWidget()
-                mat_widget.setLayout(mat_item_layout)
-                mat_flow.addWidget(mat_widget)
+        # Vorgebaute Widgets nur mit neuen Texten/Pixmaps füllen
+        self.details_title.setText(f"🌍 {planet['name']}")
+        self.details_id.setText(f"(ID: {planet['id']})")
 
-            mat_flow.addStretch()
+        svg_id = self.get_planet_svg_id(planet['type'])
+        info_values = [
+            f"({planet['x']}, {planet['y']})",
+            f"{lichtjahre:.2f} LY ({distanz:.2f} px)",
+            str(planet['tier']),
+            f"{svg_id} (ID: {planet['type']})",
+            str(planet['fert']),
+            str(planet['size']),
+        ]
+        for value_label, value_text in zip(self.details_values, info_values):
+            value_label.setText(value_text)
 
-            mat_container = QWidget()
-            mat_container.setLayout(mat_flow)
-            self.details_grid.addWidget(mat_container, row, 0, 1, 6)
-        else:
-            no_mats = QLabel("Keine Materialien vorhanden")
-            no_mats.setStyleSheet("color: gray; font-style: italic;")
-            self.details_grid.addWidget(no_mats, row, 0, 1, 6)
+        # Materialien Sektion
+        mats = planet.get('mats') or []
+        self.ensure_material_slots(len(mats))
+        for slot, mat in zip(self.material_slots, mats):
+            mat_id = mat['id']
+            mat_name = self.engine.material_name(mat_id)
+            icon_label, name_label, ab_label = slot.labels
 
+            icon = self.load_icon(mat_id, mat_name, size=24)
+            if icon:
+                icon_label.setPixmap(icon)
+            else:
+                icon_label.setText("•")
+            name_label.setText(mat_name)
+            ab_label.setText(f"ID: {mat_id} • AB: {mat['ab']}")
+            slot.setVisible(True)
+        for slot in self.material_slots[len(mats):]:
+            slot.setVisible(False)
+
+        self.materials_container.setVisible(bool(mats))
+        self.no_mats_label.setVisible(not mats)
+        self.details_grid_widget.setVisible(True)
 
 if __name__ == "__main__":
+    # Nötig für Worker-Prozesse im PyInstaller-Bundle
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = PlanetFinderPyQt()
     window.show()
@@ -0,0 +1,84 @@
+"""
+Persistenter Icon-Cache auf der Festplatte
+Speichert fertig gerasterte PNGs, damit Warmstarts kein SVG mehr rendern müssen.
+Schlüssel: (Hash der Sprite-Datei, SVG-ID, Größe, Device Pixel Ratio).
+"""
+
+import os
+import re
+import shutil
+
+from app_paths import cache_dir, file_hash
+
+
+class IconDiskCache:
+    """PNG-Cache mit Größenlimit (LRU über die Änderungszeit der Dateien)."""
+
+    def __init__(self, sprite_path: str, directory: str = None, max_bytes: int = 32 * 1024 * 1024):
+        self.sprite_hash = file_hash(sprite_path).hex()[:16]
+        self.max_bytes = max_bytes
+
+        root = directory or cache_dir('icons')
+        self.directory = os.path.join(root, self.sprite_hash)
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Einträge zu anderen Sprite-Ständen sind ungültig
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            if name != self.sprite_hash and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+        self.total_bytes = sum(entry.stat().st_size for entry in os.scandir(self.directory)
+                               if entry.name.endswith('.png'))
+
+    def _path(self, svg_id: str, size: int, dpr: float) -> str:
+        safe_id = re.sub(r'[^A-Za-z0-9_-]', '_', svg_id)
+        return os.path.join(self.directory, f"{safe_id}_{size}@{dpr:g}x.png")
+
+    def get(self, svg_id: str, size: int, dpr: float = 1.0):
+        """Gibt die PNG-Bytes zurück oder None, wenn nicht im Cache."""
+        path = self._path(svg_id, size, dpr)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Zugriff merken, damit häufig genutzte Icons nicht verdrängt werden
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def put(self, svg_id: str, size: int, dpr: float, png_data: bytes):
+        """Speichert PNG-Bytes und verdrängt bei Bedarf die ältesten Einträge."""
+        path = self._path(svg_id, size, dpr)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            with open(tmp_path, 'wb') as f:
+                f.write(png_data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Icon-Cache konnte nicht geschrieben werden: {e}")
+            return
+        self.total_bytes += len(png_data) - old_size
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Löscht die am längsten unbenutzten Einträge, bis das Limit eingehalten ist."""
+        entries = sorted((entry for entry in os.scandir(self.directory) if entry.name.endswith('.png')),
+                         key=lambda entry: entry.stat().st_mtime)
+        for entry in entries:
+            if self.total_bytes <= self.max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self.total_bytes -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        """Leert den Cache vollständig."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
+        self.total_bytes = 0
@@ -0,0 +1,75 @@
+"""
+Asynchrones Laden von Icons
+Ein QRunnable holt Icons im Hintergrund aus dem Festplatten-Cache bzw. rastert sie
+über icon_render und meldet jedes fertige Bild per Signal an den GUI-Thread.
+"""
+
+from typing import List, Sequence, Tuple
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from icon_cache import IconDiskCache
+from icon_render import icon_to_qimage, iter_render_batch
+
+
+class IconLoadSignals(QObject):
+    """Signale des Hintergrund-Loaders (QRunnable selbst kann keine Signale haben)."""
+    icon_ready = pyqtSignal(str, int, QImage)  # svg_id, Größe (logisch), Bild
+    finished = pyqtSignal()
+
+
+class IconLoadTask(QRunnable):
+    """Lädt Icons gruppenweise; die erste Gruppe (sichtbare Buttons) wird zuerst fertig."""
+
+    def __init__(self, sprite_path: str, job_groups: Sequence[Sequence[Tuple[str, int]]],
+                 dpr: float = 1.0, disk_cache: IconDiskCache = None):
+        super().__init__()
+        self.sprite_path = sprite_path
+        self.job_groups = job_groups
+        self.dpr = dpr
+        self.disk_cache = disk_cache
+        self.cancelled = False
+        self.signals = IconLoadSignals()
+
+    def cancel(self):
+        """Bricht nach dem aktuellen Block ab (z.B. beim Schließen des Fensters)."""
+        self.cancelled = True
+
+    def run(self):
+        try:
+            for group in self.job_groups:
+                if self.cancelled:
+                    return
+                self._load_group(group)
+        finally:
+            self.signals.finished.emit()
+
+    def _load_group(self, jobs: Sequence[Tuple[str, int]]):
+        missing: List[Tuple[str, int]] = []
+        sizes = {}
+        for svg_id, size in dict.fromkeys(jobs):
+            png_data = self.disk_cache.get(svg_id, size, self.dpr) if self.disk_cache else None
+            if png_data is not None:
+                image = QImage.fromData(png_data)
+                if not image.isNull():
+                    image.setDevicePixelRatio(self.dpr)
+                    self.signals.icon_ready.emit(svg_id, size, image)
+                    continue
+            pixel_size = round(size * self.dpr)
+            sizes[(svg_id, pixel_size)] = size
+            missing.append((svg_id, pixel_size))
+
+        if not missing:
+            return
+        for chunk in iter_render_batch(self.sprite_path, missing, png=bool(self.disk_cache)):
+            for icon in chunk:
+                size = sizes[(icon.svg_id, icon.size)]
+                if self.disk_cache:
+                    self.disk_cache.put(icon.svg_id, size, self.dpr, icon.png)
+                # Eigener Speicher: das QImage über icon.data überlebt die Signal-Warteschlange nicht
+                image = icon_to_qimage(icon).copy()
+                image.setDevicePixelRatio(self.dpr)
+                self.signals.icon_ready.emit(icon.svg_id, size, image)
+            if self.cancelled:
+                return
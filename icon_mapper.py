@@ -68,10 +68,12 @@ def get_svg_id_for_material(mat_id: int, mat_name: str) -> str:
 
 if __name__ == "__main__":
     # Test mit einigen Beispielen
-    import json
+    from json_stream import read_value
+    from svg_sprite import SvgSprite, SPRITE_FILE
 
-    with open('data.json', 'r', encoding='utf-8') as f:
-        daten = json.load(f)
+    # Nur die Materialliste lesen, nicht die ganze Galaxie
+    materials = read_value('data.json', 'materials', [])
+    sprite = SvgSprite(SPRITE_FILE)
 
     print("Test der Icon-Mappings:")
     print("=" * 80)
@@ -81,7 +83,8 @@ if __name__ == "__main__":
                 168, 169, 171, 174, 175, 176, 177, 178, 179, 180, 181]
 
     for mat_id in test_ids:
-        material = next((m for m in daten['materials'] if m['id'] == mat_id), None)
+        material = next((m for m in materials if m['id'] == mat_id), None)
         if material:
             svg_id = get_svg_id_for_material(mat_id, material['name'])
-            print(f"{mat_id:<4} {material['name']:<35} -> {svg_id}")
+            status = "✓" if svg_id in sprite else "✗"
+            print(f"{mat_id:<4} {material['name']:<35} -> {svg_id} {status}")
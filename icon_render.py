@@ -0,0 +1,231 @@
+"""
+Batch-Rasterung von Sprite-Symbolen
+Rendert viele (svg_id, Größe)-Aufträge auf einmal - bei größeren Mengen verteilt auf
+einen ProcessPoolExecutor - und liefert rohe Pixelpuffer, aus denen die GUI ohne
+Umweg über PNG/PIL direkt QImages bzw. QPixmaps baut. Ein PNG wird nur auf Anfrage
+kodiert (für den Festplatten-Cache).
+
+Renderer-Backends (das schnellste verfügbare wird beim Import gewählt):
+- cairo:  CairoSVG zeichnet in eine cairo ImageSurface, deren Speicher als memoryview übernommen wird
+- qtsvg:  QSvgRenderer zeichnet über ein QImage direkt in einen bytearray (kein cairo nötig)
+Mit der Umgebungsvariable PLANETFINDER_ICON_BACKEND lässt sich ein Backend erzwingen.
+"""
+
+import ctypes
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from io import BytesIO
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from svg_sprite import SvgSprite
+
+try:
+    from cairosvg.parser import Tree
+    from cairosvg.surface import PNGSurface
+    HAVE_CAIRO = True
+except (ImportError, OSError):
+    # OSError: cairosvg installiert, aber libcairo fehlt
+    HAVE_CAIRO = False
+
+try:
+    from PyQt6 import sip
+    from PyQt6.QtCore import QBuffer, QByteArray, QIODevice
+    from PyQt6.QtGui import QImage, QPainter
+    from PyQt6.QtSvg import QSvgRenderer
+    HAVE_QTSVG = True
+except ImportError:
+    HAVE_QTSVG = False
+
+# Unterhalb dieser Anzahl lohnt sich der Start von Worker-Prozessen nicht
+MIN_PARALLEL_JOBS = 32
+
+
+class RenderedIcon(NamedTuple):
+    """
+    Gerastertes Symbol.
+
+    data enthält ARGB32-Pixel, vormultipliziert, in nativer Byte-Reihenfolge - das ist
+    sowohl cairo FORMAT_ARGB32 als auch QImage.Format_ARGB32_Premultiplied. Es ist der
+    Puffer, in den das Backend gezeichnet hat (bytearray bzw. memoryview, aus Worker-
+    Prozessen bytes). png gibt es nur auf Anfrage für den Festplatten-Cache, sonst None.
+    """
+    svg_id: str
+    size: int
+    width: int
+    height: int
+    stride: int
+    data: Union[bytes, bytearray, memoryview]
+    png: Optional[bytes]
+
+
+class CairoBackend:
+    """Rendert über CairoSVG in eine cairo ImageSurface."""
+    name = 'cairo'
+
+    def render(self, svg_str: str, size: int, png: bool = False) -> Tuple[int, int, int, memoryview, Optional[bytes]]:
+        surface = PNGSurface(Tree(bytestring=svg_str.encode('utf-8')), None, 96,
+                             output_width=size, output_height=size)
+        image = surface.cairo
+        image.flush()
+        encoded = None
+        if png:
+            buffer = BytesIO()
+            image.write_to_png(buffer)
+            encoded = buffer.getvalue()
+        # Der memoryview hält die Surface am Leben, die Pixel werden nicht kopiert
+        return image.get_width(), image.get_height(), image.get_stride(), image.get_data(), encoded
+
+
+class QtSvgBackend:
+    """Rendert über QSvgRenderer in ein QImage (funktioniert auch ohne QApplication)."""
+    name = 'qtsvg'
+
+    def render(self, svg_str: str, size: int, png: bool = False) -> Tuple[int, int, int, bytearray, Optional[bytes]]:
+        renderer = QSvgRenderer(QByteArray(svg_str.encode('utf-8')))
+        if not renderer.isValid():
+            raise ValueError("QSvgRenderer konnte das Symbol nicht lesen")
+        # Direkt in einen eigenen Puffer zeichnen; über die Adresse übergeben, damit Qt ihn
+        # beschreibt (aus bytes/bytearray legte QImage beim ersten Schreiben eine Kopie an)
+        stride = size * 4
+        data = bytearray(stride * size)
+        pixels = (ctypes.c_char * len(data)).from_buffer(data)
+        image = QImage(sip.voidptr(ctypes.addressof(pixels)), size, size, stride,
+                       QImage.Format.Format_ARGB32_Premultiplied)
+        painter = QPainter(image)
+        renderer.render(painter)
+        painter.end()
+
+        encoded = None
+        if png:
+            buffer = QBuffer()
+            buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+            image.save(buffer, 'PNG')
+            encoded = bytes(buffer.data())
+        del image, pixels
+        return size, size, stride, data, encoded
+
+
+def icon_to_qimage(icon: RenderedIcon) -> 'QImage':
+    """
+    QImage über dem Pixelpuffer (kein PNG-Umweg).
+
+    Das Bild teilt sich den Speicher mit icon.data und ist nur gültig, solange icon lebt;
+    vor dem Weitergeben an einen anderen Thread .copy() aufrufen.
+    """
+    return QImage(icon.data, icon.width, icon.height, icon.stride,
+                  QImage.Format.Format_ARGB32_Premultiplied)
+
+
+def available_backends() -> List[str]:
+    """Namen der nutzbaren Backends, schnellstes zuerst."""
+    names = []
+    if HAVE_CAIRO:
+        names.append(CairoBackend.name)
+    if HAVE_QTSVG:
+        names.append(QtSvgBackend.name)
+    return names
+
+
+def select_backend(preferred: str = None):
+    """Wählt ein Backend (bevorzugt das angegebene, sonst das schnellste verfügbare)."""
+    backends = {CairoBackend.name: CairoBackend, QtSvgBackend.name: QtSvgBackend}
+    names = available_backends()
+    if preferred in names:
+        return backends[preferred]()
+    return backends[names[0]]() if names else None
+
+
+BACKEND = select_backend(os.environ.get('PLANETFINDER_ICON_BACKEND'))
+BACKEND_NAME = BACKEND.name if BACKEND else None
+HAVE_RENDERER = BACKEND is not None
+
+
+def render_icon(sprite: SvgSprite, svg_id: str, size: int, backend=None, png: bool = False) -> Optional[RenderedIcon]:
+    """
+    Rastert ein einzelnes Symbol (None, wenn es fehlt oder kein Renderer verfügbar ist).
+
+    png=True kodiert zusätzlich ein PNG (nur für den Festplatten-Cache nötig).
+    """
+    backend = backend or BACKEND
+    if backend is None:
+        return None
+    svg_str = sprite.svg_document(svg_id, size)
+    if svg_str is None:
+        return None
+    width, height, stride, data, encoded = backend.render(svg_str, size, png)
+    return RenderedIcon(svg_id, size, width, height, stride, data, encoded)
+
+
+# Sprite pro Worker-Prozess (wird im Initializer einmal geladen)
+_worker_sprite: Optional[SvgSprite] = None
+
+
+def _init_worker(sprite_path: str):
+    global _worker_sprite
+    _worker_sprite = SvgSprite(sprite_path)
+
+
+def _render_chunk(jobs: List[Tuple[str, int]], sprite: SvgSprite = None, png: bool = False) -> List[RenderedIcon]:
+    in_worker = sprite is None
+    sprite = sprite or _worker_sprite
+    icons = []
+    for svg_id, size in jobs:
+        try:
+            icon = render_icon(sprite, svg_id, size, png=png)
+        except Exception as e:
+            print(f"Fehler beim Rendern von Icon {svg_id}: {e}")
+            continue
+        if icon is None:
+            continue
+        if in_worker and isinstance(icon.data, memoryview):
+            # Zurück zum Hauptprozess geht es gepickelt; ein memoryview lässt sich nicht pickeln
+            icon = icon._replace(data=icon.data.tobytes())
+        icons.append(icon)
+    return icons
+
+
+def iter_render_batch(sprite_path: str, jobs: Iterable[Tuple[str, int]],
+                      max_workers: int = None, chunk_size: int = 8, png: bool = False) -> Iterator[List[RenderedIcon]]:
+    """
+    Rastert Aufträge blockweise und liefert die Ergebnisse, sobald ein Block fertig ist.
+
+    Args:
+        sprite_path: Pfad zur Sprite-Datei (jeder Worker lädt sie einmal)
+        jobs: (svg_id, Größe in Pixeln)-Paare; Duplikate werden nur einmal gerendert
+        max_workers: Anzahl Prozesse (Standard: Anzahl CPU-Kerne)
+        chunk_size: Aufträge pro Block
+        png: Zusätzlich PNGs kodieren (nur für den Festplatten-Cache nötig)
+
+    Returns:
+        Iterator über Listen von RenderedIcon
+    """
+    if not HAVE_RENDERER:
+        return
+    jobs = list(dict.fromkeys(jobs))
+    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+    workers = min(max_workers or os.cpu_count() or 1, len(chunks))
+
+    if len(jobs) < MIN_PARALLEL_JOBS or workers <= 1:
+        sprite = SvgSprite(sprite_path)
+        for chunk in chunks:
+            yield _render_chunk(chunk, sprite, png)
+        return
+
+    # spawn statt fork: gestartet wird aus einem Thread des Qt-Prozesses, ein geforktes Kind
+    # erbte Locks anderer Threads (Qt, cairo, Thread-Pool) im gesperrten Zustand
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(sprite_path,)) as pool:
+        futures = [pool.submit(_render_chunk, chunk, None, png) for chunk in chunks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def render_batch(sprite_path: str, jobs: Iterable[Tuple[str, int]],
+                 max_workers: int = None, png: bool = False) -> Dict[Tuple[str, int], RenderedIcon]:
+    """Rastert alle Aufträge und gibt {(svg_id, Größe): RenderedIcon} zurück."""
+    icons = {}
+    for chunk in iter_render_batch(sprite_path, jobs, max_workers, png=png):
+        for icon in chunk:
+            icons[(icon.svg_id, icon.size)] = icon
+    return icons
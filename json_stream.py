@@ -0,0 +1,155 @@
+"""
+Gestreamtes JSON für große Dateien
+Liest ein JSON-Dokument blockweise (Bytes, inkrementell als UTF-8 dekodiert) und gibt
+die Werte einzeln über json.JSONDecoder.raw_decode heraus. Im Speicher liegen nur der
+Lesepuffer und der gerade gelesene Wert, nie der ganze Objektbaum - z.B. ein System
+samt Planeten statt aller Systeme aus data.json.
+"""
+
+import codecs
+import json
+import os
+import re
+from typing import Any, BinaryIO, Iterator
+
+# Blockgröße beim Lesen; ein Wert, der nicht in den Puffer passt, lässt ihn wachsen
+CHUNK_BYTES = 1 << 20
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER_TAIL = re.compile(r'[0-9+\-.eE]*')
+
+
+class JsonPullReader:
+    """Zieht Werte nacheinander aus einem Binär-Stream (Pull-Parser über raw_decode)."""
+
+    def __init__(self, f: BinaryIO, size: int = None, chunk_bytes: int = CHUNK_BYTES):
+        """
+        Args:
+            f: Im Binärmodus geöffnete Datei
+            size: Dateigröße in Bytes (nur für progress)
+            chunk_bytes: Bytes pro Lesevorgang
+        """
+        self.f = f
+        self.size = size
+        self.chunk_bytes = chunk_bytes
+        self.decoder = json.JSONDecoder()
+        self.utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.bytes_read = 0
+        self.eof = False
+
+    @property
+    def progress(self) -> float:
+        """Gelesener Anteil der Datei (0..1; ohne size immer 0)."""
+        if not self.size:
+            return 0.0
+        return min(self.bytes_read / self.size, 1.0)
+
+    def _fill(self, min_bytes: int = 0) -> bool:
+        """Hängt mindestens einen Block an den Puffer an; False am Dateiende."""
+        if self.eof:
+            return False
+        data = self.f.read(max(self.chunk_bytes, min_bytes))
+        self.bytes_read += len(data)
+        if not data:
+            self.eof = True
+        text = self.utf8.decode(data, final=not data)
+        # Bereits gelesenen Anfang verwerfen, damit der Puffer nicht mit der Datei wächst
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += text
+        return bool(data)
+
+    def peek(self) -> str:
+        """Nächstes Zeichen nach Leerraum, ohne es zu verbrauchen ('' am Dateiende)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        """Verbraucht ein Strukturzeichen ({ [ : , ] }); ValueError, wenn etwas anderes folgt."""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON: {char!r} erwartet, {found or 'Dateiende'!r} gefunden")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Liest den nächsten vollständigen Wert (Objekt, Array, String, Zahl, ...)."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Wert ist noch unvollständig: Puffer verdoppeln statt Block für Block neu zu parsen
+                if self._fill(len(self.buf) - self.pos):
+                    continue
+                raise
+            # Eine Zahl am Pufferende könnte abgeschnitten sein ("12" von "123", "1." von "1.5")
+            if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and _NUMBER_TAIL.match(self.buf, end).end() == len(self.buf) and self._fill()):
+                continue
+            self.pos = end
+            return value
+
+    def skip(self):
+        """Überspringt den nächsten Wert; bei Arrays und Objekten Element für Element."""
+        char = self.peek()
+        if char == '[':
+            for _ in self.iter_array():
+                pass
+        elif char == '{':
+            for _ in self.iter_object():
+                self.value()
+        else:
+            self.value()
+
+    def iter_object(self) -> Iterator[str]:
+        """
+        Geht ein Objekt Schlüssel für Schlüssel durch.
+
+        Nach jedem Schlüssel muss der Aufrufer den zugehörigen Wert verbrauchen
+        (value, skip, iter_array oder iter_object), bevor er weiter iteriert.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise ValueError(f"JSON: Schlüssel erwartet, {key!r} gefunden")
+            self.expect(':')
+            yield key
+            if self.peek() == '}':
+                self.pos += 1
+                return
+            self.expect(',')
+
+    def iter_array(self) -> Iterator[Any]:
+        """Liefert die Elemente eines Arrays einzeln."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ']':
+                self.pos += 1
+                return
+            self.expect(',')
+
+
+def read_value(path: str, key: str, default: Any = None) -> Any:
+    """Liest nur einen Schlüssel der obersten Ebene (z.B. 'materials'); alles andere wird übersprungen."""
+    with open(path, 'rb') as f:
+        reader = JsonPullReader(f, os.path.getsize(path))
+        for name in reader.iter_object():
+            if name == key:
+                return reader.value()
+            reader.skip()
+    return default
@@ -0,0 +1,342 @@
+"""
+Kommandozeile für den Planet Finder
+Nutzt dieselbe GalaxyEngine wie die GUI und schreibt die Treffer zeilenweise als
+JSON Lines oder CSV nach stdout. Mit --queries werden viele Suchen aus einer Datei in
+einem Prozess ausgeführt, die Daten also nur einmal geladen.
+
+Beispiele:
+    python planet_cli.py --tiers 1,2 --materials "Iron Ore,5" --max-ly 40
+    python planet_cli.py --origin planet:1023 --format csv
+    python planet_cli.py --origin hub --max-ly 20      (Entfernung zum nächsten Hub)
+    python planet_cli.py --queries suchen.jsonl > treffer.jsonl
+    python planet_cli.py --materials "Iron Ore,5" --rank 50 --weights distance=0.5,abundance=1 --min-ab 5:40
+    python planet_cli.py --materials "Iron Ore,5" --systems --max-ly 40   (Systeme statt Planeten)
+
+Aufbau einer Zeile in der --queries Datei (alle Felder optional):
+    {"tiers": [1, 2], "materials": ["Iron Ore", 5], "max_ly": 40, "origin": "system:17"}
+Rangliste (die besten K nach Score statt aller Treffer nach Distanz, siehe RankSpec):
+    {"materials": ["Iron Ore"], "rank": 50, "weights": {"distance": 0.5}, "aggregate": "min",
+     "min_ab": {"Iron Ore": 40}}
+Systeme (deren Planeten zusammen alle Materialien liefern; mit "rank" nach Score):
+    {"materials": ["Iron Ore", 5], "systems": true, "rank": 20}
+Cluster (Planetengruppen, die zusammen alle Materialien liefern, siehe cluster_finder):
+    {"materials": ["Iron Ore", 5, 7], "clusters": 10, "cluster_radius": 15, "cluster_order": "radius"}
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app_paths import resource_path
+from cluster_finder import CLUSTER_RADIUS_LY, ORDERS, PlanetCluster, find_clusters
+from galaxy_engine import EXCHANGE_X, EXCHANGE_Y, NEAREST_HUB, GalaxyEngine, RankSpec, SearchQuery, SearchResult
+from galaxy_snapshot import load_engine
+
+FIELDS = ['query', 'id', 'sId', 'name', 'type', 'tier', 'fert', 'size', 'x', 'y',
+          'distanz', 'lichtjahre', 'mats', 'score', 'cluster', 'cluster_radius_ly', 'planets']
+
+
+def parse_tiers(value) -> List[int]:
+    """'1,2' oder [1, 2] -> [1, 2]."""
+    items = value.split(',') if isinstance(value, str) else value
+    try:
+        tiers = [int(t) for t in items if str(t).strip()]
+    except (TypeError, ValueError):
+        raise ValueError(f"Ungültige Tiers: {value!r}") from None
+    if not tiers or any(t not in (1, 2, 3, 4) for t in tiers):
+        raise ValueError(f"Ungültige Tiers: {value!r}")
+    return tiers
+
+
+def resolve_materials(engine: GalaxyEngine, value) -> List[int]:
+    """Material-IDs oder -Namen (Groß-/Kleinschreibung egal) -> Material-IDs."""
+    if value is None:
+        return []
+    if not isinstance(value, (str, list, tuple)):
+        raise ValueError(f"Ungültige Materialien: {value!r}")
+    items = value.split(',') if isinstance(value, str) else value
+    by_name = {name.lower(): mat_id for mat_id, name in engine.material_names.items()}
+    ids = []
+    for item in items:
+        item = str(item).strip()
+        if not item:
+            continue
+        if item.isdigit():
+            ids.append(int(item))
+        elif item.lower() in by_name:
+            ids.append(by_name[item.lower()])
+        else:
+            raise ValueError(f"Unbekanntes Material: {item!r}")
+    return ids
+
+
+def resolve_origin(engine: GalaxyEngine, value: Optional[str]) -> Tuple[float, float]:
+    """'exchange', 'planet:<id>', 'system:<id>' oder 'x,y' -> Koordinaten in Pixeln."""
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"Ungültiger Ursprung: {value!r}")
+    if not value or value == 'exchange':
+        return float(EXCHANGE_X), float(EXCHANGE_Y)
+    kind, _, key = value.partition(':')
+    try:
+        if kind == 'planet' and key:
+            row = engine.row_of(int(key))
+            return float(engine.x[row]), float(engine.y[row])
+        if kind == 'system' and key:
+            return engine.system_origin(int(key))
+        x, y = value.split(',')
+        return float(x), float(y)
+    except KeyError:
+        raise ValueError(f"Ursprung nicht gefunden: {value!r}") from None
+    except ValueError:
+        raise ValueError(f"Ungültiger Ursprung: {value!r}") from None
+
+
+def resolve_hub(value: Optional[str]) -> Optional[int]:
+    """'hub' bzw. 'hub:nearest' -> NEAREST_HUB, 'hub:<id>' -> Hub-ID, sonst None (fester Ursprung)."""
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"Ungültiger Ursprung: {value!r}")
+    kind, _, key = (value or '').partition(':')
+    if kind != 'hub':
+        return None
+    if key in ('', 'nearest'):
+        return NEAREST_HUB
+    try:
+        return int(key)
+    except ValueError:
+        raise ValueError(f"Ungültiger Hub: {value!r}") from None
+
+
+def build_query(engine: GalaxyEngine, query: dict) -> SearchQuery:
+    """Normalisierte Suche aus einem Dict (Format wie in der --queries Datei)."""
+    max_ly = query.get('max_ly')
+    if max_ly is not None:
+        try:
+            max_ly = float(max_ly)
+        except (TypeError, ValueError):
+            raise ValueError(f"Ungültige Entfernung: {max_ly!r}") from None
+    tiers = parse_tiers(query.get('tiers', [1, 2, 3, 4]))
+    materials = resolve_materials(engine, query.get('materials'))
+    hub = resolve_hub(query.get('origin'))
+    if hub is None:
+        return engine.query(tiers, materials, max_ly, resolve_origin(engine, query.get('origin')))
+    try:
+        return engine.query(tiers, materials, max_ly, hub=hub)
+    except KeyError:
+        raise ValueError(f"Hub nicht gefunden: {query.get('origin')!r}") from None
+
+
+def _pairs(value, what: str) -> Dict[str, str]:
+    """'a=1,b=2' (bzw. 'a:1') oder {'a': 1} -> Dict."""
+    if isinstance(value, dict):
+        return value
+    if not isinstance(value, str):
+        raise ValueError(f"Ungültige Angabe für {what}: {value!r}")
+    pairs = {}
+    for item in value.split(','):
+        if not item.strip():
+            continue
+        key, sep, number = item.replace(':', '=').rpartition('=')
+        if not sep or not key.strip():
+            raise ValueError(f"Ungültige Angabe für {what}: {item!r}")
+        pairs[key.strip()] = number.strip()
+    return pairs
+
+
+def build_rank(engine: GalaxyEngine, query: dict) -> Optional[RankSpec]:
+    """Rangliste aus einem Dict ('rank', 'weights', 'aggregate', 'min_ab'); None ohne 'rank'."""
+    k = query.get('rank')
+    if k is None or k == '':
+        return None
+    try:
+        weights = {name: float(value) for name, value in _pairs(query.get('weights') or {}, 'weights').items()}
+        min_ab = {}
+        for mat, value in _pairs(query.get('min_ab') or {}, 'min_ab').items():
+            min_ab[resolve_materials(engine, [mat])[0]] = int(value)
+        return RankSpec.create(int(k), weights, query.get('aggregate') or 'sum', min_ab)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Ungültige Rangliste: {e}") from None
+
+
+def run_query(engine: GalaxyEngine, query: dict) -> SearchResult:
+    """Führt eine Suche aus einem Dict (Format wie in der --queries Datei) aus."""
+    search = build_query(engine, query)
+    spec = build_rank(engine, query)
+    if query.get('systems'):
+        if spec is not None:
+            return engine.rank_systems(search.tiers, search.materials, spec, search.max_ly, search.origin,
+                                       search.hub)
+        return engine.search_systems(*search)
+    if spec is not None:
+        return engine.rank(search.tiers, search.materials, spec, search.max_ly, search.origin, search.hub)
+    return engine.search(*search)
+
+
+def run_clusters(engine: GalaxyEngine, query: dict) -> List[PlanetCluster]:
+    """Cluster-Suche aus einem Dict ('clusters', 'cluster_radius', 'cluster_order' und Filter)."""
+    search = build_query(engine, query)
+    if search.hub is not None:
+        raise ValueError("Cluster-Suche braucht einen festen Ursprung (kein Hub)")
+    try:
+        k = int(query['clusters'])
+        radius = float(query.get('cluster_radius') or CLUSTER_RADIUS_LY)
+    except (TypeError, ValueError):
+        raise ValueError("Ungültige Cluster-Angaben") from None
+    return find_clusters(engine, search.materials, search.tiers, k, radius,
+                         query.get('cluster_order') or 'radius', search.origin)
+
+
+def iter_cluster_planets(engine: GalaxyEngine, clusters: List[PlanetCluster], origin: Tuple[float, float],
+                         query_index: int = 0) -> Iterator[Dict]:
+    """Mitglieder aller Cluster als Planeten-Dicts (Anker zuerst) mit Cluster-Nummer und -Radius."""
+    for number, cluster in enumerate(clusters):
+        for row in cluster.rows.tolist():
+            planet = engine.planet(row)
+            distanz = float(np.hypot(engine.x[row] - origin[0], engine.y[row] - origin[1]))
+            planet.update({'query': query_index, 'distanz': round(distanz, 2),
+                           'lichtjahre': round(distanz / engine.px_to_ly, 2), 'cluster': number,
+                           'cluster_radius_ly': round(cluster.radius_ly, 2)})
+            yield planet
+
+
+def iter_planets(engine: GalaxyEngine, result: SearchResult, query_index: int = 0,
+                 limit: int = None) -> Iterator[Dict]:
+    """Erzeugt die Treffer einzeln als Dicts (die Ergebnisliste wird nie aufgebaut)."""
+    count = len(result) if limit is None else min(limit, len(result))
+    for i in range(count):
+        planet = engine.planet(int(result.rows[i]))
+        planet['query'] = query_index
+        planet['distanz'] = round(float(result.distanz[i]), 2)
+        planet['lichtjahre'] = round(float(result.lichtjahre[i]), 2)
+        if result.score is not None:
+            planet['score'] = round(float(result.score[i]), 3)
+        yield planet
+
+
+def iter_systems(engine: GalaxyEngine, result: SearchResult, query_index: int = 0,
+                 limit: int = None) -> Iterator[Dict]:
+    """Wie iter_planets für ein Ergebnis von search_systems/rank_systems (mats = Summen im System)."""
+    count = len(result) if limit is None else min(limit, len(result))
+    for i in range(count):
+        system = engine.system(int(result.rows[i]), result.query.tiers)
+        system['query'] = query_index
+        system['distanz'] = round(float(result.distanz[i]), 2)
+        system['lichtjahre'] = round(float(result.lichtjahre[i]), 2)
+        if result.score is not None:
+            system['score'] = round(float(result.score[i]), 3)
+        yield system
+
+
+def write_jsonl(records: Iterable[Dict], out):
+    for record in records:
+        out.write(json.dumps(record, ensure_ascii=False))
+        out.write('\n')
+
+
+def write_csv(records: Iterable[Dict], out, header: bool = True):
+    writer = csv.writer(out)
+    if header:
+        writer.writerow(FIELDS)
+    for record in records:
+        record['mats'] = ';'.join(f"{m['id']}:{m['ab']}" for m in record['mats'])
+        if 'planets' in record:
+            record['planets'] = ';'.join(str(planet_id) for planet_id in record['planets'])
+        writer.writerow([record.get(field, '') for field in FIELDS])
+
+
+def iter_query_file(path: str) -> Iterator[str]:
+    """Liest Suchen zeilenweise aus einer JSON-Lines-Datei ('-' = stdin); geparst wird mit parse_query."""
+    f = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    try:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def parse_query(line: str) -> dict:
+    """Eine Zeile aus --queries als Suche; ValueError bei ungültigem JSON oder wenn es kein Objekt ist."""
+    try:
+        query = json.loads(line)
+    except ValueError:
+        raise ValueError("ungültiges JSON") from None
+    if not isinstance(query, dict):
+        raise ValueError("kein JSON-Objekt")
+    return query
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Planeten suchen ohne GUI (Ausgabe nach stdout)")
+    parser.add_argument('--data', default=resource_path('data.json'), help="Pfad zur data.json")
+    parser.add_argument('--tiers', default='1,2,3,4', help="Erlaubte Tiers, z.B. 1,2")
+    parser.add_argument('--materials', help="Material-IDs oder -Namen, kommagetrennt")
+    parser.add_argument('--max-ly', type=float, help="Maximale Entfernung in Lichtjahren")
+    parser.add_argument('--origin', default='exchange',
+                        help="exchange, planet:<id>, system:<id>, x,y, hub (nächster Hub) oder hub:<id>")
+    parser.add_argument('--queries', help="JSON-Lines-Datei mit vielen Suchen ('-' = stdin)")
+    parser.add_argument('--format', choices=('jsonl', 'csv'), default='jsonl')
+    parser.add_argument('--limit', type=int, help="Höchstens so viele Treffer pro Suche")
+    parser.add_argument('--rank', type=int, help="Nur die besten K Planeten nach Score ausgeben")
+    parser.add_argument('--weights', help="Gewichte für --rank, z.B. distance=0.5,abundance=1,fert=0,size=0")
+    parser.add_argument('--aggregate', choices=('sum', 'min'), default='sum',
+                        help="Häufigkeit der Materialien für --rank summieren oder Minimum nehmen")
+    parser.add_argument('--min-ab', help="Mindest-Häufigkeit je Material für --rank, z.B. \"Iron Ore:40,5:20\"")
+    parser.add_argument('--systems', action='store_true',
+                        help="Sternsysteme ausgeben, deren Planeten zusammen alle --materials liefern")
+    parser.add_argument('--clusters', type=int,
+                        help="Die besten K Planetengruppen, die zusammen alle --materials liefern")
+    parser.add_argument('--cluster-radius', type=float, default=CLUSTER_RADIUS_LY,
+                        help="Größter Abstand eines Cluster-Mitglieds zum Anker (LY)")
+    parser.add_argument('--cluster-order', choices=ORDERS, default='radius',
+                        help="Cluster nach Radius oder nach Summe der Entfernungen zum Ursprung ordnen")
+    args = parser.parse_args(argv)
+
+    engine = load_engine(args.data)
+    if args.queries:
+        queries = iter_query_file(args.queries)
+    else:
+        queries = iter([{'tiers': args.tiers, 'materials': args.materials,
+                         'max_ly': args.max_ly, 'origin': args.origin, 'rank': args.rank,
+                         'weights': args.weights, 'aggregate': args.aggregate, 'min_ab': args.min_ab,
+                         'systems': args.systems, 'clusters': args.clusters, 'cluster_radius': args.cluster_radius,
+                         'cluster_order': args.cluster_order}])
+
+    out = sys.stdout
+    header = True
+    try:
+        for index, query in enumerate(queries):
+            try:
+                if args.queries:
+                    query = parse_query(query)
+                if query.get('clusters'):
+                    clusters = run_clusters(engine, query)
+                    records = iter_cluster_planets(engine, clusters, build_query(engine, query).origin, index)
+                elif query.get('systems'):
+                    records = iter_systems(engine, run_query(engine, query), index, args.limit)
+                else:
+                    records = iter_planets(engine, run_query(engine, query), index, args.limit)
+            except ValueError as e:
+                if not args.queries:
+                    parser.error(str(e))
+                print(f"Suche {index}: {e}", file=sys.stderr)
+                continue
+            if args.format == 'csv':
+                write_csv(records, out, header)
+                header = False
+            else:
+                write_jsonl(records, out)
+    except BrokenPipeError:
+        # z.B. bei "| head": Leser hat die Ausgabe geschlossen, Rest verwerfen
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,442 @@
+"""
+Lokaler HTTP/JSON-Dienst für Planeten-Abfragen
+Lädt die Galaxie samt Indizes einmal und beantwortet Anfragen mehrerer Dashboards aus
+dem Speicher. Reiner asyncio-Server (nur Standardbibliothek), lauscht standardmäßig
+nur auf localhost und braucht kein Netzwerk.
+
+Endpunkte:
+    GET  /search?tiers=1,2&materials=Iron%20Ore,5&max_ly=40&origin=exchange&limit=100&offset=0
+         (Rangliste: &rank=50&weights=distance=0.5,abundance=1&aggregate=min&min_ab=5:40)
+    GET  /systems?materials=Iron%20Ore,5&max_ly=40   Systeme, deren Planeten zusammen alles liefern
+         (Parameter wie /search, auch rank; in /batch: "systems": true)
+    POST /batch            JSON-Liste von Suchen (Format wie planet_cli --queries)
+    GET  /clusters?materials=23,70,75&clusters=10&cluster_radius=15&cluster_order=radius
+    GET  /planet/<id>
+    GET  /hubs             Hubs (Typ 1), z.B. für origin=hub:<id> (origin=hub: nächster Hub)
+    GET  /materials
+    GET  /icon/<svg_id>?size=24            PNG aus dem Icon-Cache (wird bei Bedarf gerendert)
+    GET  /icon/material/<mat_id>?size=24
+    GET  /metrics          Latenz-Histogramme und Cache-Zähler (Prometheus-Textformat)
+
+Aufruf: python query_server.py [--host 127.0.0.1] [--port 8765]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from app_paths import resource_path
+from galaxy_engine import GalaxyEngine, RankSpec, SearchQuery, SearchResult
+from galaxy_snapshot import load_engine
+from icon_cache import IconDiskCache
+from icon_mapper import get_svg_id_for_material
+from icon_render import HAVE_RENDERER, render_icon
+from planet_cli import build_query, build_rank, iter_cluster_planets, run_clusters
+from svg_sprite import SvgSprite, SPRITE_FILE
+
+# Obergrenzen der Latenz-Buckets in Millisekunden
+LATENCY_BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Wie lange eine Keep-Alive-Verbindung ohne neue Anfrage offen bleibt
+IDLE_TIMEOUT = 15.0
+
+# Größenlimits für Anfragen
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+
+# Schlüssel im Ergebnis-Cache (RankSpec None = vollständige Suche nach Distanz; bool = Systemsuche)
+CacheKey = Tuple[SearchQuery, Optional[RankSpec], bool]
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class LatencyHistogram:
+    """Kumulatives Histogramm wie bei Prometheus (Buckets in Millisekunden)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+
+    def observe(self, ms: float):
+        for i, bound in enumerate(self.buckets):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += 1
+        self.sum_ms += ms
+
+    def lines(self, name: str, labels: str) -> List[str]:
+        out = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            out.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+        out.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.total}')
+        out.append(f'{name}_sum{{{labels}}} {self.sum_ms:.3f}')
+        out.append(f'{name}_count{{{labels}}} {self.total}')
+        return out
+
+
+class ResultCache:
+    """LRU der zuletzt berechneten Suchergebnisse (Schlüssel: SearchQuery, ggf. RankSpec, Systemsuche)."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[CacheKey, SearchResult]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: CacheKey) -> Optional[SearchResult]:
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: CacheKey, result: SearchResult):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+class QueryService:
+    """Die eigentliche Anwendung: Engine, Caches und Routing der Anfragen."""
+
+    def __init__(self, engine: GalaxyEngine, sprite_path: str = None, cache_entries: int = 256):
+        self.engine = engine
+        self.results = ResultCache(cache_entries)
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.status_counts: Dict[int, int] = {}
+
+        self.sprite_path = sprite_path or resource_path(SPRITE_FILE)
+        try:
+            self.sprite = SvgSprite(self.sprite_path)
+            self.icon_cache = IconDiskCache(self.sprite_path)
+        except OSError as e:
+            print(f"Icons nicht verfügbar: {e}")
+            self.sprite = None
+            self.icon_cache = None
+
+    # --- Suche -------------------------------------------------------------------------
+
+    def search(self, params: dict) -> SearchResult:
+        """Suche mit LRU-Cache; params wie in planet_cli (Strings oder Listen, 'systems' für Systeme)."""
+        try:
+            query = build_query(self.engine, params)
+            spec = build_rank(self.engine, params)
+        except ValueError as e:
+            raise HttpError(400, str(e)) from None
+        systems = bool(params.get('systems'))
+        result = self.results.get((query, spec, systems))
+        if result is None:
+            args = (query.tiers, query.materials, spec, query.max_ly, query.origin, query.hub)
+            if systems:
+                result = self.engine.search_systems(*query) if spec is None else self.engine.rank_systems(*args)
+            else:
+                result = self.engine.search(*query) if spec is None else self.engine.rank(*args)
+            self.results.put((query, spec, systems), result)
+        return result
+
+    def result_json(self, result: SearchResult, limit: int = None, offset: int = 0, systems: bool = False) -> dict:
+        end = len(result) if limit is None else min(len(result), offset + limit)
+        planets = []
+        for i in range(offset, end):
+            if systems:
+                planet = self.engine.system(int(result.rows[i]), result.query.tiers)
+            else:
+                planet = self.engine.planet(int(result.rows[i]))
+            planet['distanz'] = round(float(result.distanz[i]), 2)
+            planet['lichtjahre'] = round(float(result.lichtjahre[i]), 2)
+            if result.score is not None:
+                planet['score'] = round(float(result.score[i]), 3)
+            planets.append(planet)
+        return {'count': len(result), 'offset': offset, 'results': planets}
+
+    @staticmethod
+    def _int_param(params: dict, name: str, default: Optional[int]) -> Optional[int]:
+        value = params.get(name)
+        if value is None or value == '':
+            return default
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            raise HttpError(400, f"Ungültiger Wert für {name}: {value!r}") from None
+        if number < 0:
+            raise HttpError(400, f"{name} darf nicht negativ sein")
+        return number
+
+    def handle_search(self, params: dict) -> dict:
+        result = self.search(params)
+        return self.result_json(result, self._int_param(params, 'limit', 100),
+                                self._int_param(params, 'offset', 0), bool(params.get('systems')))
+
+    def handle_batch(self, body: bytes) -> list:
+        try:
+            queries = json.loads(body or b'[]')
+        except ValueError:
+            raise HttpError(400, "Body ist kein gültiges JSON") from None
+        if not isinstance(queries, list):
+            raise HttpError(400, "Erwartet wird eine JSON-Liste von Suchen")
+        answers = []
+        for params in queries:
+            # Eine ungültige Suche (auch falsche Typen wie "materials": 5) wird nur für ihren
+            # Eintrag gemeldet, die übrigen liefern trotzdem Ergebnisse
+            try:
+                if not isinstance(params, dict):
+                    raise HttpError(400, "Jede Suche muss ein JSON-Objekt sein")
+                answers.append(self.handle_search(params))
+            except (HttpError, ValueError) as e:
+                answers.append({'error': str(e)})
+        return answers
+
+    def handle_clusters(self, params: dict) -> dict:
+        params = dict(params)
+        params.setdefault('clusters', 10)
+        try:
+            clusters = run_clusters(self.engine, params)
+            origin = build_query(self.engine, params).origin
+        except ValueError as e:
+            raise HttpError(400, str(e)) from None
+        answer = [{'radius_ly': round(c.radius_ly, 2), 'distance_ly': round(c.distance_ly, 2), 'planets': []}
+                  for c in clusters]
+        for planet in iter_cluster_planets(self.engine, clusters, origin):
+            answer[planet.pop('cluster')]['planets'].append(planet)
+        return {'count': len(answer), 'clusters': answer}
+
+    # --- Stammdaten --------------------------------------------------------------------
+
+    def handle_planet(self, planet_id: str) -> dict:
+        try:
+            row = self.engine.row_of(int(planet_id))
+        except (KeyError, ValueError):
+            raise HttpError(404, f"Planet {planet_id} nicht gefunden") from None
+        return self.engine.planet(row)
+
+    def handle_materials(self) -> list:
+        available = self.engine.available_materials()
+        return [{'id': m['id'], 'name': m['name'], 'available': m['id'] in available,
+                 'svg_id': get_svg_id_for_material(m['id'], m['name'])}
+                for m in self.engine.materials]
+
+    # --- Icons -------------------------------------------------------------------------
+
+    def icon_png(self, svg_id: str, size: int) -> bytes:
+        """PNG aus dem Festplatten-Cache; fehlt es, wird gerendert und gespeichert."""
+        if self.sprite is None or svg_id not in self.sprite:
+            raise HttpError(404, f"Icon {svg_id} nicht gefunden")
+        png = self.icon_cache.get(svg_id, size)
+        if png is None:
+            if not HAVE_RENDERER:
+                raise HttpError(503, "Kein SVG-Renderer verfügbar")
+            icon = render_icon(self.sprite, svg_id, size, png=True)
+            if icon is None:
+                raise HttpError(404, f"Icon {svg_id} nicht gefunden")
+            png = icon.png
+            self.icon_cache.put(svg_id, size, 1.0, png)
+        return png
+
+    def icon_request(self, parts: List[str], params: dict) -> Tuple[str, int]:
+        size = self._int_param(params, 'size', 24)
+        if not 1 <= size <= 512:
+            raise HttpError(400, "size muss zwischen 1 und 512 liegen")
+        if len(parts) == 3 and parts[1] == 'material':
+            try:
+                mat_id = int(parts[2])
+            except ValueError:
+                raise HttpError(404, f"Material {parts[2]} nicht gefunden") from None
+            svg_id = get_svg_id_for_material(mat_id, self.engine.material_name(mat_id, ''))
+            if svg_id is None:
+                raise HttpError(404, f"Kein Icon für Material {mat_id}")
+            return svg_id, size
+        if len(parts) == 2:
+            return parts[1], size
+        raise HttpError(404, "Unbekannter Pfad")
+
+    # --- Metriken ----------------------------------------------------------------------
+
+    def observe(self, route: str, status: int, ms: float):
+        self.latency.setdefault(route, LatencyHistogram()).observe(ms)
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    def metrics_text(self) -> str:
+        lines = ['# TYPE planetfinder_request_latency_ms histogram']
+        for route, histogram in sorted(self.latency.items()):
+            lines.extend(histogram.lines('planetfinder_request_latency_ms', f'route="{route}"'))
+        lines.append('# TYPE planetfinder_responses_total counter')
+        for status, count in sorted(self.status_counts.items()):
+            lines.append(f'planetfinder_responses_total{{status="{status}"}} {count}')
+        lines.append('# TYPE planetfinder_result_cache_hits_total counter')
+        lines.append(f'planetfinder_result_cache_hits_total {self.results.hits}')
+        lines.append('# TYPE planetfinder_result_cache_misses_total counter')
+        lines.append(f'planetfinder_result_cache_misses_total {self.results.misses}')
+        lines.append('# TYPE planetfinder_result_cache_entries gauge')
+        lines.append(f'planetfinder_result_cache_entries {len(self.results.entries)}')
+        lines.append('# TYPE planetfinder_planets gauge')
+        lines.append(f'planetfinder_planets {len(self.engine)}')
+        return '\n'.join(lines) + '\n'
+
+    # --- Routing -----------------------------------------------------------------------
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> Tuple[str, int, str, bytes]:
+        """Gibt (Route für Metriken, Status, Content-Type, Body) zurück."""
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        parts = [unquote(p) for p in url.path.split('/') if p]
+        route = parts[0] if parts else ''
+
+        if route == 'batch':
+            if method != 'POST':
+                raise HttpError(405, "Nur POST erlaubt")
+            return route, 200, 'application/json', _json_bytes(self.handle_batch(body))
+        if method != 'GET':
+            raise HttpError(405, "Nur GET erlaubt")
+        if route == 'search' and len(parts) == 1:
+            return route, 200, 'application/json', _json_bytes(self.handle_search(params))
+        if route == 'systems' and len(parts) == 1:
+            return route, 200, 'application/json', _json_bytes(self.handle_search(dict(params, systems=True)))
+        if route == 'clusters' and len(parts) == 1:
+            return route, 200, 'application/json', _json_bytes(self.handle_clusters(params))
+        if route == 'planet' and len(parts) == 2:
+            return route, 200, 'application/json', _json_bytes(self.handle_planet(parts[1]))
+        if route == 'materials' and len(parts) == 1:
+            return route, 200, 'application/json', _json_bytes(self.handle_materials())
+        if route == 'hubs' and len(parts) == 1:
+            return route, 200, 'application/json', _json_bytes(self.engine.hubs())
+        if route == 'icon':
+            svg_id, size = self.icon_request(parts, params)
+            # Rendern kann dauern - nicht im Event-Loop
+            png = await asyncio.get_running_loop().run_in_executor(None, self.icon_png, svg_id, size)
+            return route, 200, 'image/png', png
+        if route == 'metrics' and len(parts) == 1:
+            return route, 200, 'text/plain; version=0.0.4', self.metrics_text().encode('utf-8')
+        raise HttpError(404, "Unbekannter Pfad")
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Eine TCP-Verbindung; mehrere Anfragen nacheinander (Keep-Alive)."""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), IDLE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self.send(writer, 413, 'application/json',
+                                    _json_bytes({'error': REASONS[413]}), False)
+                    return
+
+                start = time.perf_counter()
+                keep_alive = False
+                route = 'invalid'
+                try:
+                    method, target, version, headers = _parse_head(head)
+                    keep_alive = _wants_keep_alive(version, headers)
+                    try:
+                        length = int(headers.get('content-length', 0) or 0)
+                    except ValueError:
+                        keep_alive = False
+                        raise HttpError(400, "Ungültige Content-Length") from None
+                    if length > MAX_BODY_BYTES:
+                        keep_alive = False
+                        raise HttpError(413, REASONS[413])
+                    body = await reader.readexactly(length) if length else b''
+                    route, status, content_type, payload = await self.dispatch(method, target, body)
+                except HttpError as e:
+                    status, content_type = e.status, 'application/json'
+                    payload = _json_bytes({'error': str(e)})
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except Exception as e:
+                    print(f"Fehler bei Anfrage: {e!r}")
+                    status, content_type = 500, 'application/json'
+                    payload = _json_bytes({'error': REASONS[500]})
+
+                await self.send(writer, status, content_type, payload, keep_alive)
+                self.observe(route, status, (time.perf_counter() - start) * 1000)
+                if not keep_alive:
+                    return
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def send(writer: asyncio.StreamWriter, status: int, content_type: str, payload: bytes,
+                   keep_alive: bool):
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + payload)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+
+def _json_bytes(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+def _parse_head(head: bytes):
+    """Zerlegt Anfragezeile und Header; Header-Namen werden kleingeschrieben."""
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, version = lines[0].split(' ')
+    except ValueError:
+        raise HttpError(400, "Ungültige Anfragezeile") from None
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+    return method, target, version, headers
+
+
+def _wants_keep_alive(version: str, headers: dict) -> bool:
+    connection = headers.get('connection', '').lower()
+    if version == 'HTTP/1.1':
+        return connection != 'close'
+    return connection == 'keep-alive'
+
+
+async def serve(service: QueryService, host: str, port: int):
+    server = await asyncio.start_server(service.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+    addresses = ', '.join(f"{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets)
+    print(f"Planet Finder Dienst läuft auf {addresses} ({len(service.engine)} Planeten)")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Lokaler HTTP/JSON-Dienst für Planeten-Abfragen")
+    parser.add_argument('--data', default=resource_path('data.json'), help="Pfad zur data.json")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--cache-entries', type=int, default=256, help="Größe des Ergebnis-LRU")
+    args = parser.parse_args(argv)
+
+    service = QueryService(load_engine(args.data), cache_entries=args.cache_entries)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Tabellen-Modell für Suchergebnisse
+Liest direkt aus den Ergebnis-Arrays der GalaxyEngine; Zellen werden erst in data()
+formatiert, Sortierung passiert per argsort im Modell und Zeilen werden blockweise
+nachgeladen (fetchMore), damit auch 100k Treffer sofort erscheinen.
+"""
+
+import numpy as np
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from galaxy_engine import GalaxyEngine, SearchResult
+from tracing import traced
+
+HEADERS = ["Name", "ID", "System-ID", "Typ", "Fert", "X", "Y", "Size", "Tier", "Distanz", "LY", "Score"]
+
+# Anzahl Zeilen, die pro fetchMore an die View gemeldet werden
+FETCH_BATCH = 2000
+
+
+class PlanetTableModel(QAbstractTableModel):
+    """Virtualisierte Ergebnistabelle über einem SearchResult."""
+
+    def __init__(self, engine: GalaxyEngine, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.rows = np.empty(0, dtype=np.int64)
+        self.distanz = np.empty(0)
+        self.lichtjahre = np.empty(0)
+        self.score = None  # nur bei Ranglisten (GalaxyEngine.rank)
+        self.loaded = 0
+
+    def set_result(self, result: SearchResult):
+        """Ersetzt den Inhalt durch ein neues Suchergebnis."""
+        self.beginResetModel()
+        self.rows = result.rows
+        self.distanz = result.distanz
+        self.lichtjahre = result.lichtjahre
+        self.score = result.score
+        self.loaded = min(len(self.rows), FETCH_BATCH)
+        self.endResetModel()
+
+    def update_result(self, result: SearchResult):
+        """Zwischenstand einer laufenden Suche übernehmen; geladene Zeilen bleiben sichtbar."""
+        loaded = self.loaded
+        self.beginResetModel()
+        self.rows = result.rows
+        self.distanz = result.distanz
+        self.lichtjahre = result.lichtjahre
+        self.score = result.score
+        self.loaded = min(len(self.rows), max(loaded, FETCH_BATCH))
+        self.endResetModel()
+
+    def clear(self):
+        """Leert die Tabelle."""
+        self.beginResetModel()
+        self.rows = np.empty(0, dtype=np.int64)
+        self.distanz = np.empty(0)
+        self.lichtjahre = np.empty(0)
+        self.score = None
+        self.loaded = 0
+        self.endResetModel()
+
+    def total(self) -> int:
+        """Anzahl aller Treffer (auch noch nicht geladener)."""
+        return len(self.rows)
+
+    def planet_row(self, row: int) -> int:
+        """Zeile in den Engine-Spalten für eine Tabellenzeile."""
+        return int(self.rows[row])
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.loaded
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self.loaded < len(self.rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(FETCH_BATCH, len(self.rows) - self.loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        r = int(self.rows[index.row()])
+        col = index.column()
+        e = self.engine
+        if col == 0:
+            return e.names[r]
+        if col == 9:
+            return f"{self.distanz[index.row()]:.2f}"
+        if col == 10:
+            return f"{self.lichtjahre[index.row()]:.2f}"
+        if col == 11:
+            return "" if self.score is None else f"{self.score[index.row()]:.1f}"
+        column = (e.ids, e.sid, e.type, e.fert, e.x, e.y, e.size, e.tier)[col - 1]
+        return str(int(column[r]))
+
+    def sort_key(self, column: int) -> np.ndarray:
+        """Sortierschlüssel einer Spalte für die aktuellen Treffer."""
+        e = self.engine
+        if column == 0:
+            return np.array([e.names[r] for r in self.rows.tolist()], dtype=object)
+        if column == 9:
+            return self.distanz
+        if column == 10:
+            return self.lichtjahre
+        if column == 11:
+            return self.distanz if self.score is None else self.score
+        return (e.ids, e.sid, e.type, e.fert, e.x, e.y, e.size, e.tier)[column - 1][self.rows]
+
+    @traced('results.sort')
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder):
+        if column < 0 or not len(self.rows):
+            return
+        self.beginResetModel()
+        perm = np.argsort(self.sort_key(column), kind='stable')
+        if order == Qt.SortOrder.DescendingOrder:
+            perm = perm[::-1]
+        self.rows = self.rows[perm]
+        self.distanz = self.distanz[perm]
+        self.lichtjahre = self.lichtjahre[perm]
+        if self.score is not None:
+            self.score = self.score[perm]
+        self.endResetModel()
@@ -0,0 +1,59 @@
+"""
+Suche im Hintergrund
+Ein QRunnable wertet die Filter blockweise über GalaxyEngine.iter_search aus, führt
+die Teilergebnisse zusammen und meldet den Zwischenstand samt Fortschritt per Signal
+an den GUI-Thread. Zwischen zwei Blöcken wird das Abbruch-Flag geprüft, sodass eine
+neue Suche die alte sofort ablöst. Ranglisten (GalaxyEngine.rank) laufen in einem Stück.
+"""
+
+import time
+from typing import Iterable, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from galaxy_engine import GalaxyEngine, RankSpec, SearchResult
+from tracing import span
+
+
+class SearchSignals(QObject):
+    """Signale des Such-Workers; generation ordnet Meldungen der auslösenden Suche zu."""
+    partial = pyqtSignal(int, object, float, float)  # generation, Zwischenstand, Fortschritt, Sekunden
+    finished = pyqtSignal(int, object, float)  # generation, Ergebnis, Sekunden
+
+
+class SearchTask(QRunnable):
+    """Führt eine Suche blockweise aus; cancel() beendet sie nach dem aktuellen Block."""
+
+    def __init__(self, engine: GalaxyEngine, generation: int, tiers: Iterable[int],
+                 materials: Iterable[int], max_ly: Optional[float], origin: Tuple[float, float],
+                 previous: SearchResult = None, rank: RankSpec = None, hub: Optional[int] = None):
+        super().__init__()
+        self.engine = engine
+        self.generation = generation
+        self.args = (list(tiers), list(materials), max_ly, origin, hub, previous)
+        self.rank = rank
+        self.cancelled = False
+        self.signals = SearchSignals()
+
+    def cancel(self):
+        """Bricht nach dem aktuellen Block ab (neue Suche oder Fenster geschlossen)."""
+        self.cancelled = True
+
+    def run(self):
+        start = time.perf_counter()
+        tiers, materials, max_ly, origin, hub, previous = self.args
+        if self.rank is not None:
+            result = self.engine.rank(tiers, materials, self.rank, max_ly, origin, hub)
+            if not self.cancelled:
+                self.signals.finished.emit(self.generation, result, time.perf_counter() - start)
+            return
+        result = None
+        for progress, piece in self.engine.iter_search(tiers, materials, max_ly, origin, hub, previous):
+            if self.cancelled:
+                return
+            with span('search_planets.merge'):
+                result = piece if result is None else result.merged(piece)
+            if len(piece) and progress < 1.0:
+                self.signals.partial.emit(self.generation, result, progress, time.perf_counter() - start)
+        if not self.cancelled:
+            self.signals.finished.emit(self.generation, result, time.perf_counter() - start)
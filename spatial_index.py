@@ -0,0 +1,176 @@
+"""
+Räumlicher Index für Planeten-Koordinaten
+Gleichmäßiges Gitter über x/y (Pixel): Umkreis- und Nächste-N-Abfragen von einem
+beliebigen Ursprung aus, ohne jeden Planeten einzeln anzufassen.
+"""
+
+import copy
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class SpatialGrid:
+    """Uniformes Gitter mit CSR-Zellenliste (Zeilen nach Zellen-ID sortiert)."""
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, cell_size: Optional[float] = None,
+                 points_per_cell: int = 8):
+        self.x = x
+        self.y = y
+        n = len(x)
+
+        if n:
+            self.min_x, self.min_y = float(x.min()), float(y.min())
+            width = float(x.max()) - self.min_x
+            height = float(y.max()) - self.min_y
+        else:
+            self.min_x = self.min_y = width = height = 0.0
+
+        if cell_size is None:
+            # Zellgröße so wählen, dass im Mittel ~points_per_cell Planeten pro Zelle liegen
+            area = max(width * height, 1.0)
+            cell_size = math.sqrt(area * points_per_cell / max(n, 1))
+        self.cell_size = max(float(cell_size), 1.0)
+
+        self.nx = int(width // self.cell_size) + 1
+        self.ny = int(height // self.cell_size) + 1
+
+        cx, cy = self._cell_coords(x, y)
+        cell_ids = cy * self.nx + cx
+        self.order = np.argsort(cell_ids, kind='stable').astype(np.int64)
+        counts = np.bincount(cell_ids, minlength=self.nx * self.ny)
+        self.cell_start = np.zeros(self.nx * self.ny + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.cell_start[1:])
+
+    def _cell_coords(self, x, y):
+        """Zellen-Koordinaten (auf das Gitter begrenzt) für Punkte."""
+        cx = np.clip(((np.asarray(x) - self.min_x) // self.cell_size).astype(np.int64), 0, self.nx - 1)
+        cy = np.clip(((np.asarray(y) - self.min_y) // self.cell_size).astype(np.int64), 0, self.ny - 1)
+        return cx, cy
+
+    def cell_ids(self, x, y) -> np.ndarray:
+        """Zellen-ID (cy * nx + cx) für Punkte."""
+        cx, cy = self._cell_coords(x, y)
+        return cy * self.nx + cx
+
+    def patched(self, x: np.ndarray, y: np.ndarray, row_map: np.ndarray, touched: np.ndarray) -> 'SpatialGrid':
+        """
+        Gitter für geänderte Koordinaten, ohne alle Zeilen neu zu sortieren.
+
+        Args:
+            x, y: Neue Koordinaten
+            row_map: Alte Zeile -> neue Zeile (-1 = entfernt); überlebende Zeilen behalten ihre Reihenfolge
+            touched: Neue Zeilen mit geänderter oder neuer Position (werden neu einsortiert)
+
+        Returns:
+            Neues Gitter gleicher Geometrie; liegt ein Punkt außerhalb davon, ein neu gebautes
+        """
+        if len(touched):
+            tx, ty = x[touched], y[touched]
+            if (tx.min() < self.min_x or ty.min() < self.min_y or tx.max() >= self.min_x + self.nx * self.cell_size
+                    or ty.max() >= self.min_y + self.ny * self.cell_size):
+                return SpatialGrid(x, y)
+
+        n = len(x)
+        cells = np.repeat(np.arange(self.nx * self.ny, dtype=np.int64), np.diff(self.cell_start))
+        order = row_map[self.order]
+        moved = np.zeros(n, dtype=bool)
+        moved[touched] = True
+        keep = order >= 0
+        keep[keep] = ~moved[order[keep]]
+        order, cells = order[keep], cells[keep]
+
+        # Schlüssel (Zelle, Zeile) ist sortiert wie nach argsort(stable); row_map erhält die Reihenfolge
+        new_cells = self.cell_ids(x[touched], y[touched])
+        key = new_cells * n + touched
+        by_key = np.argsort(key)
+        pos = np.searchsorted(cells * n + order, key[by_key])
+
+        grid = copy.copy(self)
+        grid.x, grid.y = x, y
+        grid.order = np.insert(order, pos, touched[by_key])
+        grid.cell_start = np.zeros(self.nx * self.ny + 1, dtype=np.int64)
+        np.cumsum(np.bincount(np.insert(cells, pos, new_cells[by_key]), minlength=self.nx * self.ny),
+                  out=grid.cell_start[1:])
+        return grid
+
+    def _rows_in_cells(self, cx0: int, cx1: int, cy0: int, cy1: int) -> np.ndarray:
+        """Alle Zeilen in einem Zellen-Rechteck (Grenzen inklusive)."""
+        cx0, cx1 = max(cx0, 0), min(cx1, self.nx - 1)
+        cy0, cy1 = max(cy0, 0), min(cy1, self.ny - 1)
+        if cx0 > cx1 or cy0 > cy1:
+            return np.empty(0, dtype=np.int64)
+        # Innerhalb einer Gitterzeile liegen die Zellen zusammenhängend in order
+        slices = [self.order[self.cell_start[cy * self.nx + cx0]:self.cell_start[cy * self.nx + cx1 + 1]]
+                  for cy in range(cy0, cy1 + 1)]
+        return np.concatenate(slices)
+
+    def candidates(self, origin: Tuple[float, float], radius: float) -> np.ndarray:
+        """Zeilen aller Zellen, die den Umkreis berühren (Obermenge, ungefiltert)."""
+        ox, oy = origin
+        (cx0, cx1), (cy0, cy1) = self._cell_coords([ox - radius, ox + radius], [oy - radius, oy + radius])
+        return self._rows_in_cells(int(cx0), int(cx1), int(cy0), int(cy1))
+
+    def within(self, origin: Tuple[float, float], radius: float) -> np.ndarray:
+        """Zeilen aller Punkte mit Distanz <= radius (Pixel) zum Ursprung."""
+        rows = self.candidates(origin, radius)
+        dist = np.hypot(self.x[rows] - origin[0], self.y[rows] - origin[1])
+        return rows[dist <= radius]
+
+    def nearest(self, origin: Tuple[float, float], n: int,
+                mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Die n nächsten Punkte zum Ursprung, aufsteigend nach Distanz.
+
+        Args:
+            origin: Ursprung (x, y) in Pixeln
+            n: Anzahl gewünschter Punkte
+            mask: Optionale Bool-Maske; nur Zeilen mit True werden berücksichtigt
+
+        Returns:
+            Zeilenindizes der nächsten Punkte
+        """
+        if n <= 0 or len(self.x) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        ox, oy = origin
+        (ocx,), (ocy,) = self._cell_coords([ox], [oy])
+        max_ring = max(ocx, self.nx - 1 - ocx, ocy, self.ny - 1 - ocy)
+        # Abstand vom Ursprung zum Gitterrand (Ursprung kann außerhalb liegen)
+        outside = max(self.min_x - ox, ox - (self.min_x + self.nx * self.cell_size),
+                      self.min_y - oy, oy - (self.min_y + self.ny * self.cell_size), 0.0)
+
+        found = []
+        found_dist = []
+        count = 0
+        for ring in range(max_ring + 1):
+            if ring == 0:
+                rows = self._rows_in_cells(ocx, ocx, ocy, ocy)
+            else:
+                # Ring = Rand des Quadrats mit Chebyshev-Abstand ring
+                rows = np.concatenate([
+                    self._rows_in_cells(ocx - ring, ocx + ring, ocy - ring, ocy - ring),
+                    self._rows_in_cells(ocx - ring, ocx + ring, ocy + ring, ocy + ring),
+                    self._rows_in_cells(ocx - ring, ocx - ring, ocy - ring + 1, ocy + ring - 1),
+                    self._rows_in_cells(ocx + ring, ocx + ring, ocy - ring + 1, ocy + ring - 1),
+                ])
+            if mask is not None and len(rows):
+                rows = rows[mask[rows]]
+            if len(rows):
+                found.append(rows)
+                found_dist.append(np.hypot(self.x[rows] - ox, self.y[rows] - oy))
+                count += len(rows)
+
+            # Alle noch nicht besuchten Zellen liegen mindestens ring * cell_size entfernt
+            if count >= n:
+                dist = np.concatenate(found_dist)
+                if np.partition(dist, n - 1)[n - 1] <= math.hypot(ring * self.cell_size, outside):
+                    break
+
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        rows = np.concatenate(found)
+        dist = np.concatenate(found_dist)
+        order = np.argsort(dist, kind='stable')[:n]
+        return rows[order]
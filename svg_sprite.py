@@ -0,0 +1,63 @@
+"""
+Symboltabelle für die SVG-Sprite-Datei
+Liest die Sprite einmal ein und merkt sich pro Symbol-ID nur viewBox und Position;
+der Inhalt eines Symbols wird erst beim ersten Zugriff ausgeschnitten und gecacht.
+Wird von der GUI, test_icons.py und icon_mapper.py gemeinsam genutzt.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+SPRITE_FILE = 'sprite-D4k0byZ2.svg'
+
+_SYMBOL_RE = re.compile(r'<symbol\b([^>]*)>(.*?)</symbol>', re.S)
+_ATTR_RE = re.compile(r'([\w:.-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+
+
+class SvgSprite:
+    """O(1)-Zugriff auf die Symbole einer SVG-Sprite-Datei."""
+
+    def __init__(self, path: str):
+        with open(path, 'r', encoding='utf-8') as f:
+            self._text = f.read()
+
+        # id -> (viewBox, Start, Ende) des Symbol-Inhalts im Quelltext
+        self._symbols: Dict[str, Tuple[str, int, int]] = {}
+        self._markup: Dict[str, str] = {}
+        for match in _SYMBOL_RE.finditer(self._text):
+            attrs = {name: dq or sq for name, dq, sq in _ATTR_RE.findall(match.group(1))}
+            symbol_id = attrs.get('id')
+            if symbol_id and symbol_id not in self._symbols:
+                self._symbols[symbol_id] = (attrs.get('viewBox', '0 0 24 24'), match.start(2), match.end(2))
+
+    def __contains__(self, svg_id: str) -> bool:
+        return svg_id in self._symbols
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def ids(self) -> List[str]:
+        """Alle Symbol-IDs in Reihenfolge der Datei."""
+        return list(self._symbols)
+
+    def symbol(self, svg_id: str) -> Optional[Tuple[str, str]]:
+        """Gibt (viewBox, Inhalt) eines Symbols zurück oder None."""
+        entry = self._symbols.get(svg_id)
+        if entry is None:
+            return None
+        view_box, start, end = entry
+        markup = self._markup.get(svg_id)
+        if markup is None:
+            markup = self._markup[svg_id] = self._text[start:end]
+        return view_box, markup
+
+    def svg_document(self, svg_id: str, size: int) -> Optional[str]:
+        """Eigenständiges SVG-Dokument für ein Symbol in der angegebenen Größe."""
+        entry = self.symbol(svg_id)
+        if entry is None:
+            return None
+        view_box, markup = entry
+        return f'''<?xml version="1.0" encoding="UTF-8"?>
+<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" viewBox="{view_box}" width="{size}" height="{size}">
+<g>{markup}</g>
+</svg>'''
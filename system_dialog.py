@@ -0,0 +1,104 @@
+"""
+Dialog für die Systemsuche
+Zeigt Sternsysteme, deren Planeten zusammen alle gewählten Materialien liefern
+(GalaxyEngine.search_systems/rank_systems), als Baum: System -> Planeten.
+Tiers, Materialien und Ursprung kommen aus den Filtern des Hauptfensters.
+"""
+
+import time
+from typing import Callable, Iterable, Optional, Tuple
+
+from PyQt6.QtWidgets import (QComboBox, QDialog, QHBoxLayout, QLabel, QPushButton, QSpinBox, QTreeWidget,
+                             QTreeWidgetItem, QVBoxLayout)
+
+from galaxy_engine import GalaxyEngine, RankSpec
+
+COLUMNS = ["System / Planet", "ID", "Materialien (Summe ab)", "Entfernung LY", "Score"]
+
+# Standardanzahl angezeigter Systeme
+SYSTEM_LIMIT = 50
+
+
+class SystemDialog(QDialog):
+    def __init__(self, engine: GalaxyEngine,
+                 current_filters: Callable[[], Tuple[Iterable[int], Iterable[int], Tuple[float, float],
+                                                     Optional[int]]],
+                 parent=None):
+        """
+        Args:
+            engine: Galaxie
+            current_filters: Liefert (Tiers, Material-IDs, Ursprung, Hub) aus dem Hauptfenster
+        """
+        super().__init__(parent)
+        self.engine = engine
+        self.current_filters = current_filters
+        self.setWindowTitle("🪐 Systemsuche")
+        self.resize(820, 520)
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Anzahl:"))
+        self.k_spin = QSpinBox()
+        self.k_spin.setRange(1, 10000)
+        self.k_spin.setValue(SYSTEM_LIMIT)
+        controls.addWidget(self.k_spin)
+        controls.addWidget(QLabel("Sortierung:"))
+        self.order_combo = QComboBox()
+        self.order_combo.addItem("Geringste Entfernung", None)
+        self.order_combo.addItem("Höchste Häufigkeit (Summe)", 'sum')
+        self.order_combo.addItem("Höchste Häufigkeit (Minimum)", 'min')
+        controls.addWidget(self.order_combo)
+        search_btn = QPushButton("🔍 Systeme suchen")
+        search_btn.clicked.connect(self.search)
+        controls.addWidget(search_btn)
+        controls.addStretch()
+        layout.addLayout(controls)
+
+        self.info_label = QLabel("Materialien im Hauptfenster wählen, dann suchen")
+        layout.addWidget(self.info_label)
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(COLUMNS)
+        self.tree.setColumnWidth(0, 220)
+        self.tree.setColumnWidth(2, 300)
+        layout.addWidget(self.tree)
+
+    def search(self):
+        tiers, materials, origin, hub = self.current_filters()
+        materials = list(materials)
+        tiers = list(tiers)
+        if not tiers:
+            self.info_label.setText("❌ Mindestens ein Tier auswählen!")
+            return
+        k = self.k_spin.value()
+        aggregate = self.order_combo.currentData()
+        start = time.perf_counter()
+        if aggregate is None:
+            result = self.engine.search_systems(tiers, materials, origin=origin, hub=hub)
+            total = len(result)
+            result = result[:k]
+        else:
+            # Rangliste nur nach Häufigkeit der gewählten Materialien (Gleichstand: Entfernung)
+            spec = RankSpec.create(k, {'distance': 0.0}, aggregate)
+            result = self.engine.rank_systems(tiers, materials, spec, origin=origin, hub=hub)
+            total = len(result)
+        ms = (time.perf_counter() - start) * 1000
+
+        e = self.engine
+        index = e.system_index
+        selected = set(materials)
+        self.tree.clear()
+        for i, system in enumerate(result.rows.tolist()):
+            totals = index.materials(system, tiers)
+            shown = [m for m in sorted(totals) if m in selected] or sorted(totals)
+            provided = ', '.join(f"{e.material_name(m)} {totals[m]}" for m in shown)
+            score = "" if result.score is None else f"{result.score[i]:.0f}"
+            planets = index.planets(system, tiers)
+            item = QTreeWidgetItem([f"System {int(index.keys[system])} ({len(planets)} Planeten)",
+                                    str(int(index.keys[system])), provided, f"{result.lichtjahre[i]:.2f}", score])
+            for row in planets.tolist():
+                mats = e.mat_ids[e.mat_ptr[row]:e.mat_ptr[row + 1]].tolist()
+                names = ', '.join(e.material_name(m) for m in mats if not selected or m in selected)
+                item.addChild(QTreeWidgetItem([e.names[row], str(int(e.ids[row])), names, "", ""]))
+            self.tree.addTopLevelItem(item)
+        self.info_label.setText(f"✓ {total} Systeme gefunden, {len(result)} angezeigt ({ms:.0f} ms)")
@@ -0,0 +1,170 @@
+"""
+Sternsystem-Index für systemweite Suchen
+Gruppiert die Planeten-Zeilen nach sId (CSR: die Planeten von System s liegen in
+rows[ptr[s]:ptr[s+1]]) und berechnet beim Laden einmalig die Aggregate pro System:
+Material-Bitsets je Tier (ODER über die Planeten des Systems), Häufigkeitssummen je
+Material und Tier sowie Planetenzahl, Fruchtbarkeit und Größe je Tier. Eine Systemsuche
+wertet damit nur noch Bitsets und Gathers über die Systeme aus - wie die Planetensuche
+über die Planeten.
+"""
+
+from typing import Dict, Iterable
+
+import numpy as np
+
+
+class SystemIndex:
+    """CSR Sternsystem -> Planeten-Zeilen plus vorberechnete Aggregate (Systeme nach sId sortiert)."""
+
+    def __init__(self, engine):
+        """
+        Args:
+            engine: GalaxyEngine (gelesen werden nur die Spalten und die Hub-Zeilen)
+        """
+        n = len(engine.ids)
+        self.rows = np.argsort(engine.sid, kind='stable')
+        sids = engine.sid[self.rows]
+        starts = np.flatnonzero(np.concatenate(([True], sids[1:] != sids[:-1]))) if n else np.zeros(0, np.int64)
+        self.keys = sids[starts]
+        self.ptr = np.append(starts, n).astype(np.int64)
+        systems = len(self.keys)
+        counts = np.diff(self.ptr)
+        # Zeile -> Systemindex
+        self.of_row = np.empty(n, dtype=np.int32)
+        self.of_row[self.rows] = np.repeat(np.arange(systems, dtype=np.int32), counts)
+        self.row_tier = engine.tier[self.rows]
+
+        # Position aus der Systemtabelle; fehlt das System dort, der Schwerpunkt seiner Planeten
+        self.x = np.add.reduceat(engine.x[self.rows], starts) / counts if systems else np.zeros(0)
+        self.y = np.add.reduceat(engine.y[self.rows], starts) / counts if systems else np.zeros(0)
+        if systems and len(engine.system_ids):
+            order = np.argsort(engine.system_ids, kind='stable')
+            pos = np.minimum(np.searchsorted(engine.system_ids, self.keys, sorter=order), len(order) - 1)
+            found = engine.system_ids[order[pos]] == self.keys
+            self.x[found] = engine.system_x[order[pos[found]]]
+            self.y[found] = engine.system_y[order[pos[found]]]
+
+        # Planetenzahl, Fruchtbarkeit und Größe je System und Tier (Spalte = Tier)
+        self.tier_slots = int(engine.tier.max()) + 1 if n else 1
+        cell = self.of_row.astype(np.int64) * self.tier_slots + engine.tier
+        shape = (systems, self.tier_slots)
+        size = systems * self.tier_slots
+        self.planet_count = np.bincount(cell, minlength=size).reshape(shape).astype(np.int32)
+        self.fert = np.bincount(cell, weights=engine.fert, minlength=size).reshape(shape).astype(np.int64)
+        self.size = np.bincount(cell, weights=engine.size, minlength=size).reshape(shape).astype(np.int64)
+
+        self._build_materials(engine, systems)
+        self._build_hub_distances(engine)
+
+    def _build_materials(self, engine, systems: int):
+        """CSR System -> (Material, Tier, Summe ab) und gepackte Bitsets Material -> Tier x System."""
+        entry_sys = self.of_row[engine.mat_rows]
+        entry_tier = engine.tier[engine.mat_rows]
+        # Ein Schlüssel (System, Material, Tier); die Einträge liegen meist schon nach System
+        # geordnet vor, darauf ist die stabile Sortierung deutlich schneller als lexsort
+        mat_span = int(engine.mat_ids.max()) + 1 if len(engine.mat_ids) else 1
+        key = (entry_sys.astype(np.int64) * mat_span + engine.mat_ids) * self.tier_slots + entry_tier
+        order = np.argsort(key, kind='stable')
+        entry_sys, entry_tier = entry_sys[order], entry_tier[order]
+        entry_mat, entry_ab = engine.mat_ids[order], engine.mat_ab[order].astype(np.int64)
+        if len(order):
+            new = np.concatenate(([True], (entry_sys[1:] != entry_sys[:-1]) | (entry_mat[1:] != entry_mat[:-1])
+                                  | (entry_tier[1:] != entry_tier[:-1])))
+            starts = np.flatnonzero(new)
+            self.mat_ab = np.add.reduceat(entry_ab, starts)
+        else:
+            starts = np.zeros(0, dtype=np.int64)
+            self.mat_ab = np.zeros(0, dtype=np.int64)
+        self.mat_ids = entry_mat[starts]
+        self.mat_tier = entry_tier[starts]
+        self.mat_sys = entry_sys[starts]
+        self.mat_ptr = np.zeros(systems + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.mat_sys, minlength=systems), out=self.mat_ptr[1:])
+
+        # Je Material: seine Einträge (nach System sortiert) und ein Bitset Zeile = Tier, Bit = System
+        self.material_bits: Dict[int, np.ndarray] = {}
+        self.material_entries: Dict[int, np.ndarray] = {}
+        # Material-IDs passen fast immer in 16 Bit: dafür sortiert NumPy stabil per Radix-Sort
+        narrow = self.mat_ids.astype(np.int16) if len(self.mat_ids) and self.mat_ids.max() < 1 << 15 else self.mat_ids
+        by_mat = np.argsort(narrow, kind='stable')
+        sorted_ids = self.mat_ids[by_mat]
+        first = np.flatnonzero(np.concatenate(([True], sorted_ids[1:] != sorted_ids[:-1]))) if len(by_mat) else by_mat
+        for mat_id, entries in zip(sorted_ids[first].tolist(), np.split(by_mat, first[1:])):
+            has_mat = np.zeros((self.tier_slots, systems), dtype=bool)
+            has_mat[self.mat_tier[entries], self.mat_sys[entries]] = True
+            self.material_bits[mat_id] = np.packbits(has_mat, axis=1)
+            self.material_entries[mat_id] = entries
+
+    def _build_hub_distances(self, engine):
+        """Entfernung jedes Systems zum nächsten Hub (float32 wie GalaxyEngine.hub_nearest)."""
+        nearest = np.full(len(self.keys), np.inf)
+        dx, dy = np.empty_like(nearest), np.empty_like(nearest)
+        for row in engine.hub_rows.tolist():
+            # Quadrate vergleichen, die Wurzel nur einmal am Ende
+            np.subtract(self.x, engine.x[row], out=dx)
+            np.subtract(self.y, engine.y[row], out=dy)
+            dx *= dx
+            dy *= dy
+            dx += dy
+            np.minimum(nearest, dx, out=nearest)
+        self.hub_nearest = np.sqrt(nearest).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def index_of(self, system_id: int) -> int:
+        """Systemindex anhand der sId; KeyError, wenn das System keine Planeten hat."""
+        pos = int(np.searchsorted(self.keys, system_id))
+        if pos >= len(self.keys) or self.keys[pos] != system_id:
+            raise KeyError(system_id)
+        return pos
+
+    def _tier_columns(self, tiers: Iterable[int]) -> np.ndarray:
+        return np.array(sorted(t for t in set(tiers) if 0 <= t < self.tier_slots), dtype=np.int64)
+
+    def covering(self, materials: Iterable[int], tiers: Iterable[int]) -> np.ndarray:
+        """Bool-Maske der Systeme, deren Planeten (erlaubter Tiers) zusammen ALLE Materialien haben."""
+        columns = self._tier_columns(tiers)
+        mask = self.planet_count[:, columns].any(axis=1)
+        bits = None
+        for mat_id in materials:
+            mat_bits = self.material_bits.get(mat_id)
+            if mat_bits is None:
+                return np.zeros(len(self.keys), dtype=bool)
+            union = np.bitwise_or.reduce(mat_bits[columns], axis=0)
+            bits = union if bits is None else np.bitwise_and(bits, union, out=bits)
+        if bits is not None:
+            mask &= np.unpackbits(bits, count=len(self.keys)).view(bool)
+        return mask
+
+    def abundance(self, systems: np.ndarray, mat_id: int, tiers: Iterable[int]) -> np.ndarray:
+        """Summe der Häufigkeit (ab) eines Materials über die Planeten erlaubter Tiers; 0, wo es fehlt."""
+        entries = self.material_entries.get(mat_id)
+        if entries is None:
+            return np.zeros(len(systems), dtype=np.int64)
+        allowed = np.zeros(self.tier_slots, dtype=bool)
+        allowed[self._tier_columns(tiers)] = True
+        entries = entries[allowed[self.mat_tier[entries]]]
+        # Nur die Einträge dieses Materials anfassen, nicht die CSR-Abschnitte aller Systeme
+        totals = np.bincount(self.mat_sys[entries], weights=self.mat_ab[entries], minlength=len(self.keys))
+        return totals[systems].astype(np.int64)
+
+    def tier_total(self, values: np.ndarray, systems: np.ndarray, tiers: Iterable[int]) -> np.ndarray:
+        """Summe einer Tier-Tabelle (planet_count, fert, size) über die erlaubten Tiers."""
+        return values[systems][:, self._tier_columns(tiers)].sum(axis=1)
+
+    def planets(self, system: int, tiers: Iterable[int] = None) -> np.ndarray:
+        """Planeten-Zeilen eines Systems (optional nur die erlaubter Tiers)."""
+        start, end = self.ptr[system], self.ptr[system + 1]
+        if tiers is None:
+            return self.rows[start:end]
+        return self.rows[start:end][np.isin(self.row_tier[start:end], self._tier_columns(tiers))]
+
+    def materials(self, system: int, tiers: Iterable[int] = None) -> Dict[int, int]:
+        """Material-ID -> Summe ab über die Planeten (optional nur erlaubter Tiers) eines Systems."""
+        start, end = self.mat_ptr[system], self.mat_ptr[system + 1]
+        keep = slice(None) if tiers is None else np.isin(self.mat_tier[start:end], self._tier_columns(tiers))
+        totals: Dict[int, int] = {}
+        for mat_id, ab in zip(self.mat_ids[start:end][keep].tolist(), self.mat_ab[start:end][keep].tolist()):
+            totals[mat_id] = totals.get(mat_id, 0) + ab
+        return totals
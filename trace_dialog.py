@@ -0,0 +1,99 @@
+"""
+Debug-Dialog für die Zeitmessung
+Zeigt die aggregierten Spans aus tracing.py als Tabelle und exportiert auf Wunsch
+einen Chrome-Trace. Wird im Hauptfenster mit Strg+Umschalt+T geöffnet.
+"""
+
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtWidgets import (QDialog, QFileDialog, QHBoxLayout, QHeaderView, QLabel, QPushButton,
+                             QTableWidget, QTableWidgetItem, QVBoxLayout)
+
+import tracing
+
+COLUMNS = ["Span", "Anzahl", "Summe ms", "Mittel ms", "Max ms"]
+
+# Aktualisierungsintervall der Tabelle, solange der Dialog offen ist
+REFRESH_MS = 1000
+
+
+class TraceDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("⏱️ Zeitmessung")
+        self.resize(760, 480)
+        layout = QVBoxLayout(self)
+
+        self.info_label = QLabel()
+        layout.addWidget(self.info_label)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        self.toggle_btn = QPushButton()
+        self.toggle_btn.clicked.connect(self.toggle_tracing)
+        buttons.addWidget(self.toggle_btn)
+        reset_btn = QPushButton("🗑️ Zurücksetzen")
+        reset_btn.clicked.connect(self.reset)
+        buttons.addWidget(reset_btn)
+        export_btn = QPushButton("💾 Chrome-Trace exportieren...")
+        export_btn.clicked.connect(self.export)
+        buttons.addWidget(export_btn)
+        buttons.addStretch()
+        layout.addLayout(buttons)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    def showEvent(self, event):
+        self.refresh()
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        """Tabelle mit den aktuellen Aggregaten füllen."""
+        enabled = tracing.is_enabled()
+        self.toggle_btn.setText("⏸️ Messung stoppen" if enabled else "▶️ Messung starten")
+        self.info_label.setText("Messung aktiv" if enabled else
+                                "Messung aus (PLANETFINDER_TRACE=1 misst zusätzlich Start und UI-Aufbau)")
+        rows = tracing.summary()
+        self.table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            values = [row['name'], str(row['count']), f"{row['total_ms']:.2f}",
+                      f"{row['mean_ms']:.3f}", f"{row['max_ms']:.2f}"]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(i, col, item)
+
+    def toggle_tracing(self):
+        tracing.enable(not tracing.is_enabled())
+        self.refresh()
+
+    def reset(self):
+        tracing.reset()
+        self.refresh()
+
+    def export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Chrome-Trace speichern", "planetfinder-trace.json",
+                                              "JSON (*.json)")
+        if not path:
+            return
+        try:
+            count = tracing.export_chrome_trace(path)
+        except OSError as e:
+            self.info_label.setText(f"❌ Export fehlgeschlagen: {e}")
+            return
+        self.info_label.setText(f"✓ {count} Ereignisse exportiert nach {path}")
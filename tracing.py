@@ -0,0 +1,173 @@
+"""
+Leichtgewichtige Zeitmessung (Spans) für die heißen Pfade
+Eingeschaltet über die Umgebungsvariable PLANETFINDER_TRACE=1 (oder enable()).
+Ausgeschaltet liefert span() ein geteiltes Leerobjekt und @traced ruft die Funktion nur
+durch - es wird nichts gemessen oder gespeichert. Beides prüft den Schalter bei jedem
+Aufruf, enable() wirkt also auch zur Laufzeit. Eingeschaltet werden pro Name
+Anzahl/Summe/Maximum aggregiert und die einzelnen Ereignisse in einem Ringpuffer
+gehalten, der sich als Chrome-Trace (chrome://tracing, Perfetto) exportieren lässt.
+Mit PLANETFINDER_TRACE_FILE=<pfad> wird der Trace beim Beenden automatisch geschrieben.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Callable, Dict, List
+
+# Maximale Anzahl gespeicherter Einzelereignisse (älteste fallen heraus)
+MAX_EVENTS = 200_000
+
+_enabled = os.environ.get('PLANETFINDER_TRACE', '') not in ('', '0')
+_lock = threading.Lock()
+_events = deque(maxlen=MAX_EVENTS)
+_stats: Dict[str, List[float]] = {}  # Name -> [Anzahl, Summe µs, Maximum µs]
+_origin = time.perf_counter_ns()
+
+
+class _NullSpan:
+    """Leerobjekt für abgeschaltetes Tracing."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """Misst die Dauer eines with-Blocks; set() ergänzt Argumente (z.B. Cache-Treffer)."""
+    __slots__ = ('name', 'args', 'start')
+
+    def __init__(self, name: str, args: dict):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        record(self.name, self.start, end, self.args)
+        return False
+
+    def set(self, **args):
+        self.args.update(args)
+
+
+def span(name: str, **args):
+    """Kontextmanager für einen Abschnitt; kostet ausgeschaltet nur diesen Aufruf."""
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name, args)
+
+
+def traced(name: str) -> Callable:
+    """Decorator: misst jeden Aufruf als Span (ausgeschaltet nur eine Abfrage des Schalters)."""
+    def decorate(func):
+        # Immer den Wrapper zurückgeben: enable() kann das Tracing auch nachträglich einschalten
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, start, time.perf_counter_ns())
+        return wrapper
+    return decorate
+
+
+def record(name: str, start_ns: int, end_ns: int, args: dict = None):
+    """Speichert ein fertiges Ereignis (auch für Abschnitte ohne with-Block)."""
+    duration_us = (end_ns - start_ns) / 1000
+    # Aggregat zusätzlich nach Argument (z.B. load_icon[cache=hit])
+    key = name if not args else f"{name}[{','.join(f'{k}={v}' for k, v in sorted(args.items()))}]"
+    with _lock:
+        _events.append((name, (start_ns - _origin) / 1000, duration_us, threading.get_ident(), args))
+        stats = _stats.get(key)
+        if stats is None:
+            _stats[key] = [1, duration_us, duration_us]
+        else:
+            stats[0] += 1
+            stats[1] += duration_us
+            if duration_us > stats[2]:
+                stats[2] = duration_us
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable(on: bool = True):
+    """Schaltet die Messung zur Laufzeit ein oder aus."""
+    global _enabled
+    _enabled = on
+
+
+def reset():
+    """Verwirft alle gesammelten Ereignisse und Aggregate."""
+    with _lock:
+        _events.clear()
+        _stats.clear()
+
+
+def summary() -> List[dict]:
+    """Aggregierte Zeiten pro Span, nach Gesamtzeit absteigend."""
+    with _lock:
+        items = [(key, list(values)) for key, values in _stats.items()]
+    rows = [{'name': key, 'count': int(count), 'total_ms': total / 1000, 'mean_ms': total / count / 1000,
+             'max_ms': maximum / 1000}
+            for key, (count, total, maximum) in items]
+    rows.sort(key=lambda row: row['total_ms'], reverse=True)
+    return rows
+
+
+def summary_text(limit: int = 20) -> str:
+    """Aggregate als Text-Tabelle (für Konsole oder Debug-Dialog)."""
+    lines = [f"{'Span':<44} {'Anzahl':>7} {'Summe ms':>10} {'Mittel ms':>10} {'Max ms':>9}"]
+    for row in summary()[:limit]:
+        lines.append(f"{row['name'][:44]:<44} {row['count']:>7} {row['total_ms']:>10.2f} "
+                     f"{row['mean_ms']:>10.3f} {row['max_ms']:>9.2f}")
+    return '\n'.join(lines)
+
+
+def chrome_trace() -> dict:
+    """Ereignisse im Chrome Trace-Event-Format (vollständige Ereignisse, ph='X')."""
+    pid = os.getpid()
+    with _lock:
+        events = list(_events)
+    return {'traceEvents': [{'name': name, 'ph': 'X', 'ts': round(ts, 3), 'dur': round(dur, 3),
+                             'pid': pid, 'tid': tid, 'args': args or {}}
+                            for name, ts, dur, tid, args in events],
+            'displayTimeUnit': 'ms'}
+
+
+def export_chrome_trace(path: str) -> int:
+    """Schreibt den Trace als JSON; gibt die Anzahl der Ereignisse zurück."""
+    trace = chrome_trace()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(trace, f)
+    return len(trace['traceEvents'])
+
+
+def _export_at_exit():
+    path = os.environ.get('PLANETFINDER_TRACE_FILE')
+    if path and _events:
+        count = export_chrome_trace(path)
+        print(f"Trace geschrieben: {path} ({count} Ereignisse)")
+
+
+atexit.register(_export_at_exit)